@@ -84,12 +84,12 @@ def cutToBoardShape(pads):
     #
     pcb = getPCBheight()
     if pcb[0]:  # board is available
+        if pcb[2].Proxy.isInsideBorder(pcb[2], pads):  # nothing to cut
+            return pads
         # cut to board shape
-        board = OpenSCAD2Dgeom.edgestofaces(pcb[2].Border.Shape.Edges)
         # board = FreeCAD.ActiveDocument.Board.Border.Shape
         # board = Part.Face(board)
-        board = board.extrude(FreeCAD.Base.Vector(0, 0, pcb[2].Thickness + 2))
-        board.Placement.Base.z = -1
+        board = pcb[2].Proxy.getBorderSolid(pcb[2])
         # Part.show(board)
         pads = board.common(pads)
         return pads
@@ -119,6 +119,8 @@ class PCBboardObject:
         # obj.addExtension("Part::AttachExtensionPython", obj)
         #
         self.holesComp = None
+        self.shapeCache = {}  # name: [key, source shapes, shape]
+        self.notifiedKey = None
         obj.Proxy = self
         # obj.addObject = addObject
 
@@ -129,6 +131,8 @@ class PCBboardObject:
         if state:
             self.Type = state
             self.holesComp = None
+            self.shapeCache = {}
+            self.notifiedKey = None
 
     def addObject(self, fp, obj):
         fp.Group += [obj]
@@ -139,7 +143,11 @@ class PCBboardObject:
         #
         if prop == "Shape":
             self.getHoles(fp)
-            self.updateObjectaHoles(fp)
+            # layers are cut by holes/board tools - regenerate them only if tools changed
+            key = self.getCacheKey(fp, ['Holes', 'Border'], True)
+            if key is None or key != self.notifiedKey:
+                self.notifiedKey = key
+                self.updateObjectaHoles(fp)
         #
         if fp.AutoUpdate is True:
             # if prop == "Thickness" or prop == "Border" or prop == "Holes" or prop == "Display" or prop == "Cut":
@@ -172,13 +180,108 @@ class PCBboardObject:
             except:
                 pass
 
-    def getHoles(self, fp):
+    def getShapeRevision(self, obj):
+        ''' identifies current shape of the linked object (source shapes are kept by the cache entry,
+            so the hash of a deleted shape can not be reused) '''
         try:
+            return obj.Shape.hashCode()
+        except:
+            return None
+    
+    def getCacheKey(self, fp, links, thickness=False):
+        key = [self.getShapeRevision(getattr(fp, i)) for i in links]
+        if None in key:
+            return None
+        
+        if thickness:
+            key.append(fp.Thickness)
+        return tuple(key)
+    
+    def getCachedShape(self, fp, name, links, thickness, function):
+        ''' shape created by function() is kept until Holes/Border shapes or Thickness change '''
+        key = self.getCacheKey(fp, links, thickness)
+        #
+        if key is not None and name in self.shapeCache.keys() and self.shapeCache[name][0] == key:
+            return self.shapeCache[name][2]
+        
+        shape = function()
+        if key is None or shape is None:
+            self.shapeCache.pop(name, None)
+        else:
+            self.shapeCache[name] = [key, [getattr(fp, i).Shape for i in links], shape]
+        
+        return shape
+    
+    def clearShapeCache(self):
+        self.shapeCache = {}
+    
+    def getHolesComp(self, fp):
+        ''' faces of all holes '''
+        def makeHoles():
             holes = []
             for i in fp.Holes.Shape.Wires:
                 holes.append(Part.Face(i))
             if len(holes):
-                holes = Part.makeCompound(holes)
+                return Part.makeCompound(holes)
+            return None
+        
+        return self.getCachedShape(fp, 'holesComp', ['Holes'], False, makeHoles)
+    
+    def getHolesTool(self, fp):
+        ''' holes extruded through the board and layers - used by layers to cut holes '''
+        def makeTool():
+            holesComp = self.getHolesComp(fp)
+            if holesComp is None:
+                return None
+            
+            tool = holesComp.extrude(FreeCAD.Base.Vector(0, 0, fp.Thickness + 2))
+            tool.Placement.Base.z = -1
+            return tool
+        
+        return self.getCachedShape(fp, 'holesTool', ['Holes'], True, makeTool)
+    
+    def getBorderFace(self, fp):
+        return self.getCachedShape(fp, 'borderFace', ['Border'], False, lambda: OpenSCAD2Dgeom.edgestofaces(fp.Border.Shape.Edges))
+    
+    def getBorderSolid(self, fp):
+        ''' board shape extruded through the board and layers - used to cut objects to board shape '''
+        def makeSolid():
+            solid = self.getBorderFace(fp).extrude(FreeCAD.Base.Vector(0, 0, fp.Thickness + 2))
+            solid.Placement.Base.z = -1
+            return solid
+        
+        return self.getCachedShape(fp, 'borderSolid', ['Border'], True, makeSolid)
+    
+    def getBorderBoxes(self, fp):
+        ''' bounding boxes of board outline edges '''
+        return self.getCachedShape(fp, 'borderBoxes', ['Border'], False, lambda: [i.BoundBox for i in self.getBorderFace(fp).Edges])
+    
+    def isInsideBorder(self, fp, shape):
+        ''' bounding box pre-check for cutToBoardShape() - True if shape lies for sure inside the board outline:
+            its box is inside the board solid box, no outline edge (also of cutouts) reaches into the box
+            and one corner of the box is inside the board '''
+        try:
+            box = shape.BoundBox
+            board = self.getBorderSolid(fp)
+            boardBox = board.BoundBox
+            #
+            if not (boardBox.XMin <= box.XMin and box.XMax <= boardBox.XMax and boardBox.YMin <= box.YMin and box.YMax <= boardBox.YMax and \
+                boardBox.ZMin <= box.ZMin and box.ZMax <= boardBox.ZMax):
+                return False
+            
+            for i in self.getBorderBoxes(fp):
+                if i.XMax >= box.XMin and i.XMin <= box.XMax and i.YMax >= box.YMin and i.YMin <= box.YMax:
+                    return False
+            
+            return board.isInside(FreeCAD.Vector(box.XMin, box.YMin, (boardBox.ZMin + boardBox.ZMax) / 2.), 0, False)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("isInsideBorder(): {0}\n".format(e))
+            return False
+
+    def getHoles(self, fp):
+        try:
+            holes = self.getHolesComp(fp)
+            if holes is not None:
                 self.holesComp = holes
         except:
             self.holesComp = None
@@ -198,7 +301,7 @@ class PCBboardObject:
             except:
                 self.oldHeight = 0
 
-            face = OpenSCAD2Dgeom.edgestofaces(fp.Border.Shape.Edges)
+            face = self.getBorderFace(fp)
             ############################################################
             # BASED ON  realthunder PROPOSAL/SOLUTION
             ############################################################
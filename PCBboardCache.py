@@ -0,0 +1,126 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Cache of parsed boards - re-import of unchanged file skips parsing.
+#   <hash>_<loader>_<version>_<options>.dat - zlib compressed marshal dump of parsed data
+#   index.json                              - the same as in PCBmodelCache
+# marshal format depends on Python version, so it is a part of the key.
+#
+import FreeCAD
+import os
+import sys
+import time
+import zlib
+import marshal
+import hashlib
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+#
+from PCBmodelCache import modelCache
+
+
+__boardCache__ = None
+
+
+def getBoardCachePath():
+    path = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("boardCachePath", "").strip()
+    if path == '':
+        path = os.path.join(FreeCAD.getUserAppDataDir(), "PCB", "boardCache")
+
+    return path
+
+
+def getBoardCache():
+    ''' parsed boards cache shared by all loaders '''
+    global __boardCache__
+
+    if __boardCache__ is None or __boardCache__.path != getBoardCachePath():
+        __boardCache__ = boardCache(getBoardCachePath(), FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetInt("boardCacheSize", 256))
+
+    return __boardCache__
+
+
+def getParsedBoard(filePath, loader, version, options, function):
+    ''' data returned by function() (parser of filePath) - taken from the cache if file, loader version
+        and options did not change; data can contain only lists, dicts, strings and numbers '''
+    if not FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetBool("boardCache", True):
+        return function()
+    #
+    cache = getBoardCache()
+    version = "{0}_{1}_py{2}{3}_{4}".format(loader, version, sys.version_info[0], sys.version_info[1], hashlib.sha1(repr(options).encode('utf-8')).hexdigest()[:8])
+    
+    data = cache.get(filePath, version)
+    if data is None:
+        data = function()
+        cache.put(filePath, version, data)
+    
+    return data
+
+
+class boardCache(modelCache):
+    extensions = [".dat"]
+
+    def get(self, filePath, version):
+        key = None
+        try:
+            key = self.getKey(filePath, version)
+            if key in self.index['entries']:
+                with builtins.open(os.path.join(self.path, key + ".dat"), "rb") as plik:
+                    data = marshal.loads(zlib.decompress(plik.read()))
+
+                self.index['entries'][key]['used'] = time.time()
+                self.index['hits'] += 1
+                self.dirty = True
+                return data
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Board cache: {0}\n".format(e))
+            if key:
+                self.remove(key)
+
+        self.index['misses'] += 1
+        self.dirty = True
+        return None
+
+    def put(self, filePath, version, data):
+        try:
+            key = self.getKey(filePath, version)
+            fileName = os.path.join(self.path, key + ".dat")
+            
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+            
+            with builtins.open(fileName + ".tmp", "wb") as plik:
+                plik.write(zlib.compress(marshal.dumps(data), 1))
+            if os.path.exists(fileName):
+                os.remove(fileName)
+            os.rename(fileName + ".tmp", fileName)
+            
+            self.addEntry(filePath, key, os.path.getsize(fileName))
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Board cache: {0}\n".format(e))
@@ -32,7 +32,10 @@ try:
 except:
     import __builtin__ as builtins
 import re
-from xml.dom import minidom
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
 from PySide import QtCore, QtGui
 import FreeCADGui
 import time
@@ -76,8 +79,12 @@ def wersjaFormatuF(filename):
     #
     if rozsz.lower() == ".brd":
         try:  # eagle
-            projektBRD = minidom.parse(filename)
-            programEagle = projektBRD.getElementsByTagName("eagle")[0].getAttribute("version")
+            # only the root tag is needed - do not build the whole tree (file is checked by parseProject())
+            with builtins.open(filename, 'rb') as plik:
+                event, projektBRD = next(ElementTree.iterparse(plik, events=('start', )))
+            if projektBRD.tag != "eagle":
+                return [False]
+            programEagle = projektBRD.get("version", "")
             return ["eagle", "Eagle {0}".format(programEagle)]
         except:
             return [False]
@@ -223,7 +230,11 @@ def importBRD(filename, wersjaFormatu):
     mw = FreeCADGui.getMainWindow()
     mw.findChild(QtGui.QDockWidget, "Report view").layout().itemAt(0).widget().clear()
     #
-    plytkaPCB = mainPCB(wersjaFormatu, filename)
+    try:  # file is parsed by the dialog
+        plytkaPCB = mainPCB(wersjaFormatu, filename)
+    except Exception as e:
+        FreeCAD.Console.PrintError(u"Error while reading the file: {0}\n".format(e))
+        return
     plytkaPCB.setProject(filename)
     dial = plytkaPCB.wersjaFormatu.dialogMAIN
     #
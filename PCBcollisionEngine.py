@@ -0,0 +1,181 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Collision detection between two groups of shapes (see command/PCBcollision.py).
+#   broad phase  - sweep and prune of bounding boxes (x axis) -> candidate pairs
+#   narrow phase - common()/distToShape() only for candidate pairs, optionally in worker processes
+# This module is imported by the workers, so it can not depend on FreeCADGui/PySide.
+#
+import FreeCAD
+
+
+__minVolume__ = 1e-6  # mm3 - smaller common parts are treated as touching shapes
+__minPoolPairs__ = 20  # starting of worker processes takes time
+__workerShapes__ = {}  # worker process: number: shape
+__workerBreps__ = {}
+
+
+def getBoundBoxes(shapes, margin=0.0):
+    ''' [xmin, ymin, zmin, xmax, ymax, zmax] of shapes enlarged by margin '''
+    boxes = []
+    for i in shapes:
+        b = i.BoundBox
+        boxes.append([b.XMin - margin, b.YMin - margin, b.ZMin - margin, b.XMax + margin, b.YMax + margin, b.ZMax + margin])
+
+    return boxes
+
+
+def sweepAndPrune(boxes1, boxes2):
+    ''' pairs [i, j] of boxes1[i] and boxes2[j] overlapping in all axes
+        boxes are sorted by xmin, only boxes of the other group still active at xmin are tested '''
+    boxes = [boxes1, boxes2]
+    events = sorted([[b[0], 0, i] for i, b in enumerate(boxes1)] + [[b[0], 1, i] for i, b in enumerate(boxes2)])
+    active = [[], []]
+    pairs = []
+    #
+    for [xmin, group, i] in events:
+        box = boxes[group][i]
+        other = 1 - group
+
+        active[other] = [j for j in active[other] if boxes[other][j][3] >= xmin]
+        for j in active[other]:
+            b = boxes[other][j]
+            if b[1] <= box[4] and box[1] <= b[4] and b[2] <= box[5] and box[2] <= b[5]:
+                if group == 0:
+                    pairs.append([i, j])
+                else:
+                    pairs.append([j, i])
+
+        active[group].append(i)
+
+    return sorted(pairs)
+
+
+def checkPair(shape1, shape2, clearance=0.0):
+    ''' returns [overlap volume, distance, common shape or None] - distance is calculated only if clearance > 0 '''
+    common = shape1.common(shape2)
+    #
+    if len(common.Solids) and common.Volume > __minVolume__:
+        return [common.Volume, 0.0, common]
+    elif clearance > 0:
+        return [0.0, shape1.distToShape(shape2)[0], None]
+
+    return [0.0, None, None]
+
+
+def setWorkerShapes(breps):
+    ''' worker initializer - shapes are read from BREP when needed '''
+    global __workerBreps__
+
+    __workerBreps__ = breps
+    __workerShapes__.clear()
+
+
+def getWorkerShape(number):
+    if not number in __workerShapes__:
+        import Part
+        #
+        shape = Part.Shape()
+        shape.importBrepFromString(__workerBreps__[number])
+        __workerShapes__[number] = shape
+
+    return __workerShapes__[number]
+
+
+def checkPairWorker(data):
+    ''' worker - [i, j, clearance] -> [i, j, volume, distance, BREP of common shape] '''
+    [i, j, clearance] = data
+    try:
+        [volume, distance, common] = checkPair(getWorkerShape(i), getWorkerShape(j), clearance)
+        if common:
+            common = common.exportBrepToString()
+
+        return [i, j, volume, distance, common]
+    except Exception as e:
+        return [i, j, None, None, str(e)]
+
+
+def checkPairsInPool(shapes, pairs, clearance, processes=None):
+    ''' narrow phase in headless worker processes - None if pool can not be used '''
+    from PCBpartConverter import multiprocessing, getWorkerExecutable
+    #
+    if not multiprocessing or not hasattr(multiprocessing, "get_context") or not getWorkerExecutable():
+        return None
+
+    try:
+        numbers = sorted(set([k for pair in pairs for k in pair]))
+        breps = dict([[k, shapes[k].exportBrepToString()] for k in numbers])
+
+        if not processes:
+            processes = multiprocessing.cpu_count()
+
+        context = multiprocessing.get_context('spawn')  # never fork running FreeCAD GUI
+        context.set_executable(getWorkerExecutable())
+        pool = context.Pool(max(1, min(processes, len(pairs))), setWorkerShapes, (breps, ))
+        try:
+            result = pool.map(checkPairWorker, [[i, j, clearance] for [i, j] in pairs], 1)
+        finally:
+            pool.close()
+            pool.join()
+    except Exception as e:
+        FreeCAD.Console.PrintWarning("checkPairsInPool(): {0}\n".format(e))
+        return None
+    #
+    import Part
+
+    data = []
+    for [i, j, volume, distance, common] in result:
+        if volume is None:  # error in worker - checked again here
+            data.append([i, j] + checkPair(shapes[i], shapes[j], clearance))
+            continue
+
+        if common:
+            brep = common
+            common = Part.Shape()
+            common.importBrepFromString(brep)
+        data.append([i, j, volume, distance, common])
+
+    return data
+
+
+def findCollisions(shapes1, shapes2, clearance=0.0, processes=0):
+    ''' collisions between shapes of both groups
+            clearance - shapes closer than clearance are reported too
+            processes - number of worker processes (0 - no pool, None - all processors)
+        returns [[i, j, overlap volume, distance, common shape], ...] (i - shapes1, j - shapes2) '''
+    pairs = sweepAndPrune(getBoundBoxes(shapes1, clearance / 2.), getBoundBoxes(shapes2, clearance / 2.))
+    shapes = list(shapes1) + list(shapes2)
+    pairs = [[i, j + len(shapes1)] for [i, j] in pairs if not shapes1[i].isSame(shapes2[j])]
+    #
+    result = None
+    if processes != 0 and len(pairs) >= __minPoolPairs__:
+        result = checkPairsInPool(shapes, pairs, clearance, processes)
+
+    if result is None:
+        result = [[i, j] + checkPair(shapes[i], shapes[j], clearance) for [i, j] in pairs]
+
+    return [[i, j - len(shapes1), volume, distance, common] for [i, j, volume, distance, common] in result if volume > 0 or (distance is not None and distance < clearance)]
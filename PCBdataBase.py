@@ -407,6 +407,27 @@ class dataBase:
             FreeCAD.Console.PrintWarning("ERROR (FP): {0} (findPackage).\n".format(self.errorsDescription(e)))
             return False
 
+    def getPackagesModels(self, software):
+        ''' all packages of the software with their models - one joined query
+            returns [{package name: package}, {model id: model}] (dictionaries, see convertToTable()) or None on error '''
+        packages = {}
+        models = {}
+        try:
+            query = self.session.query(Packages, Models).outerjoin(Models, Packages.modelID == Models.id).filter(Packages.software == self.clearString(software).strip()).order_by(Packages.id)
+            #
+            for [package, model] in query:
+                if package.name in packages:  # findPackage() returns the first one
+                    continue
+
+                packages[package.name] = self.convertToTable(package)
+                if model and not model.id in models:
+                    models[model.id] = self.convertToTable(model)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("ERROR (GPM): {0} (get packages).\n".format(self.errorsDescription(e)))
+            return None
+        #
+        return [packages, models]
+
     def packagesDataToDictionary(self, modelData):
         modelData['software'] = []
         #
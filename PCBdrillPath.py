@@ -0,0 +1,315 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Ordering of drill hits for Excellon export (see command/PCBexportHoles.py).
+#   nearestNeighbour() - construction of the path (uniform grid of not visited holes)
+#   improvePath()      - 2-opt and Or-opt moves tested only for the nearest neighbours of holes next to
+#                        changed edges, limited by time (each accepted move rewrites a part of the path)
+#   optimizeHoles()    - tools are drilled in turn, next tool starts nearest to the end of the previous one
+# Paths are open - they start at the current spindle position and do not return.
+#
+import time
+from math import hypot, floor, sqrt
+from collections import OrderedDict, deque
+
+
+__neighbours__ = 8  # candidates checked for every hole
+__timeLimit__ = 5.0  # seconds for improvement of all tools (export blocks GUI)
+
+
+class pointsGrid(object):
+    ''' points in a uniform grid - used to find nearest points without testing all of them '''
+    def __init__(self, X, Y, numbers=None):
+        self.X = X
+        self.Y = Y
+        if numbers is None:
+            numbers = range(len(X))
+        numbers = list(numbers)
+        #
+        if len(numbers):
+            xMin = min([X[i] for i in numbers])
+            yMin = min([Y[i] for i in numbers])
+            width = max([X[i] for i in numbers]) - xMin
+            height = max([Y[i] for i in numbers]) - yMin
+        else:
+            [xMin, yMin, width, height] = [0, 0, 0, 0]
+
+        self.origin = [xMin, yMin]
+        # ~4 points in a cell (also for points in one line)
+        self.cellSize = max(sqrt(width * height / max(len(numbers), 1)) * 2, max(width, height) / max(len(numbers), 1) * 2, 1e-3)
+        self.size = self.getCell(xMin + width, yMin + height)  # last column/row
+        self.cells = {}  # (column, row): set of point numbers
+        self.count = 0
+        for i in numbers:
+            self.add(i)
+
+    def getCell(self, x, y):
+        return (int(floor((x - self.origin[0]) / self.cellSize)), int(floor((y - self.origin[1]) / self.cellSize)))
+
+    def add(self, i):
+        cell = self.getCell(self.X[i], self.Y[i])
+        if not cell in self.cells:
+            self.cells[cell] = set()
+        self.cells[cell].add(i)
+        self.count += 1
+
+    def remove(self, i):
+        cell = self.getCell(self.X[i], self.Y[i])
+        self.cells[cell].discard(i)
+        if not len(self.cells[cell]):
+            del self.cells[cell]
+        self.count -= 1
+
+    def getRing(self, cell, r):
+        ''' cells of the grid at distance r (in cells) from the given cell '''
+        [c, w] = cell
+        [cMax, wMax] = self.size
+        ring = []
+        #
+        for row in [w - r, w + r]:
+            if 0 <= row <= wMax:
+                ring += [(i, row) for i in range(max(c - r, 0), min(c + r, cMax) + 1)]
+            if r == 0:
+                return ring
+
+        for column in [c - r, c + r]:
+            if 0 <= column <= cMax:
+                ring += [(column, i) for i in range(max(w - r + 1, 0), min(w + r - 1, wMax) + 1)]
+
+        return ring
+
+    def nearest(self, x, y, k=1, exclude=None):
+        ''' [[distance, number], ...] of k nearest points, sorted by distance '''
+        found = []
+        if not self.count:
+            return found
+        #
+        cell = self.getCell(x, y)
+        # points outside of checked rings are at least (r * cellSize) away - ring search stops there
+        cellX = (x - self.origin[0]) / self.cellSize - cell[0]
+        cellY = (y - self.origin[1]) / self.cellSize - cell[1]
+        margin = min(cellX, 1 - cellX, cellY, 1 - cellY) * self.cellSize
+        # rings between the given cell and the grid are empty
+        r = max(-cell[0], cell[0] - self.size[0], -cell[1], cell[1] - self.size[1], 0)
+        rMax = max(cell[0], self.size[0] - cell[0], cell[1], self.size[1] - cell[1])
+        checked = 0
+        while checked < self.count and r <= rMax:
+            for i in self.getRing(cell, r):
+                for j in self.cells.get(i, []):
+                    checked += 1
+                    if j != exclude:
+                        found.append([hypot(self.X[j] - x, self.Y[j] - y), j])
+            #
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * self.cellSize + margin:
+                    break
+            r += 1
+
+        found.sort()
+        return found[:k]
+
+
+def pathLength(X, Y, order, start=None):
+    ''' length of path through points X[i], Y[i] in given order (from start point [x, y] if given) '''
+    length = 0
+    if start is not None and len(order):
+        length += hypot(X[order[0]] - start[0], Y[order[0]] - start[1])
+
+    for i in range(1, len(order)):
+        length += hypot(X[order[i]] - X[order[i - 1]], Y[order[i]] - Y[order[i - 1]])
+
+    return length
+
+
+def nearestNeighbour(X, Y, start):
+    ''' order of points - every time the nearest not visited point is taken '''
+    grid = pointsGrid(X, Y)
+    order = []
+    [x, y] = start
+    #
+    while grid.count:
+        [[dist, i]] = grid.nearest(x, y)
+        grid.remove(i)
+        order.append(i)
+        [x, y] = [X[i], Y[i]]
+
+    return order
+
+
+def improvePath(X, Y, order, start, timeLimit=__timeLimit__):
+    ''' 2-opt and Or-opt (segments of 1-3 points) improvement of open path starting at start point
+        only holes next to changed edges are checked again (don't look bits), work stops after timeLimit seconds '''
+    if len(order) < 3:
+        return list(order)
+    deadline = time.time() + timeLimit
+    # start point is path node 0 and never moves
+    X = [start[0]] + list(X)
+    Y = [start[1]] + list(Y)
+    path = [0] + [i + 1 for i in order]
+    n = len(path)
+    pos = [0] * n
+    for i, j in enumerate(path):
+        pos[j] = i
+
+    def d(a, b):
+        if b is None:
+            return 0
+        return hypot(X[a] - X[b], Y[a] - Y[b])
+
+    def succ(i):
+        if i + 1 < n:
+            return path[i + 1]
+        return None
+
+    def setPositions(first, last):
+        for k in range(first, last):
+            pos[path[k]] = k
+
+    grid = pointsGrid(X, Y, path[1:])
+    neighbourList = {}
+
+    def neighbours(a):
+        ''' found only for checked holes - time limit includes the search '''
+        if not a in neighbourList:
+            neighbourList[a] = [j for [dist, j] in grid.nearest(X[a], Y[a], __neighbours__, a)]
+        return neighbourList[a]
+    #
+    def twoOpt(a):
+        ''' new edge between a and one of its neighbours - path[i + 1:j + 1] is reversed
+            (edges after a and c or before a and c are replaced) '''
+        for c in neighbours(a):
+            [i, j] = sorted([pos[a], pos[c]])
+            for [i, j] in [[i, j], [i - 1, j - 1]]:
+                if j - i < 2 or i < 0:
+                    continue
+
+                [p, p1, q, q1] = [path[i], path[i + 1], path[j], succ(j)]
+                if d(p, p1) + d(q, q1) - d(p, q) - d(p1, q1) > 1e-9:
+                    path[i + 1:j + 1] = path[j:i:-1]
+                    setPositions(i + 1, j + 1)
+                    return [p, p1, q, q1]
+
+        return []
+
+    def orOpt(a):
+        ''' segment starting at a moved next to a neighbour of its first (last - reversed) point '''
+        i = pos[a]
+        for length in [1, 2, 3]:
+            if i + length > n:
+                break
+            [p, s0, s1, nx] = [path[i - 1], path[i], path[i + length - 1], succ(i + length - 1)]
+            removeGain = d(p, s0) + d(s1, nx) - d(p, nx)
+            if removeGain <= 1e-9:
+                continue
+
+            for [point, reverse] in [[s0, False], [s1, True]]:
+                for c in neighbours(point):
+                    j = pos[c]
+                    if i <= j < i + length or (c == p and not reverse):
+                        continue
+                    # successor of c after the segment is removed
+                    if c == p:
+                        c1 = nx
+                    else:
+                        c1 = succ(j)
+
+                    if reverse:
+                        gain = removeGain + d(c, c1) - d(c, s1) - d(s0, c1)
+                    else:
+                        gain = removeGain + d(c, c1) - d(c, s0) - d(s1, c1)
+
+                    if gain > 1e-9:
+                        segment = path[i:i + length]
+                        if reverse:
+                            segment.reverse()
+                        # only the part of the path between the segment and c is rewritten
+                        if j < i:
+                            path[j + 1:i + length] = segment + path[j + 1:i]
+                            setPositions(j + 1, i + length)
+                        else:
+                            path[i:j + 1] = path[i + length:j + 1] + segment
+                            setPositions(i, j + 1)
+                        return [p, s0, s1, nx, c, c1]
+
+        return []
+    #
+    queue = deque(path[1:])
+    queued = [False] + [True] * (n - 1)
+    while len(queue) and time.time() < deadline:
+        a = queue.popleft()
+        queued[a] = False
+        #
+        for i in twoOpt(a) or orOpt(a):
+            if i and not queued[i]:  # start point (0) and end of the path (None) are skipped
+                queue.append(i)
+                queued[i] = True
+
+    return [i - 1 for i in path[1:]]
+
+
+def optimizePath(points, start, timeLimit=__timeLimit__):
+    ''' points: [[x, y], ...] -> points in optimized order '''
+    X = [i[0] for i in points]
+    Y = [i[1] for i in points]
+    #
+    order = improvePath(X, Y, nearestNeighbour(X, Y, start), start, timeLimit)
+    return [points[i] for i in order]
+
+
+def holesPathLength(holes, start=[0, 0]):
+    ''' rapid travel through holes {tool: [[x, y], ...]} in dict order '''
+    points = [j for i in holes.values() for j in i]
+    #
+    return pathLength([i[0] for i in points], [i[1] for i in points], range(len(points)), start)
+
+
+def optimizeHoles(holes, start=[0, 0], timeLimit=__timeLimit__):
+    ''' holes {tool: [[x, y], ...]} -> OrderedDict with tools and hits ordered to minimize rapid travel
+        next tool is the one with the hole nearest to the end of the previous path
+        timeLimit is shared by tools (by number of holes) '''
+    tools = [i for i in holes.keys() if len(holes[i])]
+    result = OrderedDict()
+    deadline = time.time() + timeLimit
+    holesLeft = sum([len(holes[i]) for i in tools])
+    #
+    while len(tools):
+        nearest = []
+        for i in tools:
+            nearest.append([min([hypot(j[0] - start[0], j[1] - start[1]) for j in holes[i]]), i])
+        tool = min(nearest)[1]
+        tools.remove(tool)
+        #
+        result[tool] = optimizePath(holes[tool], start, max(deadline - time.time(), 0) * len(holes[tool]) / holesLeft)
+        holesLeft -= len(holes[tool])
+        start = result[tool][-1]
+    # tools without holes
+    for i in holes.keys():
+        if not i in result:
+            result[i] = holes[i]
+
+    return result
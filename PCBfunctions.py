@@ -124,6 +124,59 @@ def sketcherRemoveOpenShapes(dataIN):
     return outline
 
 
+def sketcherChainSegments(segments, precision=4):
+    ''' lines/arcs from sketcherLoopGeometry() -> chains of connected segments [[segment number, reversed], ...]
+        end points are matched by rounded coordinates in a dictionary, so the whole outline is chained in linear time
+        (chain starts with the first free segment, at each point the first free segment in the list is taken) '''
+    keys = []
+    nodes = {}  # (x, y): [segment number, ...]
+    #
+    for i in range(len(segments)):
+        if segments[i]['type'] in ['line', 'arc']:
+            keys.append([(round(segments[i]['x1'], precision), round(segments[i]['y1'], precision)), (round(segments[i]['x2'], precision), round(segments[i]['y2'], precision))])
+            
+            for j in keys[i]:
+                if not j in nodes.keys():
+                    nodes[j] = []
+                nodes[j].append(i)
+        else:
+            keys.append(None)
+    #
+    chains = []
+    visited = [False] * len(segments)
+    pointers = {}  # node: first segment number which can be free
+    
+    for i in range(len(segments)):
+        if keys[i] is None or visited[i]:
+            continue
+        
+        visited[i] = True
+        chain = [[i, False]]
+        node = keys[i][1]
+        while True:
+            k = pointers.get(node, 0)
+            while k < len(nodes[node]) and visited[nodes[node][k]]:
+                k += 1
+            pointers[node] = k
+            
+            if k == len(nodes[node]):
+                break
+            
+            j = nodes[node][k]
+            visited[j] = True
+            reverse = keys[j][0] != node
+            chain.append([j, reverse])
+            
+            if reverse:
+                node = keys[j][0]
+            else:
+                node = keys[j][1]
+        
+        chains.append(chain)
+    #
+    return chains
+
+
 def sketcherGetGeometryShapes(sketcherIN):
     if not sketcherIN.isDerivedFrom("Sketcher::SketchObject"):
         FreeCAD.Console.PrintWarning("Error: Object is not a sketcher.\n")
@@ -137,112 +190,37 @@ def sketcherGetGeometryShapes(sketcherIN):
     #
     outList = {}
     try:
-        num_1 = 0
+        segments = sketcherLoopGeometry([], sketcherIN.GeometryFacadeList)
         num_2 = 1
-        #data = sketcherIN.Geometry
-        data = sketcherIN.GeometryFacadeList
-        first = False
         #
-        while len(data):
-            for i in range(0, len(data)):
-                if data[i].Construction:
-                    data.pop(i)
-                    break
-                ####
-                objGeometry = data[i].Geometry
+        for chain in sketcherChainSegments(segments):
+            outList[num_2] = {}
+            
+            for [i, reverse] in chain:
+                segment = segments[i]
+                [x3, y3, x4, y4] = [round(segment['x1'], 4), round(segment['y1'], 4), round(segment['x2'], 4), round(segment['y2'], 4)]
                 
-                if type(objGeometry).__name__ == "BSplineCurve":
-                    pass
-                elif type(objGeometry).__name__ == "ArcOfParabola":
-                    pass
-                #
-                if type(objGeometry).__name__ == 'ArcOfCircle':
-                    [angle, startAngle, stopAngle] = sketcherGetArcAngle(objGeometry)
-                    #
-                    x3 = float("%.4f" % (objGeometry.StartPoint.x))
-                    y3 = float("%.4f" % (objGeometry.StartPoint.y))
-                    x4 = float("%.4f" % (objGeometry.EndPoint.x))
-                    y4 = float("%.4f" % (objGeometry.EndPoint.y))
-                    #
-                    if not first:
-                        num_1 = 0
-                        if not num_2 in outList.keys():
-                            outList[num_2] = {}
-                        outList[num_2][num_1] = [x3, y3, 'Line']
-                        num_1 += 1
-                        outList[num_2][num_1] = [x4, y4, angle, objGeometry, 'Arc']
-                        data.pop(i)
-                        first = True
-                        #
-                        x2 = x4
-                        y2 = y4
-                        #
-                        break
-                    #
-                    if [x3, y3] == [x2, y2]:
-                        num_1 += 1
-                        outList[num_2][num_1] = [x4, y4, angle, objGeometry, 'Arc']
-                        x2 = x4
-                        y2 = y4
-                        data.pop(i)
-                        break
-                    elif [x4, y4] == [x2, y2]:
-                        num_1 += 1
-                        outList[num_2][num_1] = [x3, y3, angle, objGeometry, 'rev', 'Arc']
-                        x2 = x3
-                        y2 = y3
-                        data.pop(i)
-                        break
-                elif type(objGeometry).__name__ == 'LineSegment':
-                    x3 = float("%.4f" % (objGeometry.StartPoint.x))
-                    y3 = float("%.4f" % (objGeometry.StartPoint.y))
-                    x4 = float("%.4f" % (objGeometry.EndPoint.x))
-                    y4 = float("%.4f" % (objGeometry.EndPoint.y))
-                    #
-                    if not first:
-                        num_1 = 0
-                        if not num_2 in outList.keys():
-                            outList[num_2] = {}
+                if not len(outList[num_2]):  # start point
+                    outList[num_2][0] = [x3, y3, 'Line']
+                
+                num_1 = len(outList[num_2])
+                if segment['type'] == 'arc':
+                    if reverse:
+                        outList[num_2][num_1] = [x3, y3, segment['angle'], segment['geometry'], 'rev', 'Arc']
+                    else:
+                        outList[num_2][num_1] = [x4, y4, segment['angle'], segment['geometry'], 'Arc']
+                else:
+                    if reverse:
                         outList[num_2][num_1] = [x3, y3, 'Line']
-                        num_1 += 1
-                        outList[num_2][num_1] = [x4, y4, 'Line']
-                        data.pop(i)
-                        first = True
-                        #
-                        x2 = x4
-                        y2 = y4
-                        #
-                        break
-                    #
-                    if [x3, y3] == [x2, y2]:
-                        num_1 += 1
+                    else:
                         outList[num_2][num_1] = [x4, y4, 'Line']
-                        x2 = x4
-                        y2 = y4
-                        data.pop(i)
-                        break
-                    elif [x4, y4] == [x2, y2]:
-                        num_1 += 1
-                        outList[num_2][num_1] = [x3, y3, 'Line']
-                        x2 = x3
-                        y2 = y3
-                        data.pop(i)
-                        break
-                ######
-                if i == len(data) - 1:
-                    if type(data[0]).__name__ == 'Circle':
-                        xs = float("%.4f" % (data[0].Center.x))
-                        ys = float("%.4f" % (data[0].Center.y))
-                        r = float("%.4f" % (data[0].Radius))
-                        #
-                        num_2 += 1
-                        outList[num_2] = {}
-                        outList[num_2][0] = [xs, ys, r, 'Circle']
-                        data.pop(i)
-                    #########
-                    first = False
-                    num_2 += 1
-                    break
+            
+            num_2 += 1
+        # circles
+        for i in segments:
+            if i['type'] == 'circle':
+                outList[num_2] = {0: [round(i['x'], 4), round(i['y'], 4), round(i['r'], 4), 'Circle']}
+                num_2 += 1
     except Exception as e:
         FreeCAD.Console.PrintWarning('1. ' + str(e) + "\n")
     #
@@ -293,7 +271,8 @@ def sketcherLoopGeometry(outlineList, geometryList):
                     'x2': objGeometry.EndPoint.x,
                     'y2': objGeometry.EndPoint.y,
                     'startAngle': startAngle,
-                    'stopAngle': stopAngle
+                    'stopAngle': stopAngle,
+                    'geometry': objGeometry
                 })
     except Exception as e:
         FreeCAD.Console.PrintWarning('1. ' + str(e) + "\n")
@@ -0,0 +1,264 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Cache of converted STEP/IGES models (replaces *.col files saved next to models).
+#   <hash>_<version>.brep - shape in binary BREP format
+#   <hash>_<version>.col  - packed colors of faces: count (uint32) + count * RGBA (4 x float32)
+#   index.json            - entries (size, last use), known model files (mtime, size, hash), hits/misses
+# <hash> is SHA1 of the model file content, so the cache works for read-only libraries and
+# for models copied between machines.
+#
+import FreeCAD
+import os
+import json
+import time
+import struct
+import hashlib
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+
+
+__indexVersion__ = 1
+__modelCache__ = None
+
+
+def getModelCachePath():
+    path = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("modelCachePath", "").strip()
+    if path == '':
+        path = os.path.join(FreeCAD.getUserAppDataDir(), "PCB", "modelCache")
+
+    return path
+
+
+def getModelCache():
+    ''' model cache shared by all imports '''
+    global __modelCache__
+
+    if __modelCache__ is None or __modelCache__.path != getModelCachePath():
+        __modelCache__ = modelCache(getModelCachePath(), FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetInt("modelCacheSize", 1024))
+
+    return __modelCache__
+
+
+def packColors(col):
+    data = [struct.pack("<I", len(col))]
+    for i in col:
+        i = list(i) + [0.0] * (4 - len(i))  # RGB -> RGBA
+        data.append(struct.pack("<4f", *i[:4]))
+
+    return b"".join(data)
+
+
+def unpackColors(data):
+    [count] = struct.unpack_from("<I", data, 0)
+
+    return [struct.unpack_from("<4f", data, 4 + i * 16) for i in range(count)]
+
+
+def writeEntry(path, key, shape, col):
+    ''' saves shape/colors to cache directory - returns size of entry (can be called by worker processes) '''
+    if not os.path.exists(path):
+        try:
+            os.makedirs(path)
+        except OSError:  # created by another process
+            pass
+    #
+    brepFile = os.path.join(path, key + ".brep")
+    colFile = os.path.join(path, key + ".col")
+
+    shape.exportBinary(brepFile + ".tmp")
+    with builtins.open(colFile + ".tmp", "wb") as plik:
+        plik.write(packColors(col))
+    # complete files or nothing
+    for i in [brepFile, colFile]:
+        if os.path.exists(i):
+            os.remove(i)
+        os.rename(i + ".tmp", i)
+
+    return os.path.getsize(brepFile) + os.path.getsize(colFile)
+
+
+class modelCache(object):
+    extensions = [".brep", ".col"]  # files of one entry
+
+    def __init__(self, path, maxSize=1024):
+        self.path = path
+        self.maxSize = maxSize * 1024 * 1024  # MB
+        self.index = {'version': __indexVersion__, 'entries': {}, 'files': {}, 'hits': 0, 'misses': 0}
+        self.dirty = False  # changes of index not saved yet (last use, hits/misses, hashes of files) - see flush()
+        #
+        self.loadIndex()
+
+    def getIndexPath(self):
+        return os.path.join(self.path, "index.json")
+
+    def loadIndex(self):
+        try:
+            if os.path.exists(self.getIndexPath()):
+                with builtins.open(self.getIndexPath(), "r") as plik:
+                    index = json.load(plik)
+
+                if index.get('version') == __indexVersion__:
+                    self.index = index
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Model cache index is damaged and will be recreated. {0}\n".format(e))
+
+    def saveIndex(self):
+        try:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+
+            with builtins.open(self.getIndexPath() + ".tmp", "w") as plik:
+                json.dump(self.index, plik)
+
+            if os.path.exists(self.getIndexPath()):
+                os.remove(self.getIndexPath())
+            os.rename(self.getIndexPath() + ".tmp", self.getIndexPath())
+            self.dirty = False
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("saveIndex(): {0}\n".format(e))
+
+    def flush(self):
+        ''' saves index changed by lookups - called once after import/export '''
+        if self.dirty:
+            self.saveIndex()
+
+    def getFileHash(self, filePath):
+        ''' SHA1 of file content - calculated again only if mtime/size of the file changed '''
+        stat = os.stat(filePath)
+        fileInfo = self.index['files'].get(filePath)
+        #
+        if fileInfo and fileInfo[0] == stat.st_mtime and fileInfo[1] == stat.st_size:
+            return fileInfo[2]
+
+        sha = hashlib.sha1()
+        with builtins.open(filePath, "rb") as plik:
+            for i in iter(lambda: plik.read(1024 * 1024), b""):
+                sha.update(i)
+
+        self.index['files'][filePath] = [stat.st_mtime, stat.st_size, sha.hexdigest()]
+        self.dirty = True
+        return sha.hexdigest()
+
+    def getKey(self, filePath, version):
+        return "{0}_{1}".format(self.getFileHash(filePath), version)
+
+    def contains(self, filePath, version):
+        try:
+            key = self.getKey(filePath, version)
+            return key in self.index['entries'] and os.path.exists(os.path.join(self.path, key + self.extensions[0]))
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("contains(): {0}\n".format(e))
+            return False
+
+    def get(self, filePath, version):
+        ''' returns [shape, colors] or None '''
+        try:
+            import Part
+            #
+            key = self.getKey(filePath, version)
+            if key in self.index['entries']:
+                shape = Part.Shape()
+                shape.importBinary(os.path.join(self.path, key + ".brep"))
+
+                with builtins.open(os.path.join(self.path, key + ".col"), "rb") as plik:
+                    col = unpackColors(plik.read())
+
+                if not shape.isNull():
+                    self.index['entries'][key]['used'] = time.time()
+                    self.index['hits'] += 1
+                    self.dirty = True
+                    return [shape, col]
+
+            self.remove(key)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Model cache: {0}\n".format(e))
+
+        self.index['misses'] += 1
+        self.dirty = True
+        return None
+
+    def put(self, filePath, version, shape, col):
+        try:
+            key = self.getKey(filePath, version)
+            self.addEntry(filePath, key, writeEntry(self.path, key, shape, col))
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Model cache: {0}\n".format(e))
+
+    def addEntry(self, filePath, key, size):
+        self.index['entries'][key] = {'size': size, 'used': time.time(), 'source': filePath}
+        #
+        self.evict()
+        self.saveIndex()
+
+    def remove(self, key):
+        self.index['entries'].pop(key, None)
+        self.dirty = True
+        #
+        for i in self.extensions:
+            try:
+                if os.path.exists(os.path.join(self.path, key + i)):
+                    os.remove(os.path.join(self.path, key + i))
+            except Exception as e:
+                FreeCAD.Console.PrintWarning("Model cache: {0}\n".format(e))
+
+    def getSize(self):
+        return sum([i['size'] for i in self.index['entries'].values()])
+
+    def evict(self):
+        ''' removes least recently used entries above the size limit '''
+        size = self.getSize()
+        if size <= self.maxSize:
+            return
+        #
+        for key in sorted(self.index['entries'].keys(), key=lambda k: self.index['entries'][k]['used']):
+            if size <= self.maxSize or len(self.index['entries']) == 1:
+                break
+
+            size -= self.index['entries'][key]['size']
+            self.remove(key)
+
+    def clear(self):
+        for key in list(self.index['entries'].keys()):
+            self.remove(key)
+        #
+        self.index['files'] = {}
+        self.index['hits'] = 0
+        self.index['misses'] = 0
+        self.saveIndex()
+
+    def getStats(self):
+        return {
+            'path': self.path,
+            'entries': len(self.index['entries']),
+            'size': self.getSize(),
+            'maxSize': self.maxSize,
+            'hits': self.index['hits'],
+            'misses': self.index['misses'],
+        }
@@ -0,0 +1,299 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Index of model libraries (partPaths + "partsPaths" parameter) used by partExistPath().
+#   Libraries are scanned once, the index is saved (modelLibrary.json) with mtimes of all
+#   directories - later only changed directories are read again.
+#   Lookups: relative path with extension -> file, relative path without extension -> IGES/STEP file.
+#
+import FreeCAD
+import os
+import json
+import time
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+
+
+__indexVersion__ = 1
+__modelLibrary__ = None
+__modelExtensions__ = ['.igs', '.iges', '.stp', '.step']
+
+
+def getLibraryRoots():
+    from PCBconf import partPaths
+    #
+    roots = list(partPaths)
+    roots.extend(FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("partsPaths", "").split(','))
+
+    return [os.path.abspath(i.strip()) for i in roots if i.strip() != '']
+
+
+def getModelLibrary(validate=False):
+    ''' model library index shared by all imports
+        validate - check directories now (otherwise not more often than every 60 s) '''
+    global __modelLibrary__
+
+    roots = getLibraryRoots()
+    if __modelLibrary__ is None or __modelLibrary__.roots != roots:
+        __modelLibrary__ = modelLibrary(roots, os.path.join(FreeCAD.getUserAppDataDir(), "PCB", "modelLibrary.json"))
+
+    if validate or time.time() - __modelLibrary__.checked > 60:
+        __modelLibrary__.validate()
+
+    return __modelLibrary__
+
+
+def getPathKey(filePos):
+    ''' relative path -> key of the index (separators and case as used by the system) '''
+    return os.path.normcase(os.path.normpath(filePos.strip().replace('\\', '/').lstrip('/')))
+
+
+def isModelFile(fileName):
+    return os.path.splitext(fileName)[1].lower() in __modelExtensions__
+
+
+def findModelFile(filePos):
+    ''' path with/without extension -> [True, path] or [False, False], without the index (absolute paths) '''
+    if os.path.splitext(filePos)[1].lower() in __modelExtensions__:
+        if os.path.isfile(filePos):
+            return [True, filePos]
+        return [False, False]
+    #
+    [directory, name] = os.path.split(filePos)
+    try:
+        files = sorted([i for i in os.listdir(directory) if isModelFile(i) and os.path.splitext(i)[0] == name])
+    except OSError:
+        return [False, False]
+
+    for i in ['i', 's']:  # IGES first
+        for j in files:
+            if os.path.splitext(j)[1][1].lower() == i:
+                return [True, os.path.join(directory, j)]
+
+    return [False, False]
+
+
+class modelLibrary(object):
+    def __init__(self, roots, path):
+        self.roots = roots
+        self.path = path  # index file
+        self.index = {'version': __indexVersion__, 'roots': {}}  # root: {directory: [mtime, [model files], [subdirectories]]}
+        self.files = {}  # root: {key: path}
+        self.stems = {}  # root: {key without extension: {'i': path, 's': path}}
+        self.checked = 0
+        #
+        self.loadIndex()
+        for i in self.roots:
+            self.buildLookup(i)
+
+    def loadIndex(self):
+        try:
+            if os.path.exists(self.path):
+                with builtins.open(self.path, "r") as plik:
+                    index = json.load(plik)
+
+                if index.get('version') == __indexVersion__:
+                    self.index = index
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Model library index is damaged and will be recreated. {0}\n".format(e))
+
+    def saveIndex(self):
+        try:
+            if not os.path.exists(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+
+            with builtins.open(self.path + ".tmp", "w") as plik:
+                json.dump(self.index, plik)
+
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(self.path + ".tmp", self.path)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("Model library: {0}\n".format(e))
+
+    def scanDirectory(self, dirs, root, directory, visited=None):
+        ''' reads one directory (and new subdirectories) - returns True if something has changed
+            visited - {real path: directory} of directories already read (symlinks to parent directories) '''
+        fullPath = os.path.join(root, directory)
+        if visited is None:
+            visited = dict([[os.path.realpath(os.path.join(root, i)), i] for i in dirs.keys()])
+        realPath = os.path.realpath(fullPath)
+        if visited.get(realPath, directory) != directory:  # already read as another directory
+            return self.removeDirectory(dirs, directory)
+        visited[realPath] = directory
+        #
+        try:
+            mtime = os.stat(fullPath).st_mtime
+            if hasattr(os, "scandir"):  # file types without additional stat() calls
+                entries = [[i.name, i.is_dir()] for i in os.scandir(fullPath)]
+            else:
+                entries = [[i, os.path.isdir(os.path.join(fullPath, i))] for i in os.listdir(fullPath)]
+
+            files = sorted([i for [i, isDir] in entries if not isDir and isModelFile(i)])
+            subdirectories = sorted([i for [i, isDir] in entries if isDir and visited.get(os.path.realpath(os.path.join(fullPath, i)), os.path.join(directory, i)) == os.path.join(directory, i)])
+        except OSError:  # directory was removed
+            return self.removeDirectory(dirs, directory)
+        #
+        old = dirs.get(directory)
+        dirs[directory] = [mtime, files, subdirectories]
+
+        if old:
+            for i in old[2]:
+                if not i in subdirectories:
+                    self.removeDirectory(dirs, os.path.join(directory, i))
+        for i in subdirectories:
+            if not os.path.join(directory, i) in dirs:
+                self.scanDirectory(dirs, root, os.path.join(directory, i), visited)
+
+        return old is None or old[1] != files or old[2] != subdirectories or old[0] != mtime
+
+    def removeDirectory(self, dirs, directory):
+        if not directory in dirs:
+            return False
+        #
+        for i in dirs.pop(directory)[2]:
+            self.removeDirectory(dirs, os.path.join(directory, i))
+
+        return True
+
+    def validate(self):
+        ''' reads again directories with changed mtime, new libraries are scanned '''
+        changed = False
+        #
+        for root in self.roots:
+            if not root in self.index['roots']:
+                self.index['roots'][root] = {}
+
+            dirs = self.index['roots'][root]
+            rootChanged = False
+            if not len(dirs):
+                rootChanged = os.path.isdir(root) and self.scanDirectory(dirs, root, '')
+            else:
+                for directory in list(dirs.keys()):
+                    if not directory in dirs:  # removed with the parent directory
+                        continue
+                    try:
+                        mtime = os.stat(os.path.join(root, directory)).st_mtime
+                    except OSError:
+                        mtime = None
+
+                    if mtime != dirs[directory][0] and self.scanDirectory(dirs, root, directory):
+                        rootChanged = True
+
+            if rootChanged or not root in self.files:
+                self.buildLookup(root)
+            changed = changed or rootChanged
+        #
+        self.checked = time.time()
+        if changed:
+            self.saveIndex()
+
+    def buildLookup(self, root):
+        files = {}
+        stems = {}
+        #
+        for [directory, [mtime, names, subdirectories]] in self.index['roots'].get(root, {}).items():
+            for i in names:
+                path = os.path.join(root, directory, i)
+                files[getPathKey(os.path.join(directory, i))] = path
+
+                [stem, extension] = os.path.splitext(os.path.join(directory, i))
+                stem = getPathKey(stem)
+                if not stem in stems:
+                    stems[stem] = {}
+                extension = extension[1].lower()  # i - IGES, s - STEP
+                if not extension in stems[stem] or path < stems[stem][extension]:
+                    stems[stem][extension] = path
+        #
+        self.files[root] = files
+        self.stems[root] = stems
+
+    def isChanged(self, filePos):
+        ''' True if the directory of the model (or its nearest indexed parent) changed since the last scan '''
+        directory = os.path.normpath(os.path.dirname(filePos.strip().replace('\\', '/').lstrip('/')))
+        if directory == '.':
+            directory = ''
+        #
+        for root in self.roots:
+            dirs = self.index['roots'].get(root, {})
+            if not len(dirs):
+                if os.path.isdir(root):  # new library
+                    return True
+                continue
+
+            path = directory
+            while not path in dirs and path != '':
+                path = os.path.dirname(path)
+            try:
+                if os.stat(os.path.join(root, path)).st_mtime != dirs[path][0]:
+                    return True
+            except (OSError, KeyError):
+                return True
+
+        return False
+
+    def find(self, filePos):
+        ''' returns [True, path] or [False, False] - the first library with the model wins
+            on a miss libraries are checked again if the directory of the model has changed '''
+        filePos = filePos.strip()
+        if filePos == '':
+            return [False, False]
+        elif os.path.isabs(filePos):
+            return findModelFile(filePos)
+        #
+        result = self.findInLibraries(filePos)
+        if not result[0] and self.isChanged(filePos):
+            self.validate()
+            result = self.findInLibraries(filePos)
+
+        return result
+
+    def findInLibraries(self, filePos):
+        key = getPathKey(filePos)
+        withExtension = os.path.splitext(filePos)[1].lower() in __modelExtensions__
+
+        for root in self.roots:
+            if withExtension:
+                if key in self.files.get(root, {}):
+                    return [True, self.files[root][key]]
+            else:
+                stem = self.stems.get(root, {}).get(key, {})
+                for i in ['i', 's']:  # IGES first
+                    if i in stem:
+                        return [True, stem[i]]
+
+        return [False, False]
+
+    def getStats(self):
+        return {
+            'path': self.path,
+            'roots': len(self.roots),
+            'directories': sum([len(self.index['roots'].get(i, {})) for i in self.roots]),
+            'files': sum([len(self.files.get(i, {})) for i in self.roots]),
+        }
@@ -641,6 +641,11 @@ class layerSilkObject(objectWire):
         self.side = 1  # 0-bottom   1-top   2-both
         self.cleanShape = None
         self.signalsList = {}
+        self.padShapes = {}  # key: [wire, {extrude vector: solid}]
+        self.lastPad = None
+        self.tracks = {}  # (net, signal, width): [segment, ...]
+        self.copperIndex = None  # set by setCopperIndex()
+        self.offsetShapes = {}
         obj.Proxy = self
     
     def __getstate__(self):
@@ -659,6 +664,11 @@ class layerSilkObject(objectWire):
         self.spisObiektowTXT = self.cleanShape.Solids
         
         self.signalsList = state[5]
+        self.padShapes = {}
+        self.lastPad = None
+        self.tracks = {}
+        self.copperIndex = None
+        self.offsetShapes = {}
 
     def addLine(self, x1, y1, x2, y2):
         if x1 == x2 and y1 == y2:
@@ -691,15 +701,15 @@ class layerSilkObject(objectWire):
             return
         else:
             if w > 0:
-                object_1 = Part.Circle(FreeCAD.Vector(xs, ys), FreeCAD.Vector(0, 0, 1), r + w / 2.)
-            else:
-                object_1 = Part.Circle(FreeCAD.Vector(xs, ys), FreeCAD.Vector(0, 0, 1), r)
-                
-            mainObj = Part.Shape([object_1])
-            mainObj = Part.Wire(mainObj.Edges)
+                r += w / 2.
+            
+            key = ('circle', round(r, 6))
+            if not key in self.padShapes.keys():
+                object_1 = Part.Circle(FreeCAD.Vector(0, 0), FreeCAD.Vector(0, 0, 1), r)
+                self.setPadShape(key, [object_1])
             # if w > 0:
                 # mainObj = self.cutHole(mainObj, [xs, ys, r - w / 2.])
-            self.spisObiektowTXT.append(mainObj)
+            self.addPadInstance(key, xs, ys)
 
     def addArc3P(self, p1, p2, p3):
         self.spisObiektowTXT[-1]['objects'].append(['arc3P', p1, p2, p3])
@@ -743,7 +753,11 @@ class layerSilkObject(objectWire):
         if not height:
             height = self.defHeight
         
-        self.spisObiektowTXT[-1] = self.makeFace(self.spisObiektowTXT[-1], height, extrude)
+        if extrude and self.lastPad and self.lastPad[1] is self.spisObiektowTXT[-1]:
+            self.spisObiektowTXT[-1] = self.makePadFace(self.lastPad[0], self.spisObiektowTXT[-1].Placement, height)
+        else:
+            self.spisObiektowTXT[-1] = self.makeFace(self.spisObiektowTXT[-1], height, extrude)
+        self.lastPad = None
         #
         if signalName:
             shapeID = len(self.spisObiektowTXT) - 1
@@ -765,38 +779,85 @@ class layerSilkObject(objectWire):
             if not shapeID in self.signalsList.keys():
                 self.signalsList[shapeID] = signalName
     
+    def setCopperIndex(self, objects):
+        ''' objects: [[solid, signalName], ...] - copper that polygons are isolated from (built once per layer)
+            None - releases index and cached offset shapes '''
+        self.copperIndex = None
+        self.offsetShapes = {}  # (solid number, isolate): offset shape
+        if objects is None:
+            return
+        #
+        self.copperIndex = []
+        for [solid, signalName] in objects:
+            try:
+                if solid.isValid():
+                    self.copperIndex.append([solid, solid.BoundBox, signalName])
+            except Exception as e:
+                print(e)
+    
+    def getCopperCandidates(self, obj, signalName, isolate):
+        box = obj.BoundBox
+        #
+        for i in range(0, len(self.copperIndex)):
+            [solid, solidBox, solidSignal] = self.copperIndex[i]
+            #
+            if solidSignal == signalName:
+                continue
+            elif solidBox.XMax + isolate < box.XMin or solidBox.XMin - isolate > box.XMax:
+                continue
+            elif solidBox.YMax + isolate < box.YMin or solidBox.YMin - isolate > box.YMax:
+                continue
+            elif solidBox.ZMax + isolate < box.ZMin or solidBox.ZMin - isolate > box.ZMax:
+                continue
+            
+            yield i
+    
+    def getOffsetShape(self, number, isolate):
+        if not (number, isolate) in self.offsetShapes.keys():
+            a = self.copperIndex[number][0].makeOffsetShape(isolate, 0.01, join=0)
+            if a.isNull():
+                a = None
+            self.offsetShapes[(number, isolate)] = a
+        
+        return self.offsetShapes[(number, isolate)]
+    
     def cutOffPaths(self, obj, signalName, isolate=0.406):
+        if self.copperIndex is None:  # no index set by caller - built for this call only
+            self.setCopperIndex([[self.spisObiektowTXT[i], self.signalsList.get(i, None)] for i in range(0, len(self.spisObiektowTXT)) if self.spisObiektowTXT[i] is not obj])
+            try:
+                return self.cutOffPaths(obj, signalName, isolate)
+            finally:
+                self.setCopperIndex(None)
+        #
         data = []
-        out = []
         try:
-            for i in range(0, len(self.spisObiektowTXT)):
-                solid = self.spisObiektowTXT[i]
-                #
-                if i in self.signalsList.keys() and self.signalsList[i] == signalName:
-                    continue
-                else:
-                    if solid.isValid() and obj.distToShape(solid)[0] == 0.0:
-                        try:
-                            a = solid.makeOffsetShape(isolate, 0.01, join=0)
-                            if not a.isNull():
-                                new = obj
-                                data.append(new.cut(a))
-                                # Part.show(new.cut(a))
-                                # obj = obj.cut(a)
-                        except Exception as e:
-                            print(e)
+            for i in self.getCopperCandidates(obj, signalName, isolate):
+                if obj.distToShape(self.copperIndex[i][0])[0] == 0.0:
+                    try:
+                        a = self.getOffsetShape(i, isolate)
+                        if a:
+                            data.append(a)
+                    except Exception as e:
+                        print(e)
         except Exception as e:
             print(e)
         
         if len(data):
-            for i in range(0, len(data)):
-                a = obj
-                obj = obj.common([data[i]])
-                # Part.show(obj.common([data[i]]))
-                
-                if not len(obj.Solids):
-                    obj = a
-            
+            try:  # one cut with all offset shapes as tools
+                new = obj.cut(data)
+                if len(new.Solids):
+                    return new
+            except Exception as e:
+                print(e)
+            # fallback - cut objects one by one
+            for i in data:
+                try:
+                    new = obj.cut(i)
+                    if len(new.Solids):
+                        obj = new
+                except Exception as e:
+                    print(e)
+        
         return obj
         
     def resetColors(self, fp):
@@ -1001,12 +1062,9 @@ class layerSilkObject(objectWire):
                 ############################################################
                 try:
                     if fp.Cut == True:
-                        if FreeCAD.ActiveDocument.Board.Proxy.holesComp == None:
-                            FreeCAD.ActiveDocument.Board.Proxy.getHoles(FreeCAD.ActiveDocument.Board)
+                        holes = FreeCAD.ActiveDocument.Board.Proxy.getHolesTool(FreeCAD.ActiveDocument.Board)  # shared by all layers
                         
-                        if not FreeCAD.ActiveDocument.Board.Proxy.holesComp == None:
-                            holes = FreeCAD.ActiveDocument.Board.Proxy.holesComp.extrude(FreeCAD.Base.Vector(0, 0, FreeCAD.ActiveDocument.Board.Thickness + 2))
-                            holes.Placement.Base.z = -1
+                        if not holes == None:
                             # Part.show(holes)
                             pads = pads.cut(holes)
                 except Exception as e:
@@ -1037,20 +1095,61 @@ class layerSilkObject(objectWire):
     # shapes
     ################
     
+    def setPadShape(self, key, objects):
+        ''' pad outline created around (0, 0) - shared by all pads with the same key '''
+        mainObj = Part.Shape(objects)
+        self.padShapes[key] = [Part.Wire(mainObj.Edges), {}]
+    
+    def getShapeInstance(self, shape, placement):
+        ''' shape placed by placement - without copying geometry '''
+        if hasattr(shape, "located"):
+            return shape.located(placement)
+        
+        shape = shape.copy(False)
+        shape.Placement = placement
+        return shape
+    
+    def addPadInstance(self, key, x, y):
+        mainObj = self.getShapeInstance(self.padShapes[key][0], FreeCAD.Placement(FreeCAD.Vector(x, y, 0), FreeCAD.Rotation()))
+        
+        self.lastPad = [key, mainObj]  # setFace() will use extruded shape from cache
+        self.spisObiektowTXT.append(mainObj)
+    
+    def makePadFace(self, key, placement, height):
+        ''' makeFace() for pads - each distinct pad is extruded only once and then placed
+            (rotations/side changes are in placement, so extrusion vector is moved to pad coordinates) '''
+        if self.side == 1:  # top side
+            vector = FreeCAD.Base.Vector(0, 0, height / 1000.)
+        elif self.side == 2:  # both sides
+            vector = FreeCAD.Base.Vector(0, 0, height)
+        else:  # bottom side
+            vector = FreeCAD.Base.Vector(0, 0, -height / 1000.)
+        vector = placement.Rotation.inverted().multVec(vector)
+        #
+        solidKey = (round(vector.x, 9), round(vector.y, 9), round(vector.z, 9))
+        if not solidKey in self.padShapes[key][1].keys():
+            self.padShapes[key][1][solidKey] = Part.Face(self.padShapes[key][0]).extrude(vector)
+        
+        return self.getShapeInstance(self.padShapes[key][1][solidKey], placement)
+    
     def addRectangle(self, x1, y1, x2, y2):
         if x1 == x2 and y1 == y2:
             self.spisObiektowTXT.append(None)
             return
             # self.spisObiektowTXT[-1]['objects'].append(['skip', "point [{0}, {1}] detected instead rectangle".format(x1, y1)])
         else:
-            object_1 = self.createLine2(x1, y1, x2, y1)
-            object_2 = self.createLine2(x2, y1, x2, y2)
-            object_3 = self.createLine2(x2, y2, x1, y2)
-            object_4 = self.createLine2(x1, y2, x1, y1)
+            dx = abs(x2 - x1) / 2.
+            dy = abs(y2 - y1) / 2.
             
-            mainObj = Part.Shape([object_1, object_2, object_3, object_4])
-            mainObj = Part.Wire(mainObj.Edges)
-            self.spisObiektowTXT.append(mainObj)
+            key = ('rectangle', round(dx, 6), round(dy, 6))
+            if not key in self.padShapes.keys():
+                object_1 = self.createLine2(-dx, -dy, dx, -dy)
+                object_2 = self.createLine2(dx, -dy, dx, dy)
+                object_3 = self.createLine2(dx, dy, -dx, dy)
+                object_4 = self.createLine2(-dx, dy, -dx, -dy)
+                self.setPadShape(key, [object_1, object_2, object_3, object_4])
+            
+            self.addPadInstance(key, (x1 + x2) / 2., (y1 + y2) / 2.)
     
     def generateOctagon(self, x, y, height, width=0):
         if width == 0:
@@ -1074,21 +1173,30 @@ class layerSilkObject(objectWire):
                 [x - w_pP, y + h_pP - h_zP - h_aP, 0, x - w_pP + w_zP, y - h_pP, 0]]
     
     def addOctagon(self, x, y, diameter, width=0):
-        objects = []
-        
-        for i in self.generateOctagon(x, y, diameter, width):
-            (x1, y1, z1, x2, y2, z2) = i
-            objects.append(self.createLine2(x1, y1, x2, y2))
+        key = ('octagon', round(diameter, 6), round(width, 6))
+        if not key in self.padShapes.keys():
+            objects = []
+            
+            for i in self.generateOctagon(0, 0, diameter, width):
+                (x1, y1, z1, x2, y2, z2) = i
+                objects.append(self.createLine2(x1, y1, x2, y2))
+            
+            self.setPadShape(key, objects)
         
-        mainObj = Part.Shape(objects)
-        mainObj = Part.Wire(mainObj.Edges)
-        self.spisObiektowTXT.append(mainObj)
+        self.addPadInstance(key, x, y)
     
     def addPadLong(self, x, y, dx, dy, perc, typ=0):
         if dx == 0 or dy == 0:
             self.spisObiektowTXT.append(None)
             return
         
+        key = ('padLong', round(dx, 6), round(dy, 6), round(perc, 6), typ)
+        if not key in self.padShapes.keys():
+            self.setPadShape(key, self.createPadLong(0, 0, dx, dy, perc, typ))
+        
+        self.addPadInstance(key, x, y)
+    
+    def createPadLong(self, x, y, dx, dy, perc, typ=0):
         objects = []
         
         curve = 90.
@@ -1142,9 +1250,7 @@ class layerSilkObject(objectWire):
             p12 = self.arcMidPoint(p8, p1, curve)
             objects.append(self.createArc3P(p8, p12, p1))
         
-        mainObj = Part.Shape(objects)
-        mainObj = Part.Wire(mainObj.Edges)
-        self.spisObiektowTXT.append(mainObj)
+        return objects
     
     def addPadOffset(self, x, y, R, e):
         if R == 0:
@@ -1372,8 +1478,174 @@ class layerSilkObject(objectWire):
         self.addPlacement([x1, y1, 0], kat, [0, 0, 0])
         # return mainObj
 
+    ################
+    # tracks
+    ################
+    
+    def addTrack(self, segment, width, signalName=None, net=None):
+        ''' segment: ['line', [x1, y1], [x2, y2]] or ['arc', [x1, y1], [x2, y2], curve] (curve as in addArcWidth())
+            tracks are only collected here - setTracks() merges connected segments of one net and adds them to the layer '''
+        if width <= 0:
+            width = 0.01
+        #
+        key = (net, signalName, width)
+        if not key in self.tracks.keys():
+            self.tracks[key] = []
+        self.tracks[key].append(segment)
+    
+    def getTrackNode(self, point):
+        return (round(point[0], 5), round(point[1], 5))
+    
+    def getTrackChains(self, segments):
+        ''' connected segments -> chains [[segment number, reversed], ...]
+            chains are broken at nodes with one or more than two segments, closed chains are split into two halves '''
+        keys = []
+        nodes = {}  # node: [segment number, ...]
+        chains = []
+        visited = set()
+        #
+        for i in range(len(segments)):
+            keys.append([self.getTrackNode(segments[i][1]), self.getTrackNode(segments[i][2])])
+            
+            if keys[i][0] == keys[i][1]:
+                visited.add(i)
+                chains.append([[i, False]])
+                continue
+            
+            for j in keys[i]:
+                if not j in nodes.keys():
+                    nodes[j] = []
+                nodes[j].append(i)
+        
+        def walk(segment, node):
+            chain = []
+            
+            while True:
+                visited.add(segment)
+                reverse = keys[segment][0] != node
+                chain.append([segment, reverse])
+                node = keys[segment][0] if reverse else keys[segment][1]
+                
+                if len(nodes[node]) != 2:
+                    break
+                segment = [j for j in nodes[node] if j != segment][0]
+                if segment in visited:
+                    break
+            
+            if len(chain) > 1 and node == keys[chain[0][0]][chain[0][1]]:  # closed chain
+                chains.append(chain[:len(chain) // 2])
+                chains.append(chain[len(chain) // 2:])
+            else:
+                chains.append(chain)
+        #
+        for node in nodes.keys():
+            if len(nodes[node]) != 2:
+                for i in nodes[node]:
+                    if not i in visited:
+                        walk(i, node)
+        # loops
+        for i in range(len(segments)):
+            if not i in visited:
+                walk(i, keys[i][0])
+        #
+        return chains
+    
+    def getTrackWire(self, segments, chain):
+        ''' centre line of the chain - consecutive collinear lines are joined '''
+        points = {}  # one coordinate for every node
+        edges = []
+        length = []
+        line = None  # [start, end] of the current line
+        #
+        for [i, reverse] in chain:
+            segment = segments[i]
+            [p1, p2] = [points.setdefault(self.getTrackNode(j), j) for j in segment[1:3]]
+            if reverse:
+                [p1, p2] = [p2, p1]
+            
+            if segment[0] == 'line':
+                length.append(hypot(p2[0] - p1[0], p2[1] - p1[1]))
+                
+                if line and abs((line[1][0] - line[0][0]) * (p2[1] - p1[1]) - (line[1][1] - line[0][1]) * (p2[0] - p1[0])) < 1e-9 * (length[-1] + 1) and \
+                    (line[1][0] - line[0][0]) * (p2[0] - p1[0]) + (line[1][1] - line[0][1]) * (p2[1] - p1[1]) > 0:
+                    line[1] = p2
+                    continue
+                
+                if line:
+                    edges.append(self.createLine2(line[0][0], line[0][1], line[1][0], line[1][1]).toShape())
+                line = [p1, p2]
+            else:
+                if line:
+                    edges.append(self.createLine2(line[0][0], line[0][1], line[1][0], line[1][1]).toShape())
+                    line = None
+                
+                [p1, p2] = [segment[1], segment[2]]
+                [x3, y3] = self.arcMidPoint(p1, p2, segment[3])
+                [p1, p2] = [points[self.getTrackNode(p1)], points[self.getTrackNode(p2)]]
+                if reverse:
+                    [p1, p2] = [p2, p1]
+                
+                edges.append(self.createArc3P(p1, [x3, y3], p2).toShape())
+                length.append(edges[-1].Length)
+        
+        if line:
+            edges.append(self.createLine2(line[0][0], line[0][1], line[1][0], line[1][1]).toShape())
+        #
+        return [Part.Wire(edges), length]
+    
+    def getTrackFace(self, segments, chain, width):
+        ''' one face for the whole chain - the centre line is offset by width / 2 (round joins and ends);
+            returns None if offset fails or the result can not be the union of segment outlines '''
+        try:
+            [wire, length] = self.getTrackWire(segments, chain)
+            r = width / 2.
+            
+            outline = wire.makeOffset2D(r, 0, False, False, False).Wires
+            if len(outline) != 1 or not outline[0].isClosed():
+                return None
+            
+            face = Part.Face(outline[0])
+            if not face.isValid():
+                return None
+            elif face.Area < max(length) * width * 0.999 or face.Area > (sum(length) * width + len(length) * pi * r ** 2) * 1.001:
+                return None
+            
+            return face
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(u"getTrackFace(): {0}\n".format(e))
+            return None
+    
+    def addTrackSegment(self, segment, width, signalName=None):
+        if segment[0] == 'line':
+            self.addLineWidth(segment[1][0], segment[1][1], segment[2][0], segment[2][1], width)
+        elif not self.addArcWidth(segment[1], segment[2], segment[3], width):
+            return
+        
+        self.setFace(signalName=signalName)
+    
+    def setTracks(self):
+        ''' tracks collected by addTrack() -> one solid for each chain of connected segments of the same net/width
+            (instead of one solid for each segment) '''
+        for [net, signalName, width] in self.tracks.keys():
+            segments = self.tracks[(net, signalName, width)]
+            #
+            for chain in self.getTrackChains(segments):
+                face = None
+                if len(chain) > 1:
+                    face = self.getTrackFace(segments, chain, width)
+                
+                if face is None:
+                    for [i, reverse] in chain:
+                        self.addTrackSegment(segments[i], width, signalName)
+                else:
+                    self.spisObiektowTXT.append(face)
+                    self.setFace(signalName=signalName)
+        #
+        self.tracks = {}
+    
     def updateHoles(self, fp):
-        self.generuj(fp)
+        if getattr(fp, "Cut", True) or getattr(fp, "CutToBoard", True):  # shape of other layers does not depend on holes/board
+            self.generuj(fp)
     
     def updatePosition_Z(self, fp, thickness):
         if self.side == 1:  # top side
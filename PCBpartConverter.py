@@ -0,0 +1,278 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Conversion of STEP/IGES models to the model cache (PCBmodelCache) in headless worker processes.
+# This module is imported by the workers, so it can not depend on FreeCADGui/PySide.
+#
+import FreeCAD
+import os
+import re
+import sys
+from collections import OrderedDict
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+try:
+    import multiprocessing
+except:
+    multiprocessing = None
+#
+from PCBmodelCache import getModelCache, writeEntry
+
+
+__STPcolorEntities__ = ["CLOSED_SHELL", "MANIFOLD_SOLID_BREP", "STYLED_ITEM", "PRESENTATION_STYLE_ASSIGNMENT", "SURFACE_STYLE_USAGE",
+    "SURFACE_SIDE_STYLE", "SURFACE_STYLE_FILL_AREA", "FILL_AREA_STYLE", "FILL_AREA_STYLE_COLOUR", "COLOUR_RGB", "DRAUGHTING_PRE_DEFINED_COLOUR"]
+__STPentity__ = re.compile(r"^#([0-9]+)\s*=\s*([A-Z0-9_]+)\s*\((.*)\)$", re.DOTALL)
+__STPstatement__ = re.compile(r"((?:'(?:[^']|'')*'|[^';])+);")
+__STPtokens__ = re.compile(r"'((?:[^']|'')*)'|#([0-9]+)|(\.[A-Z0-9_]+\.)|([-+]?[0-9]+\.?[0-9]*(?:[Ee][-+]?[0-9]+)?)|([(),])|(\$|\*)|[A-Z_][A-Z0-9_]*")
+
+
+def readSTPEntities(filePath, types=None):
+    ''' streaming reader of STEP DATA section - returns {id: [type, arguments text]} (file order)
+        only entities from types list are kept (all if None) '''
+    entities = OrderedDict()
+    buffer = ""
+    #
+    with builtins.open(filePath, "r") as plik:
+        for line in plik:
+            buffer += line.strip()
+            if not buffer.endswith(";") or buffer.count("'") % 2:  # statement not finished yet
+                continue
+            #
+            for i in __STPstatement__.findall(buffer):
+                entity = __STPentity__.match(i.strip())
+                if entity and (types is None or entity.group(2) in types):
+                    entities[int(entity.group(1))] = [entity.group(2), entity.group(3)]
+            buffer = ""
+    #
+    return entities
+
+
+def parseSTPArguments(text):
+    ''' STEP arguments -> nested lists (references: int, numbers: float, strings/enums: str) '''
+    stack = [[]]
+    #
+    for i in __STPtokens__.finditer(text):
+        [string, ref, enum, number, bracket, empty] = i.groups()
+        #
+        if bracket == "(":
+            stack.append([])
+        elif bracket == ")":
+            data = stack.pop()
+            stack[-1].append(data)
+        elif bracket == ",":
+            continue
+        elif ref:
+            stack[-1].append(int(ref))
+        elif number:
+            stack[-1].append(float(number))
+        elif enum:
+            stack[-1].append(enum)
+        elif empty:
+            stack[-1].append(None)
+        elif string is not None:
+            stack[-1].append(string.replace("''", "'"))
+    #
+    return stack[0]
+
+
+def getColorsFromSTP(filePath):
+    ''' colors of faces defined in STEP file - entity table is built once, color chains
+          STYLED_ITEM -> PRESENTATION_STYLE_ASSIGNMENT -> ... -> COLOUR_RGB are resolved by lookups
+        paletaKolorow = [(R, G, B), (R, G, B), itd] '''
+    try:
+        from PCBconf import spisKolorowSTP
+    except:
+        spisKolorowSTP = {}
+    #
+    entities = readSTPEntities(filePath, __STPcolorEntities__)
+    
+    def getEntity(number, entityType):
+        if not number in entities or entities[number][0] != entityType:
+            raise ValueError("#{0} is not {1}".format(number, entityType))
+        return parseSTPArguments(entities[number][1])
+    
+    def getColor(styledItem):
+        PRESENTATION_STYLE_ASSIGNMENT = getEntity(styledItem, "STYLED_ITEM")[1][0]
+        SURFACE_STYLE_USAGE = getEntity(PRESENTATION_STYLE_ASSIGNMENT, "PRESENTATION_STYLE_ASSIGNMENT")[0][0]
+        SURFACE_SIDE_STYLE = getEntity(SURFACE_STYLE_USAGE, "SURFACE_STYLE_USAGE")[1]
+        SURFACE_STYLE_FILL_AREA = getEntity(SURFACE_SIDE_STYLE, "SURFACE_SIDE_STYLE")[1][0]
+        FILL_AREA_STYLE = getEntity(SURFACE_STYLE_FILL_AREA, "SURFACE_STYLE_FILL_AREA")[0]
+        FILL_AREA_STYLE_COLOUR = getEntity(FILL_AREA_STYLE, "FILL_AREA_STYLE")[1][0]
+        colour = getEntity(FILL_AREA_STYLE_COLOUR, "FILL_AREA_STYLE_COLOUR")[1]
+        #
+        if colour in entities and entities[colour][0] == "DRAUGHTING_PRE_DEFINED_COLOUR":
+            return spisKolorowSTP[getEntity(colour, "DRAUGHTING_PRE_DEFINED_COLOUR")[0]]
+        else:
+            return tuple(getEntity(colour, "COLOUR_RGB")[1:4])
+    # styled objects: face/solid -> STYLED_ITEM
+    styledItems = {}
+    solids = {}  # CLOSED_SHELL -> MANIFOLD_SOLID_BREP
+    for [number, [entityType, args]] in entities.items():
+        if entityType == "STYLED_ITEM":
+            args = parseSTPArguments(args)
+            if len(args) == 3 and isinstance(args[2], int) and not args[2] in styledItems:
+                styledItems[args[2]] = number
+        elif entityType == "MANIFOLD_SOLID_BREP":
+            args = parseSTPArguments(args)
+            if len(args) == 2 and isinstance(args[1], int) and not args[1] in solids:
+                solids[args[1]] = number
+    #
+    paletaKolorow = []
+    defColors = {}
+    for number in [i for i in entities.keys() if entities[i][0] == "CLOSED_SHELL"]:
+        for face in getEntity(number, "CLOSED_SHELL")[1]:
+            if face in styledItems:
+                colNum = face
+            else:
+                colNum = solids.get(number)
+                if not colNum in styledItems:
+                    raise ValueError("No color defined for face #{0}".format(face))
+            #
+            if not colNum in defColors:
+                defColors[colNum] = getColor(styledItems[colNum])
+            paletaKolorow.append(defColors[colNum])
+    #
+    return paletaKolorow
+
+
+def getShapeColors(obj):
+    ''' colors of faces of imported object - without GUI only available if document object keeps them (ShapeAppearance) '''
+    numberOfFaces = len(obj.Shape.Faces)
+    #
+    if hasattr(obj, "ViewObject") and obj.ViewObject and hasattr(obj.ViewObject, "DiffuseColor"):
+        col = list(obj.ViewObject.DiffuseColor)
+    elif hasattr(obj, "ShapeAppearance"):
+        col = [tuple(i.DiffuseColor) for i in obj.ShapeAppearance]
+    else:
+        return None
+    #
+    if len(col) == numberOfFaces:
+        return col
+    elif len(col) == 1:
+        return col * numberOfFaces
+
+    return None
+
+
+def convertModel(data):
+    ''' worker - converts one STEP/IGES model to cache entry; returns [filePath, key, size] (size = 0 if not converted) '''
+    [filePath, key, cachePath] = data
+    docName = 'importingPartsPCB_{0}'.format(os.getpid())
+    #
+    try:
+        import Part
+        import Import
+
+        doc = FreeCAD.newDocument(docName)
+        Import.insert(u"{0}".format(filePath), doc.Name)
+
+        objects = [i for i in doc.Objects if i.isDerivedFrom("Part::Feature") and not i.isDerivedFrom("Part::Compound") and not i.Shape.isNull()]
+        if not len(objects):
+            return [filePath, key, 0]
+        #
+        col = []
+        for i in objects:
+            colors = getShapeColors(i)
+            if colors is None:
+                col = None
+                break
+            col.extend(colors)
+
+        if col is None and filePath.lower().endswith(('.stp', '.step')):
+            col = getColorsFromSTP(filePath)
+        #
+        if len(objects) == 1:
+            shape = objects[0].Shape
+        else:
+            shape = Part.makeCompound([i.Shape for i in objects])
+
+        if not col or len(col) != len(shape.Faces):  # colors can be read only by ImportGui - leave it for getPartShape()
+            return [filePath, key, 0]
+
+        return [filePath, key, writeEntry(cachePath, key, shape, col)]
+    except Exception as e:
+        sys.stderr.write("convertModel(): {0} {1}\n".format(filePath, e))
+        return [filePath, key, 0]
+    finally:
+        try:
+            FreeCAD.closeDocument(docName)
+        except:
+            pass
+
+
+def getWorkerExecutable():
+    ''' python interpreter for worker processes (inside FreeCAD sys.executable points to FreeCAD binary) '''
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+    #
+    for i in [os.path.join(FreeCAD.getHomePath(), 'bin'), os.path.dirname(sys.executable)]:
+        for j in ['python.exe', 'python3', 'python']:
+            if os.path.isfile(os.path.join(i, j)):
+                return os.path.join(i, j)
+
+    return None
+
+
+def convertModels(paths, colFileVersion, processes=None):
+    ''' converts models missing in the model cache in a pool of headless worker processes
+        returns list of converted models '''
+    cache = getModelCache()
+    paths = [i for i in paths if not cache.contains(i, colFileVersion)]
+    if len(paths) < 2 or not multiprocessing or not hasattr(multiprocessing, "get_context"):
+        return []  # nothing to gain - getPartShape() will convert models one by one
+    #
+    executable = getWorkerExecutable()
+    if not executable:
+        return []
+
+    if not processes:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(paths)))
+    #
+    try:
+        context = multiprocessing.get_context('spawn')  # never fork running FreeCAD GUI
+        context.set_executable(executable)
+
+        pool = context.Pool(processes)
+        try:
+            result = pool.map(convertModel, [[i, cache.getKey(i, colFileVersion), cache.path] for i in paths], 1)
+        finally:
+            pool.close()
+            pool.join()
+    except Exception as e:
+        FreeCAD.Console.PrintWarning("convertModels(): {0}\n".format(e))
+        return []
+
+    converted = []
+    for [filePath, key, size] in result:
+        if size:
+            cache.addEntry(filePath, key, size)
+            converted.append(filePath)
+
+    return converted
@@ -29,12 +29,6 @@ import FreeCAD
 import FreeCADGui
 import Part
 import os
-import re
-try:
-    import builtins
-except:
-    import __builtin__ as builtins
-import glob
 import unicodedata
 import ImportGui
 from PySide import QtCore, QtGui
@@ -44,6 +38,10 @@ from PCBconf import *
 from PCBboard import getPCBheight
 from PCBobjects import partObject, viewProviderPartObject, partObject_E, viewProviderPartObject_E
 from PCBfunctions import wygenerujID, getFromSettings_databasePath, mathFunctions
+from PCBpartConverter import convertModels
+from PCBmodelCache import getModelCache
+from PCBmodelLibrary import getModelLibrary
+from PCBtessellationCache import registerShape
 from command.PCBgroups import *
 from command.PCBannotations import createAnnotation
 
@@ -59,6 +57,7 @@ class partsManaging(mathFunctions):
         self.allSocket = 0
         self.databaseType = databaseType
         self.colFileVersion = 3
+        self.packagesIndex = None  # [{package name: package}, {model id: model}] - see loadPackagesIndex()
     
     def adjustRotation(self, angle):
         if angle > 360 or angle < 360:  # max = 360deg; min= -360deg
@@ -93,6 +92,64 @@ class partsManaging(mathFunctions):
         ####
         return newPartObjectFC
     
+    def getPackagesSoftware(self):
+        if self.databaseType == "idf":
+            return "IDF"
+        elif self.databaseType in ['kicad', 'kicad_v4']:
+            return exportData['kicad']['name']
+        else:
+            return exportData[self.databaseType]['name']
+    
+    def loadPackagesIndex(self):
+        ''' all packages of the active software and their models are read from database in one query
+            (used by partExist()/getModelData() until clearPackagesIndex()), model libraries are checked for changes '''
+        getModelLibrary(True)  # new/removed model files
+        try:
+            self.packagesIndex = self.__SQL__.getPackagesModels(self.getPackagesSoftware())  # None on error - database is queried for every part
+        except Exception as e:
+            self.packagesIndex = None
+    
+    def clearPackagesIndex(self):
+        self.packagesIndex = None
+        getModelCache().flush()  # last use/hits of models read during import
+    
+    def findPackageModel(self, name):
+        ''' returns [package, model] (dictionaries) - [False, False] if package/model is not defined '''
+        if self.packagesIndex is not None:
+            package = self.packagesIndex[0].get(self.__SQL__.clearString(name).strip())  # the same as findPackage()
+            if not package:
+                return [False, False]
+            
+            return [package, self.getModelData(package['modelID'])]
+        #
+        package = self.__SQL__.findPackage(name, self.getPackagesSoftware())
+        if not package:
+            return [False, False]
+        
+        return [self.__SQL__.convertToTable(package), self.getModelData(package.modelID)]
+    
+    def getModelData(self, modelID):
+        ''' model as dictionary (False if model does not exist) '''
+        if self.packagesIndex is not None and modelID in self.packagesIndex[1]:
+            return self.packagesIndex[1][modelID]
+        #
+        modelData = self.__SQL__.getModelByID(modelID)
+        if modelData[0]:
+            return self.__SQL__.convertToTable(modelData[1])
+        
+        return False
+    
+    def convertPartModels(self, packages):
+        ''' pre-pass: converts all models needed by packages to the model cache (PCBmodelCache) in worker processes '''
+        paths = []
+        #
+        for i in packages:
+            fileData = self.partExist(i, u"", False)
+            if fileData[0] and not fileData[1] in paths:
+                paths.append(fileData[1])
+        #
+        return convertModels(paths, self.colFileVersion)
+    
     def getPartShape(self, filePath, step_model, colorizeElements):
         standardColor = [(0.800000011920929, 0.800000011920929, 0.800000011920929, 0.0)]  # standard gray color
         ################################################################
@@ -113,48 +170,33 @@ class partsManaging(mathFunctions):
             self.objColors[filePath] = {}
         ################################################################
         ################################################################
-        # reading data from colFile - if exist
+        # reading data from model cache - if exist
         ################################################################
         ################################################################
-        colFile = os.path.join(os.path.dirname(filePath), os.path.splitext(os.path.basename(filePath))[0] + '.col')
-        #FreeCAD.Console.PrintWarning("3. {0}\n".format(colFile))
+        cache = getModelCache()
+        data = cache.get(filePath, self.colFileVersion)
         
-        try:
-            if os.path.exists(colFile):
-                colFileData = builtins.open(colFile, "r").readlines()
-                header = colFileData[0].strip().split("|")
-                
-                if len(header) >= 2 and int(header[0]) == self.colFileVersion and str(os.path.getmtime(filePath)) == header[1]:
-                    newShape = Part.Shape()
-                    newShape.importBrepFromString("".join(colFileData[2:]))
-                    step_model.Shape = newShape
-                    
-                    if colorizeElements:
-                        step_model.ViewObject.DiffuseColor = eval(colFileData[1].strip())
-                    else:
-                        step_model.ViewObject.DiffuseColor = standardColor
-                    
-                    self.objColors[filePath]['shape'] = newShape
-                    self.objColors[filePath]['col'] = eval(colFileData[1].strip())
-                    
-                    if len(colFileData[2:]) > 20:
-                        return step_model
-                else:
-                    FreeCAD.Console.PrintWarning("Too old *.col file. It is necessary to generate a new one.\n")
-            else:  # generate new *.col file
-                FreeCAD.Console.PrintWarning("No *.col file. It is necessary to generate a new one.\n")
-        except Exception as e:
-            FreeCAD.Console.PrintWarning("1. {0}\n".format(e))
+        if data:
+            [newShape, col] = data
+            step_model.Shape = newShape
+            
+            if colorizeElements:
+                step_model.ViewObject.DiffuseColor = col
+            else:
+                step_model.ViewObject.DiffuseColor = standardColor
+            
+            self.objColors[filePath]['shape'] = newShape
+            self.objColors[filePath]['col'] = col
+            registerShape(newShape, cache.getKey(filePath, self.colFileVersion))  # render exporters - see PCBtessellationCache
+            
+            return step_model
         ################################################################
         ################################################################
-        # generating new col file
+        # generating new cache entry
         ################################################################
         ################################################################
         active = FreeCAD.ActiveDocument.Name
         #
-        colFileData = builtins.open(colFile, "w")
-        colFileData.write("{1}|{0}\n".format(os.path.getmtime(filePath), self.colFileVersion))  # version|date
-        
         FreeCAD.newDocument('importingPartsPCB')
         FreeCAD.ActiveDocument = FreeCAD.getDocument('importingPartsPCB')
         FreeCADGui.ActiveDocument = FreeCADGui.getDocument('importingPartsPCB')
@@ -189,16 +231,14 @@ class partsManaging(mathFunctions):
             else:
                 step_model.ViewObject.DiffuseColor = standardColor
             
-            colFileData.write(str(col))
-            colFileData.write(shape.exportBrepToString())
+            cache.put(filePath, self.colFileVersion, shape, col)
+            registerShape(shape, cache.getKey(filePath, self.colFileVersion))
             
             self.objColors[filePath]['shape'] = shape
             self.objColors[filePath]['col'] = col
         except Exception as e:
             FreeCAD.Console.PrintWarning("2. {0}\n".format(e))
         
-        colFileData.close()
-        
         FreeCAD.closeDocument("importingPartsPCB")
         FreeCAD.setActiveDocument(active)
         FreeCAD.ActiveDocument=FreeCAD.getDocument(active)
@@ -328,11 +368,9 @@ class partsManaging(mathFunctions):
         fileData = self.partExist(newPart['package'], u"{0} {1} ({2})".format(partNameTXT, newPart['value'], newPart['package']))
         if fileData[0]:
             if fileData[2] > 0:
-                modelData = self.__SQL__.getModelByID(fileData[2])
+                modelData = self.getModelData(fileData[2])
                 
-                if modelData[0]:
-                    modelData = self.__SQL__.convertToTable(modelData[1])
-                else:
+                if not modelData:
                     modelData = {'sockedID': 0, 'socketIDSocket': False}
             else:
                 modelData = {'add_socket':'[False,None]'}
@@ -395,7 +433,7 @@ class partsManaging(mathFunctions):
             addSocket = False
             
             if modelData['socketIDSocket'] and self.allSocket == 0 and modelData['socketID'] != fileData[2]:
-                socketData = self.__SQL__.convertToTable(self.__SQL__.getModelByID(modelData['socketID'])[1])
+                socketData = self.getModelData(modelData['socketID'])
                 
                 if socketData["isSocket"]:
                     dial = QtGui.QMessageBox()
@@ -418,7 +456,7 @@ class partsManaging(mathFunctions):
                         addSocket = False
             #
             if (addSocket or self.allSocket == 1) and modelData['socketIDSocket']:
-                socketData = self.__SQL__.convertToTable(self.__SQL__.getModelByID(modelData['socketID'])[1])
+                socketData = self.getModelData(modelData['socketID'])
                 
                 step_model.Socket.Value = socketData["isSocketHeight"]  # socket height
                 #
@@ -740,227 +778,6 @@ class partsManaging(mathFunctions):
         else:
             return label
             
-    def getColorFromSTP(self, filePath, step_model):
-        try:
-            ################################################################
-            # paletaKolorow zawiera tablice okreslajace kolory poszczegolnych plaszczyzn
-            # paletaKolorow = [(R, G, B), (R, G, B), itd]
-            ################################################################
-            if filePath in self.objColors:
-                step_model.ViewObject.DiffuseColor = self.objColors[filePath] # ustawienie kolorow dla obiektu
-                return step_model
-            #
-            colFile = os.path.join(os.path.dirname(filePath), os.path.splitext(os.path.basename(filePath))[0] + '.col')
-            if os.path.exists(colFile):
-                colFileData = builtins.open(colFile, "r").readlines()
-                header = colFileData[0].strip().split("|")
-                
-                if len(header) >= 2 and header[0] == "2" and str(os.path.getmtime(filePath)) == header[1]:  # col file version
-                #if str(os.path.getmtime(filePath)) == colFileData[0].strip():
-                    try:
-                        step_model.ViewObject.DiffuseColor = eval(colFileData[1].strip())
-                        self.objColors[filePath] = eval(colFileData[1].strip())
-                        return step_model
-                    except:
-                        pass
-            
-            colFileData = builtins.open(colFile, "w")
-            colFileData.write("{0}\n".format(os.path.getmtime(filePath)))
-            #
-            plik = builtins.open(filePath, "r").read().replace('\r\n', '').replace('\r', '').replace('\\n', '').replace('\n', '')
-            paletaKolorow = []
-            # v2
-            defColors = {}
-            for k in re.findall("#([0-9]+) = CLOSED_SHELL\('',\((.+?)\).+?;", plik):
-                for j in k[1].split(','):
-                    try:
-                        STYLED_ITEM = re.findall("STYLED_ITEM\('color',\(#([0-9]+)\),{0}\);".format(j.strip()), plik)[0].strip()
-                        colNum = j.strip()
-                    except:
-                        part = re.search("#([0-9]+) = MANIFOLD_SOLID_BREP\('',#{0}\);".format(k[0]), plik).groups()[0]
-                        STYLED_ITEM = re.findall("STYLED_ITEM\('color',\(#([0-9]+)\),#{0}\);".format(part.strip()), plik)[0].strip()
-                        colNum = part.strip()
-                        
-                    if colNum in defColors:
-                        paletaKolorow.append(defColors[colNum])
-                        continue
-                    
-                    PRESENTATION_STYLE_ASSIGNMENT = int(re.findall("#{0} = PRESENTATION_STYLE_ASSIGNMENT[\s]?\(\([\s]?#([0-9]+?)[\s]?[,|\)]".format(STYLED_ITEM), plik)[0])
-                    SURFACE_STYLE_USAGE = int(re.findall("#{0} = SURFACE_STYLE_USAGE[\s]?\(.+?,[\s]?#(.+?)[\s]?\)[\s]?;".format(PRESENTATION_STYLE_ASSIGNMENT), plik)[0])
-                    SURFACE_SIDE_STYLE = int(re.findall("#{0} = SURFACE_SIDE_STYLE[\s]?\(.+?,\([\s]?#(.+?)[\s]?\)".format(SURFACE_STYLE_USAGE), plik)[0])
-                    SURFACE_STYLE_FILL_AREA = int(re.findall("#{0} = SURFACE_STYLE_FILL_AREA[\s]?\([\s]?#(.+?)[\s]?\)".format(SURFACE_SIDE_STYLE), plik)[0])
-                    FILL_AREA_STYLE = int(re.findall("#{0} = FILL_AREA_STYLE[\s]?\(.+?,\([\s]?#(.+?)[\s]?\)".format(SURFACE_STYLE_FILL_AREA), plik)[0])
-                    FILL_AREA_STYLE_COLOUR = int(re.findall("#{0} = FILL_AREA_STYLE_COLOUR[\s]?\(.+?,[\s]?#(.+?)[\s]?\)".format(FILL_AREA_STYLE), plik)[0])
-                    defKoloru = re.findall("#{0} = (.+?);".format(int(FILL_AREA_STYLE_COLOUR)), plik)[0]
-                    
-                    matchObj = re.match("DRAUGHTING_PRE_DEFINED_COLOUR[\s]?\([\s]?'(.*)'[\s]?\)", defKoloru)
-                    if matchObj:
-                        paletaKolorow.append(spisKolorowSTP[matchObj.groups()[0]])
-                        defColors[colNum] = spisKolorowSTP[matchObj.groups()[0]]
-                    else:
-                        matchObj = re.match("COLOUR_RGB[\s]?\([\s]?'',[\s]?(.*),[\s]?(.*),[\s]?(.*)[\s]?\)", defKoloru)
-                        if matchObj:
-                            paletaKolorow.append((float(matchObj.groups()[0]), float(matchObj.groups()[1]), float(matchObj.groups()[2])))
-                            defColors[colNum] = (float(matchObj.groups()[0]), float(matchObj.groups()[1]), float(matchObj.groups()[2]))
-            ##
-            step_model.ViewObject.DiffuseColor = paletaKolorow  # ustawienie kolorow dla obiektu
-            self.objColors[filePath] = paletaKolorow
-            colFileData.write(str(paletaKolorow))
-            colFileData.close()
-        except Exception as e:
-            FreeCAD.Console.PrintWarning(u"Error 1b: {0} \n".format(e))
-        return step_model
-
-    def getColorFromIGS(self, filePath, step_model):
-        try:
-            ################################################################
-            # paletaKolorow zawiera tablice okreslajace kolory poszczegolnych plaszczyzn
-            # paletaKolorow = [(R, G, B), (R, G, B), itd]
-            paletaKolorow = []
-            ################################################################
-            if filePath in self.objColors:
-                step_model.ViewObject.DiffuseColor = self.objColors[filePath] # ustawienie kolorow dla obiektu
-                return step_model
-            #
-            colFile = os.path.join(os.path.dirname(filePath), os.path.splitext(os.path.basename(filePath))[0] + '.col')
-            if os.path.exists(colFile):
-                colFileData = builtins.open(colFile, "r").readlines()
-                header = colFileData[0].strip().split("|")
-                
-                if len(header) >= 2 and header[0] == "2" and str(os.path.getmtime(filePath)) == header[1]:  # col file version
-                #if str(os.path.getmtime(filePath)) == colFileData[0].strip():
-                    try:
-                        step_model.ViewObject.DiffuseColor = eval(colFileData[1].strip())
-                        self.objColors[filePath] = eval(colFileData[1].strip())
-                        return step_model
-                    except:
-                        pass
-            
-            colFileData = builtins.open(colFile, "w")
-            colFileData.write("{0}\n".format(os.path.getmtime(filePath)))
-            #
-            plik = builtins.open(filePath, "r").readlines()
-            
-            stopka = plik[-1]  # stopka okresla ile lini zawiera naglowek oraz poszczegolne czesci pliku
-            dlugoscSTART = int(re.search('S.*G', stopka).group(0)[1:-1])  # S = Start Sender comments
-            dlugoscNAGLOWEK = int(re.search('G.*D', stopka).group(0)[1:-1])  # G = Global General file characteristics
-            dlugoscMAIN_1 = int(re.search('D.*P', stopka).group(0)[1:-1])  # D = Directory Entry Entity index and common attributes
-            #dlugoscMAIN_2 = int(re.search('P.*T', stopka).group(0)[1:-1])  # P = Parameter Data Entity data
-            
-            dodatkoweDane = plik[dlugoscSTART + dlugoscNAGLOWEK + dlugoscMAIN_1: -1]  # dodatkoweDane = PARAMETER DATA
-            # dane = plik[dlugoscSTART+dlugoscNAGLOWEK : dlugoscSTART+dlugoscNAGLOWEK+dlugoscMAIN_1]
-            daneKolory = plik[dlugoscSTART + dlugoscNAGLOWEK: dlugoscSTART + dlugoscNAGLOWEK + dlugoscMAIN_1]  # daneKolory = DIRECTORY ENTITY
-            
-            ################################################################
-            # niektore programy elementy grupuja w obiekcie 308 - Subfigure Definition Entity
-            # sprawdzamy czy mamy doczynienia z takim rodzajem zapisu
-            obj_308 = [pp for pp in daneKolory if re.search("^ *308.*", pp)]
-            ################################################################
-            nr = 0
-            
-            for pp in range(len(daneKolory)):
-                if len(obj_308):  # np. SolidWorks
-                    ################################################################
-                    #  408 - Singular Subfigure Instance Entity
-                    ################################################################
-                    if re.search("^ *408.*", daneKolory[pp]):
-                        if not nr:
-                            nr = 1
-                            ################################################################
-                            #  zmienna param_308 zawiera poczatkowa linie elementu 308 (spis poszczegolnych obiektow 144)
-                            #  odwolujemy sie do niej za pomoca 408
-                            nr_308 = int(re.split(" *", daneKolory[pp])[2])
-                            nr_308 = int(dodatkoweDane[nr_308 - 1].split(',')[1])
-                            nr_308 = int(re.split(" *", daneKolory[nr_308 - 1])[2])
-                            param_308 = dodatkoweDane[nr_308 - 1].split(',')[:-1]
-                            ################################################################
-                            ################################################################
-                            # zmienna param_308 zawiera poczatkowa linie elementu 308 (spis poszczegolnych obiektow 144)
-                            # param_308[3] - liczba elementow 144 zawartych w ramach jednego elementu 308
-                            # len(param_308) > 3; param_308[2] - nazwa elementu, zbyt dluga powoduje przerzucenie do nastepnej linijki
-                            #   parametru param_308[3]
-                            if len(param_308) > 3:
-                                liczba_144 = int(param_308[3])
-                                danu = [param_308[4:]]
-                                nan = nr_308
-                            else:
-                                param_308 = dodatkoweDane[nr_308].split(',')[:-1]
-                                try:
-                                    liczba_144 = int(param_308[0])
-                                    danu = [param_308[1:]]
-                                except:
-                                    liczba_144 = int(param_308[1])
-                                    danu = [param_308[2:]]
-                                nan = nr_308 + 1
-                            ################################################################
-                            ################################################################
-                            #  pobieramy poszczegolne elementy 144 zgrupowane w ramach 308
-                            for j in range(liczba_144):
-                                #param = dodatkoweDane[nan].split(',')
-                                if re.search("^.*;.*", dodatkoweDane[nan]):
-                                    danu.append(dodatkoweDane[nan].split(','))
-                                    danu[-1][-1] = danu[-1][-1].split(';')[0]
-                                    break
-                                danu.append(dodatkoweDane[nan].split(',')[:-1])
-                                nan += 1
-                            
-                            paramu = []
-                            for j in danu:
-                                paramu += j
-                            ################################################################
-                            ################################################################
-                            #  wyciagamy kolory poszczegolnych plaszczyzn
-                            for j in paramu:
-                                kolor = int(re.split(" *", daneKolory[int(j)])[3])
-                                if kolor >= 0:  # standardowy kolor IGS
-                                    paletaKolorow.append(spisKolorow[kolor])
-                                else:  # zdefiniowany w pliku kolor, 314 - Color Definition Entity
-                                    kolor = daneKolory[(kolor * -1) - 1]
-                                    kolor = int(re.split(" *", kolor)[2])
-                                    kolor = dodatkoweDane[kolor - 1].split(',')
-                                    
-                                    R = float(kolor[1]) / 100.
-                                    G = float(kolor[2]) / 100.
-                                    B = float(kolor[3]) / 100.
-                                    paletaKolorow.append((R, G, B))
-                            ################################################################
-                        else:
-                            nr = 0
-                            continue
-                ################################################################
-                #  144 - Trimmed (Parametric) Surface Entity
-                ################################################################
-                else:  # np. CATIA
-                    if re.search("^ *144.*", daneKolory[pp]):
-                        if nr:
-                            nr = 0
-                            ################################################################
-                            #  wyciagamy kolory poszczegolnych plaszczyzn
-                            kolor = int(re.split(" *", daneKolory[pp])[3])
-                            if kolor >= 0:  # standardowy kolor IGS
-                                paletaKolorow.append(spisKolorow[kolor])
-                            else:  # zdefiniowany w pliku kolor, 314 - Color Definition Entity
-                                kolor = daneKolory[(kolor * -1) - 1]
-                                kolor = int(re.split(" *", kolor)[2])
-                                kolor = dodatkoweDane[kolor - 1].split(',')
-                                
-                                R = float(kolor[1]) / 100.
-                                G = float(kolor[2]) / 100.
-                                B = float(kolor[3]) / 100.
-                                paletaKolorow.append((R, G, B))
-                            ################################################################
-                        else:
-                            nr = 1
-                            continue
-            step_model.ViewObject.DiffuseColor = paletaKolorow  # ustawienie kolorow dla obiektu
-            self.objColors[filePath] = paletaKolorow
-            colFileData.write(str(paletaKolorow))
-            colFileData.close()
-        except Exception as e:
-            FreeCAD.Console.PrintWarning(u"Error 1a: {0} \n".format(e))
-        
-        return step_model
-    
     def setDatabase(self):
         self.__SQL__ = dataBase()
         self.__SQL__.connect()
@@ -970,10 +787,6 @@ class partsManaging(mathFunctions):
             return [False]
         
         try:
-            databaseType = self.databaseType
-            if databaseType in ['kicad', 'kicad_v4']:
-                databaseType = 'kicad'
-            #
             #modelInfo = getExtensionInfo(info, 'model')
             #if modelInfo:  # kicad users
                 #[found, path] = partExistPath(modelInfo['path'])
@@ -1009,16 +822,10 @@ class partsManaging(mathFunctions):
 
                     #return [True, path, '', modelSoft, -1]; 
             #################
-            if databaseType == "idf":
-                package = self.__SQL__.findPackage(package, "IDF")
-            else:
-                package = self.__SQL__.findPackage(package, exportData[databaseType]['name'])
+            [package, modelData] = self.findPackageModel(package)
             #
             if package:
-                modelData = self.__SQL__.getModelByID(package.modelID)
-                
-                if modelData[0]:
-                    modelData = self.__SQL__.convertToTable(modelData[1])
+                if modelData:
                     filePos = modelData["path3DModels"]
                     
                     # multi models definition for one part
@@ -1040,7 +847,7 @@ class partsManaging(mathFunctions):
                     ######################################
                     [boolValue, path] = partExistPath(filePos)
                     if boolValue:
-                        return [True, path, modelData['id'], self.__SQL__.convertToTable(package), modelData['categoryID']]
+                        return [True, path, modelData['id'], package, modelData['categoryID']]
                     else:
                         return [False]
                 else:
@@ -1054,38 +861,8 @@ class partsManaging(mathFunctions):
 
 
 def partExistPath(filePos):
-    #if filePos.startswith('/'):
-        #filePos = filePos[1:]
-    filePos = filePos.strip()
-    #
-    if FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("partsPaths", "").strip() != '':
-        pathsToModels = partPaths + FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("partsPaths", "").split(',')
-    else:
-        pathsToModels = partPaths
-    #
-    if filePos.endswith((".igs", ".IGS", ".Igs", ".stp", "STEP", "step", "STP")):
-        if len(glob.glob(filePos)):  # absolute path
-            return [True, glob.glob(filePos)[0]]
-        else:  # relative path - path def in partPaths (conf.py file)
-            for i in pathsToModels:
-                if i.strip() != '' and len(glob.glob(os.path.join(i.strip(), filePos))):
-                    return [True, glob.glob(os.path.join(i, filePos))[0]]
-            return [False, False]
-    else:
-        if len(glob.glob(filePos + ".[i,I]*")):  # absolute path
-            return [True, glob.glob(filePos + ".[i,I]*")[0]]
-        elif len(glob.glob(filePos + ".[s,S]*")):  # absolute path
-            return [True, glob.glob(filePos + ".[s,S]*")[0]]
-        else:  # relative path - path def in partPaths (conf.py file)
-            for i in pathsToModels:
-                if i.strip() != '':
-                    if len(glob.glob(os.path.join(i, filePos) + ".[i,I]*")):
-                        return [True, glob.glob(os.path.join(i, filePos) + ".[i,I]*")[0]]
-                    elif len(glob.glob(os.path.join(i, filePos) + ".[s,S]*")):
-                        return [True, glob.glob(os.path.join(i, filePos) + ".[s,S]*")[0]]
-            return [False, False]
-    #
-    return [False, False]
+    ''' model file for path from database - absolute or relative to one of model libraries (see PCBmodelLibrary) '''
+    return getModelLibrary().find(filePos)
 
 
 def getExtensionInfo(info, name):
@@ -0,0 +1,271 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+#
+# Tessellation of shapes shared by render exporters (POV-Ray, Kerkythea).
+#   Shapes are identified by a geometric key: SHA1 of the BREP of the shape in its local
+#   coordinates or the model cache key of the model file (registerShape(), see getPartShape()).
+#   Tessellations are kept in memory and in the cache directory:
+#   <key>_<deviation>_<version>.dat - zlib compressed marshal dump of packed arrays
+#
+import FreeCAD
+import os
+import sys
+import hashlib
+from array import array
+#
+from PCBboardCache import boardCache
+
+
+__tessellationVersion__ = 1
+__tessellationCache__ = None
+__shapeKeys__ = {}  # hashCode() of local shape: [key, shape] - shape is kept, so its hashCode() can not be reused by a new shape
+__tessellations__ = {}  # (key, deviation): [vertices, triangles, faces]
+
+
+def getTessellationCachePath():
+    path = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("tessellationCachePath", "").strip()
+    if path == '':
+        path = os.path.join(FreeCAD.getUserAppDataDir(), "PCB", "tessellationCache")
+
+    return path
+
+
+def getTessellationCache():
+    global __tessellationCache__
+
+    if __tessellationCache__ is None or __tessellationCache__.path != getTessellationCachePath():
+        __tessellationCache__ = tessellationCache(getTessellationCachePath(), FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetInt("tessellationCacheSize", 256))
+
+    return __tessellationCache__
+
+
+def packArray(data):
+    if hasattr(data, "tobytes"):
+        return data.tobytes()
+    return data.tostring()
+
+
+def unpackArray(typecode, data):
+    result = array(typecode)
+    if hasattr(result, "frombytes"):
+        result.frombytes(data)
+    else:
+        result.fromstring(data)
+
+    return result
+
+
+def getLocalHash(shape):
+    ''' hashCode() of shape without placement - equal for all objects sharing the same model shape '''
+    placement = shape.Placement
+    try:
+        shape.Placement = FreeCAD.Placement()
+        return shape.hashCode()
+    finally:
+        shape.Placement = placement
+
+
+def registerShape(shape, key):
+    ''' geometric key known without hashing of the shape (model cache key of the model file) '''
+    if len(__shapeKeys__) > 1000:
+        __shapeKeys__.clear()
+    __shapeKeys__[getLocalHash(shape)] = [key, shape]
+
+
+def getShapeKey(shape):
+    entry = __shapeKeys__.get(getLocalHash(shape))
+    #
+    if entry and entry[1].isPartner(shape):  # the same TShape (placement is not compared)
+        return entry[0]
+
+    placement = shape.Placement
+    try:
+        shape.Placement = FreeCAD.Placement()
+        key = hashlib.sha1(shape.exportBrepToString().encode('utf-8')).hexdigest()
+    finally:
+        shape.Placement = placement
+
+    registerShape(shape, key)
+    return key
+
+
+def tessellateShape(shape, deviation):
+    ''' tessellation of all faces of shape (local coordinates) - vertices shared by faces are merged '''
+    vertices = array('d')
+    verticesIndex = {}  # (x, y, z): vertex number
+    triangles = array('i')
+    faces = array('i')
+    #
+    for face in shape.Faces:
+        faces.append(len(triangles) // 3)
+
+        [points, faceTriangles] = face.tessellate(deviation)
+        numbers = []
+        for p in points:
+            point = (round(p.x, 6), round(p.y, 6), round(p.z, 6))
+            if not point in verticesIndex:
+                verticesIndex[point] = len(vertices) // 3
+                vertices.extend(point)
+            numbers.append(verticesIndex[point])
+
+        for [a, b, c] in faceTriangles:
+            triangles.extend([numbers[a], numbers[b], numbers[c]])
+    faces.append(len(triangles) // 3)
+
+    return [vertices, triangles, faces]
+
+
+def getTessellationVersion(deviation):
+    return "{0}_{1}_py{2}{3}".format(str(deviation).replace('.', '-'), __tessellationVersion__, sys.version_info[0], sys.version_info[1])
+
+
+def getCachedTessellation(key, deviation):
+    ''' tessellation from memory or from the cache directory - None if not available '''
+    if (key, deviation) in __tessellations__:
+        return __tessellations__[(key, deviation)]
+    #
+    data = getTessellationCache().get(key, getTessellationVersion(deviation))
+    if data:
+        data = [unpackArray('d', data[0]), unpackArray('i', data[1]), unpackArray('i', data[2])]
+        addTessellation(key, deviation, data, False)
+        return data
+
+    return None
+
+
+def addTessellation(key, deviation, data, save=True):
+    if len(__tessellations__) > 1000:
+        __tessellations__.clear()
+    __tessellations__[(key, deviation)] = data
+    #
+    if save:
+        getTessellationCache().put(key, getTessellationVersion(deviation), [packArray(i) for i in data])
+
+
+def getShapeTessellation(shape, deviation=1):
+    ''' returns [vertices, triangles, faces] of shape in its local coordinates (placement is not applied)
+          vertices  - array('d'): x, y, z, ...
+          triangles - array('i'): v1, v2, v3, ... (vertex numbers)
+          faces     - array('i'): number of the first triangle of each face + number of all triangles '''
+    key = getShapeKey(shape)
+    data = getCachedTessellation(key, deviation)
+    #
+    if data is None:
+        placement = shape.Placement
+        try:
+            shape.Placement = FreeCAD.Placement()
+            data = tessellateShape(shape, deviation)
+        finally:
+            shape.Placement = placement
+
+        addTessellation(key, deviation, data)
+
+    return data
+
+
+def tessellateBrep(data):
+    ''' worker - [key, BREP of shape, deviation] -> [key, packed arrays] '''
+    [key, brep, deviation] = data
+    import Part
+    #
+    shape = Part.Shape()
+    shape.importBrepFromString(brep)
+
+    return [key, [packArray(i) for i in tessellateShape(shape, deviation)]]
+
+
+def tessellateShapes(shapes, deviation=1, processes=None):
+    ''' generator of [key, tessellation] for shapes [[key, shape], ...] (in the same order)
+        tessellations missing in the cache are calculated in a pool of headless worker processes,
+        results are returned as soon as they are ready '''
+    from PCBpartConverter import multiprocessing, getWorkerExecutable
+    #
+    missing = [[key, shape] for [key, shape] in shapes if getCachedTessellation(key, deviation) is None]
+    pool = None
+    results = iter([])
+
+    if len(missing) > 1 and multiprocessing and hasattr(multiprocessing, "get_context") and getWorkerExecutable():
+        try:
+            tasks = []
+            for [key, shape] in missing:  # BREP is prepared here - FreeCAD objects can not be used by pool threads
+                placement = shape.Placement
+                try:
+                    shape.Placement = FreeCAD.Placement()
+                    tasks.append([key, shape.exportBrepToString(), deviation])
+                finally:
+                    shape.Placement = placement
+
+            if not processes:
+                processes = multiprocessing.cpu_count()
+
+            context = multiprocessing.get_context('spawn')  # never fork running FreeCAD GUI
+            context.set_executable(getWorkerExecutable())
+            pool = context.Pool(max(1, min(processes, len(tasks))))
+            results = pool.imap(tessellateBrep, tasks)
+        except Exception as e:
+            FreeCAD.Console.PrintWarning("tessellateShapes(): {0}\n".format(e))
+            pool = None
+    #
+    try:
+        for [key, shape] in shapes:
+            data = getCachedTessellation(key, deviation)
+
+            while data is None and pool:
+                try:
+                    [resultKey, result] = next(results)
+                    addTessellation(resultKey, deviation, [unpackArray('d', result[0]), unpackArray('i', result[1]), unpackArray('i', result[2])])
+                except StopIteration:
+                    break
+                except Exception as e:  # broken worker - the rest is calculated here
+                    FreeCAD.Console.PrintWarning("tessellateShapes(): {0}\n".format(e))
+                    results = iter([])
+                    break
+
+                if resultKey == key:
+                    data = getCachedTessellation(key, deviation)
+
+            if data is None:
+                data = getShapeTessellation(shape, deviation)
+
+            yield [key, data]
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+
+def getFaceTriangles(tessellation, faceNumber):
+    ''' triangles (vertex numbers) of one face '''
+    [vertices, triangles, faces] = tessellation
+
+    return triangles[faces[faceNumber] * 3:faces[faceNumber + 1] * 3]
+
+
+class tessellationCache(boardCache):
+    ''' boardCache with entries identified by geometric keys instead of file hashes '''
+    def getKey(self, shapeKey, version):
+        return "{0}_{1}".format(shapeKey, version)
@@ -37,6 +37,7 @@ import PCBrc
 from PCBobjects import *
 from PCBboard import getPCBheight
 from PCBpartManaging import partsManaging
+from PCBmodelCache import getModelCache
 from PCBdataBase import dataBase
 from command.PCBassignModel import dodajElement
 from command.PCBexplode import *
@@ -403,6 +404,19 @@ class pcbToolBar(pcbToolBarMain):
         
         scriptCmd_UpdateModels = self.createAction(u"Update models", u"Update models", ":/data/img/updateModels.png")
         QtCore.QObject.connect(scriptCmd_UpdateModels, QtCore.SIGNAL("triggered()"), self.updateModels)
+        scriptCmd_UpdateModels_2 = self.createAction(u"Update models", u"Update models", ":/data/img/updateModels.png")
+        QtCore.QObject.connect(scriptCmd_UpdateModels_2, QtCore.SIGNAL("triggered()"), self.updateModels)
+        scriptCmd_ModelCacheStats = self.createAction(u"Model cache statistics", u"Model cache statistics", ":/data/img/updateModels.png")
+        QtCore.QObject.connect(scriptCmd_ModelCacheStats, QtCore.SIGNAL("triggered()"), self.modelCacheStats)
+        scriptCmd_ModelCacheClear = self.createAction(u"Clear model cache", u"Clear model cache", ":/data/img/updateModels.png")
+        QtCore.QObject.connect(scriptCmd_ModelCacheClear, QtCore.SIGNAL("triggered()"), self.modelCacheClear)
+        
+        groupsMenu = QtGui.QMenu(self)
+        groupsMenu.addAction(scriptCmd_UpdateModels_2)
+        groupsMenu.addSeparator()
+        groupsMenu.addAction(scriptCmd_ModelCacheStats)
+        groupsMenu.addAction(scriptCmd_ModelCacheClear)
+        scriptCmd_UpdateModels.setMenu(groupsMenu)
         
         scriptCmd_DownloadModels = self.createAction(u"Download models", u"Download models", ":/data/img/downloadModels.png")
         QtCore.QObject.connect(scriptCmd_DownloadModels, QtCore.SIGNAL("triggered()"), self.downloadModels)
@@ -1002,6 +1016,22 @@ class pcbToolBar(pcbToolBarMain):
             if not FreeCADGui.Control.activeDialog():
                 FreeCADGui.Control.showDialog(updateParts())
     
+    def modelCacheStats(self):
+        ''' statistics of converted 3d models cache '''
+        stats = getModelCache().getStats()
+        #
+        if stats['hits'] + stats['misses']:
+            hitRate = 100. * stats['hits'] / (stats['hits'] + stats['misses'])
+        else:
+            hitRate = 0.
+        
+        QtGui.QMessageBox().information(self, u"Model cache statistics", 
+            u"Path: {0}\nModels: {1}\nSize: {2:.2f} MB / {3:.2f} MB\nHits: {4}\nMisses: {5}\nHit rate: {6:.1f}%".format(
+            stats['path'], stats['entries'], stats['size'] / 1048576., stats['maxSize'] / 1048576., stats['hits'], stats['misses'], hitRate))
+    
+    def modelCacheClear(self):
+        getModelCache().clear()
+    
     def downloadModels(self):
         if not FreeCADGui.Control.activeDialog():
             FreeCADGui.Control.showDialog(downloadModelW())
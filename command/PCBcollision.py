@@ -34,6 +34,7 @@ if FreeCAD.GuiUp:
     from PySide import QtCore, QtGui
     
 from PCBboard import getPCBheight
+from PCBcollisionEngine import findCollisions
 
 #***********************************************************************
 #*                            
@@ -57,9 +58,17 @@ class checkCollisionsBaseClass(QtGui.QWidget):
         self.obj = None
         self.tmpFile = None
         self.transaprency = {}
+        self.report = []  # [label 1, label 2, overlap volume, clearance]
         #
         self.createSolid = QtGui.QCheckBox(u'Create solid on exit')
         #
+        self.clearance = QtGui.QDoubleSpinBox()
+        self.clearance.setSingleStep(0.1)
+        self.clearance.setRange(0, 100)
+        self.clearance.setSuffix(" mm")
+        
+        self.usePool = QtGui.QCheckBox(u'Use worker processes')
+        #
         self.infoLabel = QtGui.QLabel("")
         #
         self.table1 = collisionObjectTable()
@@ -78,7 +87,10 @@ class checkCollisionsBaseClass(QtGui.QWidget):
         lay.addWidget(self.table1, 3, 0, 1, 1)
         lay.addWidget(QtGui.QLabel(u'Second group'), 2, 1, 1, 1)
         lay.addWidget(self.table2, 3, 1, 1, 1)
-        lay.addWidget(self.createSolid, 4, 0, 1, 2)
+        lay.addWidget(QtGui.QLabel(u'Minimum clearance'), 4, 0, 1, 1)
+        lay.addWidget(self.clearance, 4, 1, 1, 1)
+        lay.addWidget(self.usePool, 5, 0, 1, 2)
+        lay.addWidget(self.createSolid, 6, 0, 1, 2)
         #
         self.readObjects()
         self.removeRoot()
@@ -167,40 +179,72 @@ class checkCollisionsBaseClass(QtGui.QWidget):
             FreeCAD.Console.PrintWarning("No object selected in second group\n")
             return False
         #
-        obiekty_1 = [i.Shape for i in obiekty_1 if hasattr(i, "Shape")]
-        obiekty_2 = [i.Shape for i in obiekty_2 if hasattr(i, "Shape")]
+        obiekty_1 = [i for i in obiekty_1 if hasattr(i, "Shape") and not i.Shape.isNull()]
+        obiekty_2 = [i for i in obiekty_2 if hasattr(i, "Shape") and not i.Shape.isNull()]
         
         try:
-            obj1 = Part.makeCompound(obiekty_1)
-            obj2 = Part.makeCompound(obiekty_2)
-            self.obj = obj1.common(obj2)
+            if self.usePool.isChecked():
+                processes = None  # all processors
+            else:
+                processes = 0
             
-            if len(self.obj.Solids) > 0:
-                finalObject = self.createSolidObject()
-                self.tmpFile = tempfile.mkstemp("freecad-pcb")
-                f=open(self.tmpFile[1],"w")
-                f.write(finalObject.ViewObject.toString())
-                f.close()
-                FreeCAD.ActiveDocument.removeObject(finalObject.Name)
-                #
-                myInput = SoInput()
-                myInput.openFile(self.tmpFile[1])
-                fileContents = SoDB.readAll(myInput)
-                
-                self.root = SoSeparator()
-                self.root.addChild(fileContents)
-                FreeCADGui.ActiveDocument.ActiveView.getSceneGraph().addChild(self.root)
-                self.infoLabelsetText("Collision detected", 0)
+            collisions = findCollisions([i.Shape for i in obiekty_1], [i.Shape for i in obiekty_2], self.clearance.value(), processes)
+        except Exception as e:
+            self.infoLabelsetText("Error: {0}".format(e), 0)
+            FreeCAD.Console.PrintWarning("Collision detection: {0}\n".format(e))
+            return False
+        #
+        self.report = [[obiekty_1[i].Label, obiekty_2[j].Label, volume, distance] for [i, j, volume, distance, common] in collisions]
+        self.printReport()
+        
+        commonShapes = [i[4] for i in collisions if i[4]]
+        if len(commonShapes) == 0:
+            self.obj = None
+            if len(self.report):
+                self.infoLabelsetText("Clearance violations: {0}".format(len(self.report)), 0)
             else:
                 self.infoLabelsetText("No collision detected", 1)
                 FreeCAD.Console.PrintWarning("No collision detected.\n")
-                return True
-        except Exception as e:
-            self.infoLabelsetText("No collision detected", 1)
-            FreeCAD.Console.PrintWarning("No collision detected.\n")
             return True
+        #
+        if len(commonShapes) == 1:
+            self.obj = commonShapes[0]
+        else:
+            self.obj = Part.makeCompound(commonShapes)
+        
+        finalObject = self.createSolidObject()
+        self.tmpFile = tempfile.mkstemp("freecad-pcb")
+        f=open(self.tmpFile[1],"w")
+        f.write(finalObject.ViewObject.toString())
+        f.close()
+        FreeCAD.ActiveDocument.removeObject(finalObject.Name)
+        #
+        myInput = SoInput()
+        myInput.openFile(self.tmpFile[1])
+        fileContents = SoDB.readAll(myInput)
+        
+        self.root = SoSeparator()
+        self.root.addChild(fileContents)
+        FreeCADGui.ActiveDocument.ActiveView.getSceneGraph().addChild(self.root)
+        
+        if len(commonShapes) == len(self.report):
+            self.infoLabelsetText("Collisions detected: {0}".format(len(commonShapes)), 0)
+        else:
+            self.infoLabelsetText("Collisions detected: {0}, clearance violations: {1}".format(len(commonShapes), len(self.report) - len(commonShapes)), 0)
+        return True
+    
+    def printReport(self):
+        ''' one line for each pair of colliding objects '''
+        for [label1, label2, volume, distance] in self.report:
+            if volume > 0:
+                FreeCAD.Console.PrintWarning(u"Collision: {0} - {1}, overlap volume {2:.4f} mm3\n".format(label1, label2, volume))
+            else:
+                FreeCAD.Console.PrintWarning(u"Clearance: {0} - {1}, distance {2:.4f} mm\n".format(label1, label2, distance))
     
     def createSolidObject(self):
+        if self.obj is None:
+            return None
+        
         finalObject = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", "Collision")
         finalObject.Shape = self.obj
         finalObject.ViewObject.Proxy = 0
@@ -31,6 +31,7 @@ import codecs
 from PySide import QtCore, QtGui
 import datetime
 from PCBboard import getPCBheight, getHoles
+from PCBdrillPath import optimizeHoles, holesPathLength
 
 
 exportList = {
@@ -139,6 +140,8 @@ class exportHoles_Gui(QtGui.QDialog):
         self.optionsMirror_Y = QtGui.QCheckBox('Mirror Y')
         self.optionsMinimalHeader = QtGui.QCheckBox('Minimal header')
         self.optionsGroupHoles = QtGui.QCheckBox('Group holes by diameter')
+        self.optionsOptimizePath = QtGui.QCheckBox('Optimize drill path')
+        self.optionsOptimizePath.setToolTip(u'Order tools and holes to minimize rapid travel of the spindle')
         
         optionsGroupBox = QtGui.QGroupBox(u'Options')
         optionsGroupBoxLay = QtGui.QVBoxLayout(optionsGroupBox)
@@ -146,6 +149,7 @@ class exportHoles_Gui(QtGui.QDialog):
         optionsGroupBoxLay.addWidget(self.optionsMirror_Y)
         optionsGroupBoxLay.addWidget(self.optionsMinimalHeader)
         optionsGroupBoxLay.addWidget(self.optionsGroupHoles)
+        optionsGroupBoxLay.addWidget(self.optionsOptimizePath)
         optionsGroupBoxLay.addStretch(10)
         
         # buttons
@@ -202,8 +206,11 @@ class exportHoles_Gui(QtGui.QDialog):
         if self.formatList.itemData(self.formatList.currentIndex()) in ['drl']:
             self.optionsGroupHoles.setChecked(False)
             self.optionsGroupHoles.setDisabled(True)
+            self.optionsOptimizePath.setDisabled(False)
         else:
             self.optionsGroupHoles.setDisabled(False)
+            self.optionsOptimizePath.setChecked(False)
+            self.optionsOptimizePath.setDisabled(True)
         
     def accept(self):
         export = exportHoles()
@@ -224,6 +231,7 @@ class exportHoles_Gui(QtGui.QDialog):
         export.mirror_Y = self.optionsMirror_Y.isChecked()
         export.minimalHeader = self.optionsMinimalHeader.isChecked()
         export.groupHoles = self.optionsGroupHoles.isChecked()
+        export.optimizePath = self.optionsOptimizePath.isChecked()
         export.export()
         
         #super(exportHoles_Gui, self).accept()
@@ -327,6 +335,7 @@ class exportHoles:
         self.mirror_Y = False  # True/False
         self.minimalHeader = False  # True/False
         self.groupHoles = False  # True/False
+        self.optimizePath = False  # True/False - only drl
 
     def prepareX(self, value):
         value = self.setUnit(value)
@@ -371,12 +380,31 @@ class exportHoles:
         else:  # self.saveFormat == -2
             return float('{0}{1}.{2}'.format(char, value[0], value[1]))
 
+    def optimizeHoles(self, holes):
+        ''' order of tools/hits with minimal rapid travel (from zero point of the machine) '''
+        start = [0, 0]
+        if self.zeroPointDrilling == -3:  # own zero point - board coordinates of the machine origin (see prepareX/prepareY)
+            start = [self.zeroPointDrilling_X, self.zeroPointDrilling_Y]
+            if self.mirror_X:
+                start[0] *= -1
+            if self.mirror_Y:
+                start[1] *= -1
+        #
+        before = holesPathLength(holes, start)
+        holes = optimizeHoles(holes, start)
+        after = holesPathLength(holes, start)
+        #
+        FreeCAD.Console.PrintMessage("Drill path: rapid travel {0:.1f}mm -> {1:.1f}mm ({2} holes)\n".format(before, after, sum([len(i) for i in holes.values()])))
+        return holes
+
     def export(self):
         try:
             exportClass = eval(exportList[self.fileFormat]['class'])
             exportClass.fileName = self.fileName
             exportClass.filePath = self.filePath
             exportClass.holes = getHoles()
+            if self.optimizePath and self.fileFormat == 'drl':
+                exportClass.holes = self.optimizeHoles(exportClass.holes)
             exportClass.groupList = self.groupHoles
             exportClass.minimalHeader = self.minimalHeader
             exportClass.unit = self.units
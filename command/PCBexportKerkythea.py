@@ -47,42 +47,12 @@ try:
     import builtins
 except:
     import __builtin__ as builtins
-import Mesh
 from PySide import QtCore, QtGui
 import os
 import sys
-
-
-##############################################
-#
-##############################################
-class point3D:
-    def __init__(self, point):
-        self.x = "%.4f" % (point[0] * 0.001)
-        self.y = "%.4f" % (point[1] * 0.001)
-        self.z = "%.4f" % (point[2] * 0.001)
-        
-    def __str__(self):
-        return '<P xyz="{0} {1} {2}"/>'.format(self.x, self.y, self.z)
-
-    #def __eq__(self, other):
-        #if self.x == other.x and self.y == other.y and self.z == other.z:
-            #return True
-        #else:
-            #return False 
-
-
-##############################################
-#
-##############################################
-class indexListPoint3D:
-    def __init__(self, point):
-        self.i = point[0]
-        self.j = point[1]
-        self.k = point[2]
-
-    def __str__(self):
-        return '<F ijk="{0} {1} {2}"/>'.format(self.i, self.j, self.k)
+from math import sqrt
+from collections import OrderedDict
+from PCBtessellationCache import getShapeKey, tessellateShapes, getTessellationCache
 
 
 ##############################################
@@ -128,38 +98,77 @@ class Texture:
 </Object>\n'''.format(identifier=identifier, color=self.getColorSTR()))
 
 
+##############################################
+#
+##############################################
+def formatMesh(pieces):
+    ''' Triangular Mesh of Kerkythea model (coordinates in meters)
+        pieces: [[tessellation, face numbers, matrix], ...] - matrix = None for local coordinates of the shape '''
+    points = []
+    normals = []
+    indices = []
+    #
+    for [[vertices, triangles, faces], faceNumbers, matrix] in pieces:
+        pieceVertices = []
+        pieceTriangles = []
+        for i in faceNumbers:
+            numbers = {}  # tessellation vertex: vertex of piece - vertices are not shared by faces, so edges stay sharp
+            for j in range(faces[i] * 3, faces[i + 1] * 3, 3):
+                triangle = []
+                for k in triangles[j:j + 3]:
+                    if not k in numbers:
+                        numbers[k] = len(pieceVertices)
+                        p = [vertices[k * 3], vertices[k * 3 + 1], vertices[k * 3 + 2]]
+                        if matrix:
+                            p = matrix.multiply(FreeCAD.Vector(p[0], p[1], p[2]))
+                        pieceVertices.append([p[0], p[1], p[2]])
+                    triangle.append(numbers[k])
+                pieceTriangles.append(triangle)
+        # vertex normals - sum of normals of triangles of the face (weighted by area)
+        pieceNormals = [[0.0, 0.0, 0.0] for i in pieceVertices]
+        for [a, b, c] in pieceTriangles:
+            [pa, pb, pc] = [pieceVertices[a], pieceVertices[b], pieceVertices[c]]
+            u = [pb[0] - pa[0], pb[1] - pa[1], pb[2] - pa[2]]
+            v = [pc[0] - pa[0], pc[1] - pa[1], pc[2] - pa[2]]
+            n = [u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0]]
+            for k in [a, b, c]:
+                pieceNormals[k][0] += n[0]
+                pieceNormals[k][1] += n[1]
+                pieceNormals[k][2] += n[2]
+        #
+        offset = len(points)
+        points.extend(['<P xyz="%.4f %.4f %.4f"/>\n' % (p[0] * 0.001, p[1] * 0.001, p[2] * 0.001) for p in pieceVertices])
+        for n in pieceNormals:
+            length = sqrt(n[0] ** 2 + n[1] ** 2 + n[2] ** 2)
+            if length == 0:
+                normals.append('<P xyz="0 0 -1"/>\n')
+            else:
+                normals.append('<P xyz="%.4f %.4f %.4f"/>\n' % (n[0] / length, n[1] / length, n[2] / length))
+        indices.extend(['<F ijk="%d %d %d"/>\n' % (a + offset, b + offset, c + offset) for [a, b, c] in pieceTriangles])
+
+    return u'''<Object Identifier="Triangular Mesh" Label="Triangular Mesh" Name="" Type="Surface">
+<Parameter Name="Vertex List" Type="Point3D List" Value="{0}">\n{1}</Parameter>
+<Parameter Name="Normal List" Type="Point3D List" Value="{0}">\n{2}</Parameter>
+<Parameter Name="Index List" Type="Triangle Index List" Value="{3}">\n{4}</Parameter>
+</Object>\n'''.format(len(points), "".join(points), "".join(normals), len(indices), "".join(indices))
+
+
 ##############################################
 #
 ##############################################
 class Model:
     def __init__(self):
-        self.vertexList = []
-        self.normalList = []
-        self.indexList = []
+        self.parts = []  # [tessellation key, [face numbers], matrix (placement of the object)]
         
         self.name = self.wygenerujID(5, 5)
         self.material = Material()
         
-    def addFace(self, face):
-        mesh = self.meshFace(face)
-        for pp in mesh.Facets:
-            num = len(self.vertexList)
-            for kk in pp.Points:
-                self.vertexList.append(point3D(kk))
-            self.indexList.append(indexListPoint3D([num, num + 1, num + 2]))
-        
-    def meshFace(self, shape):
-        faces = []
-        triangles = shape.tessellate(1) # the number represents the precision of the tessellation
-        for tri in triangles[1]:
-            face = []
-            for i in range(3):
-                vindex = tri[i]
-                face.append(triangles[0][vindex])
-            faces.append(face)
-        m = Mesh.Mesh(faces)
-        #Mesh.show(m)
-        return m
+    def addFace(self, key, faceNumber, matrix):
+        ''' face of tessellated shape (see PCBtessellationCache) '''
+        if len(self.parts) and self.parts[-1][0] == key and self.parts[-1][2] is matrix:
+            self.parts[-1][1].append(faceNumber)
+        else:
+            self.parts.append([key, [faceNumber], matrix])
         
     def wygenerujID(self, ll, lc):
         ''' generate random model name '''
@@ -173,28 +182,26 @@ class Model:
         
         return numerID
 
-    def write(self, file):
+    def write(self, file, getTessellation, meshes):
+        ''' model with one part is written in local coordinates of the shape with frame (placement),
+            the mesh is formatted once for all instances (meshes) '''
+        if len(self.parts) == 1:
+            [key, faceNumbers, matrix] = self.parts[0]
+            
+            if not (key, tuple(faceNumbers)) in meshes:
+                meshes[(key, tuple(faceNumbers))] = formatMesh([[getTessellation(key), faceNumbers, None]])
+            mesh = meshes[(key, tuple(faceNumbers))]
+        else:
+            matrix = None
+            mesh = formatMesh([[getTessellation(key), faceNumbers, m] for [key, faceNumbers, m] in self.parts])
+        #
         file.write(u'''
-<Object Identifier="./Models/{name}" Label="Default Model" Name="{name}" Type="Model"> 
-<Object Identifier="Triangular Mesh" Label="Triangular Mesh" Name="" Type="Surface">
-<Parameter Name="Vertex List" Type="Point3D List" Value="{pointListSize}">\n'''.format(name=self.name, pointListSize=len(self.vertexList)))
-
-        for i in self.vertexList:
-            file.write('{0}\n'.format(i))
-
-        file.write(u'''</Parameter>
-<Parameter Name="Normal List" Type="Point3D List" Value="{pointListSize}">\n'''.format(pointListSize=len(self.vertexList)))
-        file.write('<P xyz="0 0 -1"/>\n' * len(self.vertexList))
-        file.write(u'''</Parameter>
-<Parameter Name="Index List" Type="Triangle Index List" Value="{indexListSize}">\n'''.format(indexListSize=len(self.indexList)))
-
-        for i in self.indexList:
-            file.write('{0}\n'.format(i))
-
-        file.write(u'''</Parameter>\n</Object>\n''')
-
+<Object Identifier="./Models/{name}" Label="Default Model" Name="{name}" Type="Model"> \n'''.format(name=self.name))
+        file.write(mesh)
         self.material.write(file)
         
+        if matrix:
+            file.write('<Parameter Name="Frame" Type="Transform" Value="{0} {1} {2} {3} {4} {5} {6} {7} {8} {9} {10} {11}"/>\n'.format(matrix.A11, matrix.A12, matrix.A13, matrix.A14 * 0.001, matrix.A21, matrix.A22, matrix.A23, matrix.A24 * 0.001, matrix.A31, matrix.A32, matrix.A33, matrix.A34 * 0.001))
         file.write('</Object>\n')
 
 
@@ -242,9 +249,22 @@ class exportTokerkythea:
     def __init__(self):
         self.models = []
         self.cameras = []
-        modelsMultiColors = False
+        self.shapes = []  # [[tessellation key, shape], ...]
+        self.modelsMultiColors = False
 
     def write(self, file, name):
+        ''' shapes are tessellated in worker processes while models are written to the file '''
+        tessellations = {}
+        tessellationsQueue = tessellateShapes(self.shapes)
+        meshes = {}  # formatted meshes of instances
+        
+        def getTessellation(key):
+            while not key in tessellations:
+                [resultKey, data] = next(tessellationsQueue)
+                tessellations[resultKey] = data
+            
+            return tessellations[key]
+        #
         try:
             file = builtins.open(file, "w")
             #
@@ -254,11 +274,11 @@ class exportTokerkythea:
                 for i, j in self.models.items():
                     file.write('<Object Identifier="./Models/{0}" Label="Default Model" Name="{0}" Type="Model">\n'.format(i.encode('utf-8')))
                     for k in j:
-                        k.write(file)
+                        k.write(file, getTessellation, meshes)
                     file.write('</Object>\n')
             else:
                 for i in self.models.values():
-                    i.write(file)
+                    i.write(file, getTessellation, meshes)
             # CAMERA
             #activeCamera = self.cameras[0][0].name
             for i in self.cameras:
@@ -269,9 +289,13 @@ class exportTokerkythea:
             #file.write('<Parameter Name="./Cameras/Active" Type="String" Value="{0}"/>\n'.format(activeCamera))
 
             self.writeFooter(file, name)
+            file.close()
         except Exception as e:
             FreeCAD.Console.PrintWarning("{0} \n".format(e))
             return
+        finally:
+            tessellationsQueue.close()
+            getTessellationCache().flush()
         
         FreeCAD.Console.PrintWarning("Export finished successfully.\n")
 
@@ -338,14 +362,19 @@ class exportToKerkytheaGui(QtGui.QWidget):
             return
         #
 
-        projectModels = {}
+        projectModels = OrderedDict()
+        shapes = OrderedDict()
         for i in projectObjects:  # objects in document
             try:
                 objectColors = i.ViewObject.DiffuseColor
                 shape = i.Shape.Faces
             except:
                 continue
-                
+            
+            key = getShapeKey(i.Shape)
+            if not key in shapes:
+                shapes[key] = i.Shape
+            matrix = i.Shape.Placement.toMatrix()
             for j in range(len(i.Shape.Faces)):  # object faces
                 # get face color
                 if len(objectColors) == len(i.Shape.Faces):
@@ -382,11 +411,12 @@ class exportToKerkytheaGui(QtGui.QWidget):
                         model.material.diffuse.toGrayscale()
                     projectModels[modelID].append(model)
                 #
-                model.addFace(i.Shape.Faces[j])
+                model.addFace(key, j, matrix)
 
         exporter = exportTokerkythea()
         exporter.modelsMultiColors = modelsMultiColors
         exporter.models = projectModels
+        exporter.shapes = list(shapes.items())
         # CAMERAS
         for i in range(self.camerasList.count()):
             item = self.camerasList.item(i)
@@ -34,110 +34,119 @@ try:
     import builtins
 except:
     import __builtin__ as builtins
-import Mesh
 from PySide import QtCore, QtGui
 import os
+from collections import OrderedDict
 from PCBpartManaging import partsManaging
+from PCBtessellationCache import getShapeKey, getShapeTessellation, getTessellationCache
 
 ##############################################
 #
 ##############################################
-def meshFace(shape):
-    faces = []
-    triangles = shape.tessellate(1) # the number represents the precision of the tessellation
-    for tri in triangles[1]:
-        face = []
-        for i in range(3):
-            vindex = tri[i]
-            face.append(triangles[0][vindex])
-        faces.append(face)
-    m = Mesh.Mesh(faces)
-    #Mesh.show(m)
-    return m
+def getFaceColors(obj):
+    ''' color of each face of the object (None if colors are not available) '''
+    try:
+        objectColors = obj.ViewObject.DiffuseColor
+        numberOfFaces = len(obj.Shape.Faces)
+    except:
+        return None
+    
+    if numberOfFaces == 0 or len(objectColors) == 0:
+        return None
+    elif len(objectColors) == numberOfFaces:
+        return [tuple(i[:3]) for i in objectColors]
+    else:
+        return [tuple(objectColors[0][:3])] * numberOfFaces
+
+
+def writeMesh(plik, tessellation, faceColors, matrix=""):
+    ''' mesh2 block - POV-Ray uses left-handed coordinates (z axis is mirrored) '''
+    [vertices, triangles, faces] = tessellation
+    
+    colors = []
+    colorsIndex = {}  # color: texture number
+    for i in faceColors:
+        if not i in colorsIndex:
+            colorsIndex[i] = len(colors)
+            colors.append(i)
+    #
+    plik.write("mesh2 {\nvertex_vectors {\n")
+    plik.write("\t{0},\n".format(len(vertices) // 3))
+    plik.write(",\n".join(["\t<{0}, {1}, {2}>".format(vertices[i], vertices[i + 1], -vertices[i + 2]) for i in range(0, len(vertices), 3)]))
+    plik.write("\n}\n\n")
+    ##################
+    plik.write("texture_list {\n")
+    plik.write("\t{0},\n".format(len(colors)))
+    plik.write("".join(["\ttexture{pigment{rgb <%.2f, %.2f, %.2f>}}\n" % (j[0], j[1], j[2]) for j in colors]))
+    plik.write("}\n")
+    ##################
+    plik.write("face_indices {\n")
+    plik.write("\t{0},\n".format(len(triangles) // 3))
+    for j in range(len(faces) - 1):
+        colorNumber = colorsIndex[faceColors[j]]
+        plik.write("".join(["\t<{0}, {1}, {2}>, {3}, \n".format(triangles[i], triangles[i + 1], triangles[i + 2], colorNumber) for i in range(faces[j] * 3, faces[j + 1] * 3, 3)]))
+    plik.write("}\n")
+    ##################
+    if matrix:
+        plik.write("{0}\n".format(matrix))
+    plik.write("\n}\n")
+
+
+def getPovRayMatrix(placement):
+    ''' FreeCAD placement -> POV-Ray matrix (for coordinates with mirrored z axis) '''
+    m = placement.toMatrix()
+    a = [[m.A11, m.A12, m.A13], [m.A21, m.A22, m.A23], [m.A31, m.A32, m.A33]]
+    mirror = [1, 1, -1]
+    a = [[a[r][c] * mirror[r] * mirror[c] for c in range(3)] for r in range(3)]
+    
+    return "matrix <{0}, {1}, {2}, {3}, {4}, {5}, {6}, {7}, {8}, {9}, {10}, {11}>".format(a[0][0], a[1][0], a[2][0], a[0][1], a[1][1], a[2][1], a[0][2], a[1][2], a[2][2], m.A14, m.A24, -m.A34)
+
 
 ##############################################
 #
 ##############################################
-def meshObjects(projectObjects):
-    if len(projectObjects) == 0:
-        FreeCAD.Console.PrintWarning("No objects found!\n")
-        return ""
-    
-    outPutString = ""
-    #
+def meshObjects(plik, projectObjects, declarationPrefix):
+    ''' models used more than once are written to the file as declarations
+        returns items of union: [tessellation, face colors, matrix] (mesh2) or "object {...}" (declared model with matrix) '''
+    models = OrderedDict()  # (shape key, colors): [[obj, face colors], ...]
     for i in projectObjects:  # objects in document
-        try:
-            objectColors = i.ViewObject.DiffuseColor
-            shape = i.Shape.Faces
-        except:
+        faceColors = getFaceColors(i)
+        if faceColors is None:
             continue
         
-        if len(i.Shape.Faces) == 0:
-            continue
+        key = (getShapeKey(i.Shape), tuple(faceColors))
+        if not key in models:
+            models[key] = []
+        models[key].append([i, faceColors])
+    #
+    items = []
+    declarations = 0
+    for objects in models.values():
+        tessellation = getShapeTessellation(objects[0][0].Shape)  # local coordinates of the model
         
-        outPutString += "mesh2 {\n"
-        ##################
-        indexList = []
-        vertexList = []
-        colorsDeclaration = {}
-        nr = 0
-        for j in range(len(i.Shape.Faces)):
-            # get face color
-            if len(objectColors) == len(i.Shape.Faces):
-                modelType = objectColors[j]
-            else:
-                modelType = objectColors[0]
-            
-            if not modelType in colorsDeclaration:
-                colorsDeclaration[modelType] = []
-            ######
-            mesh = meshFace(i.Shape.Faces[j])
-
-            for pp in mesh.Facets:
-                colorsDeclaration[modelType].append(nr)
-                nr += 1
-                
-                num = len(vertexList)
-                for kk in pp.Points:
-                    vertexList.append("\t<{0}, {1}, {2}>".format(kk[0], kk[1], -kk[2]))
-                indexList.append([num, num + 1, num + 2])
-        #
-        outPutString += "vertex_vectors {\n"
-        outPutString += "\t{0},\n".format(len(vertexList))
-        outPutString += (',\n').join(vertexList)
-        outPutString += "\n}\n\n"
-        ##################
-        outPutString += "texture_list {\n"
-        outPutString += "\t{0},\n".format(len(colorsDeclaration.keys()))
+        if len(objects) == 1:
+            items.append([tessellation, objects[0][1], getPovRayMatrix(objects[0][0].Shape.Placement)])
+            continue
         
-        for j in colorsDeclaration.keys():
-            outPutString += "\ttexture{pigment{rgb <%.2f, %.2f, %.2f>}}\n" % (j[0], j[1], j[2])
+        name = "{0}_{1}".format(declarationPrefix, declarations)
+        declarations += 1
         
-        outPutString += "}\n"
-        ##################
-        outPutString += "face_indices {\n"
-        outPutString += "\t{0},\n".format(len(vertexList) / 3)
-        for i in range(len(indexList)):
-            faceColor = [k for k, l in colorsDeclaration.items() if i in l]
-            faceColor = colorsDeclaration.keys().index(faceColor[0])
-            outPutString += "\t<{0}, {1}, {2}>, {3}, \n".format(indexList[i][0], indexList[i][1], indexList[i][2], faceColor)
+        plik.write("#declare {0} = ".format(name))
+        writeMesh(plik, tessellation, objects[0][1])
+        plik.write("\n")
         
-        outPutString += "}\n"
-        ##################
-        outPutString += "\n}\n"
+        for [obj, faceColors] in objects:
+            items.append("object {{ {0} {1} }}\n".format(name, getPovRayMatrix(obj.Shape.Placement)))
     
-    return outPutString
+    return items
 
 
 ##############################################
 #
 ##############################################
 def exportObjectToPOVRAY(fileName, objectName, projectObjects):
-    if len(projectObjects) == 0:
+    if len([i for i in projectObjects if getFaceColors(i) is not None]) == 0:
         FreeCAD.Console.PrintWarning("No objects found!\n")
-
-    outPutString = meshObjects(projectObjects)
-    if outPutString == "":
         return
     
     if not fileName.lower().endswith('inc'):
@@ -148,13 +157,13 @@ def exportObjectToPOVRAY(fileName, objectName, projectObjects):
         partsManagingC.setDatabase()
         packageData = partsManagingC.__SQL__.findPackage(objectName, "*")
 
-        if packageData[0]:
-            newX = packageData[2][2]
-            newY = packageData[2][3]
-            newZ = packageData[2][4]
-            newRX = packageData[2][5] + 90
-            newRY = packageData[2][6]
-            newRZ = packageData[2][7]
+        if packageData:
+            newX = packageData.x
+            newY = packageData.y
+            newZ = packageData.z
+            newRX = packageData.rx + 90
+            newRY = packageData.ry
+            newRZ = packageData.rz
         else:
             newX = 0
             newY = 0
@@ -181,13 +190,21 @@ def exportObjectToPOVRAY(fileName, objectName, projectObjects):
 // ////////////////////////////////////////////////////////////
 
 '''.format(fileName, objectName, objectNameFormat))
+        # models used more than once
+        items = meshObjects(plik, projectObjects, "FC_obj_{0}_model".format(objectNameFormat))
 
         plik.write('''
 #macro FC_obj_%s(value)
 union {
 ''' % objectNameFormat)
 
-        plik.write(outPutString + "\n")
+        for i in items:
+            if isinstance(i, list):
+                writeMesh(plik, *i)
+            else:
+                plik.write(i)
+        
+        plik.write("\n")
         plik.write('''}''')
         plik.write('''
     rotate<{0},{1},{2}>
@@ -197,6 +214,8 @@ union {
         plik.close()
     except Exception as e:
         FreeCAD.Console.PrintWarning("{0} \n".format(e))
+    finally:
+        getTessellationCache().flush()
         return
         
     FreeCAD.Console.PrintWarning("Export finished successfully.\n")
@@ -251,6 +251,8 @@ class PCBgluePath(layerSilkObject):
                     h = -0.01
             ##
             self.spisObiektowTXT = []
+            self.padShapes = {}
+            self.lastPad = None
             #for i in obj.Base.Geometry:
             for i in obj.Base.GeometryFacadeList:
                 if i.Construction:
@@ -191,73 +191,77 @@ class updateParts(partsManaging):
             groupParts = self.form.groupParts.isChecked()
             pcb = getPCBheight()
             ####
-            for j in range(self.form.listaElementow.count()):
-                if self.form.listaElementow.item(j).checkState() == 2:
-                    package = self.form.listaElementow.item(j).text()
+            self.loadPackagesIndex()
+            try:
+                self.convertPartModels([self.form.listaElementow.item(j).text() for j in range(self.form.listaElementow.count()) if self.form.listaElementow.item(j).checkState() == 2])
+                for j in range(self.form.listaElementow.count()):
+                    if self.form.listaElementow.item(j).checkState() == 2:
+                        package = self.form.listaElementow.item(j).text()
                     
-                    fileData = self.partExist(package, u"")
-                    ####
-                    for i in self.listOfModels[package]:
-                        if i.Proxy.Type == "PCBpart" and fileData[0]:
-                            if fileData[2] > 0:
-                                modelData = self.__SQL__.getModelByID(fileData[2])
+                        fileData = self.partExist(package, u"")
+                        ####
+                        for i in self.listOfModels[package]:
+                            if i.Proxy.Type == "PCBpart" and fileData[0]:
+                                if fileData[2] > 0:
+                                    modelData = self.getModelData(fileData[2])
                                 
-                                if modelData[0]:
-                                    modelData = self.__SQL__.convertToTable(modelData[1])
+                                    if not modelData:
+                                        modelData = {'sockedID': 0, 'socketIDSocket': False}
                                 else:
-                                    modelData = {'sockedID': 0, 'socketIDSocket': False}
-                            else:
-                                modelData = {'add_socket':'[False,None]'}
+                                    modelData = {'add_socket':'[False,None]'}
                             
-                            filePath = fileData[1]
-                            correctingValue_X = fileData[3]['x']  # pos_X
-                            correctingValue_Y = fileData[3]['y']  # pos_Y
-                            correctingValue_Z = fileData[3]['z']  # pos_Z
-                            correctingValue_RX = fileData[3]['rx']  # pos_RX
-                            correctingValue_RY = fileData[3]['ry']  # pos_RY
-                            correctingValue_RZ = fileData[3]['rz']  # pos_RZ
+                                filePath = fileData[1]
+                                correctingValue_X = fileData[3]['x']  # pos_X
+                                correctingValue_Y = fileData[3]['y']  # pos_Y
+                                correctingValue_Z = fileData[3]['z']  # pos_Z
+                                correctingValue_RX = fileData[3]['rx']  # pos_RX
+                                correctingValue_RY = fileData[3]['ry']  # pos_RY
+                                correctingValue_RZ = fileData[3]['rz']  # pos_RZ
                             
-                            #### NEW MODEL SHAPE
-                            i = self.getPartShape(filePath, i, koloroweElemnty)
-                            ################################################################
-                            # PUTTING OBJECT IN CORRECT POSITION/ORIENTATION
-                            ################################################################
-                            self.partPlacement(i, correctingValue_X, correctingValue_Y, correctingValue_Z, correctingValue_RX, correctingValue_RY, correctingValue_RZ, i.X.Value, i.Y.Value)
-                            if i.Side == "BOTTOM":
-                                i.Proxy.changeSide(i)
-                            i.Proxy.oldROT = 0
-                            i.Rot = i.Rot.Value # rot around Z
-                            i.Proxy.updatePosition_Z(i, pcb[1], True)
-                            self.addPartToGroup(groupParts, i)
-                        elif i.Proxy.Type == "PCBpart_E" and fileData[0]:
-                            newPart = self.partStandardDictionary()
-                            newPart['name'] = i.Label
-                            newPart['library'] = i.Package
-                            newPart['package'] = package
-                            newPart['value'] = i.Rot.Value
-                            newPart['x'] = i.X.Value
-                            newPart['y'] = i.Y.Value
-                            newPart['rot'] = i.Rot.Value
-                            newPart['side'] = i.Side
+                                #### NEW MODEL SHAPE
+                                i = self.getPartShape(filePath, i, koloroweElemnty)
+                                ################################################################
+                                # PUTTING OBJECT IN CORRECT POSITION/ORIENTATION
+                                ################################################################
+                                self.partPlacement(i, correctingValue_X, correctingValue_Y, correctingValue_Z, correctingValue_RX, correctingValue_RY, correctingValue_RZ, i.X.Value, i.Y.Value)
+                                if i.Side == "BOTTOM":
+                                    i.Proxy.changeSide(i)
+                                i.Proxy.oldROT = 0
+                                i.Rot = i.Rot.Value # rot around Z
+                                i.Proxy.updatePosition_Z(i, pcb[1], True)
+                                self.addPartToGroup(groupParts, i)
+                            elif i.Proxy.Type == "PCBpart_E" and fileData[0]:
+                                newPart = self.partStandardDictionary()
+                                newPart['name'] = i.Label
+                                newPart['library'] = i.Package
+                                newPart['package'] = package
+                                newPart['value'] = i.Rot.Value
+                                newPart['x'] = i.X.Value
+                                newPart['y'] = i.Y.Value
+                                newPart['rot'] = i.Rot.Value
+                                newPart['side'] = i.Side
                             
-                            newPart['EL_Name']["x"] = i.X.Value
-                            newPart['EL_Name']["y"] = i.Y.Value
-                            newPart['EL_Name']["rot"] = i.Rot.Value
-                            newPart['EL_Name']["side"] = i.Side
+                                newPart['EL_Name']["x"] = i.X.Value
+                                newPart['EL_Name']["y"] = i.Y.Value
+                                newPart['EL_Name']["rot"] = i.Rot.Value
+                                newPart['EL_Name']["side"] = i.Side
                             
-                            newPart['EL_Value']["x"] = i.X.Value
-                            newPart['EL_Value']["y"] = i.Y.Value
-                            newPart['EL_Value']["rot"] = i.Rot.Value
-                            newPart['EL_Value']["side"] = i.Side
+                                newPart['EL_Value']["x"] = i.X.Value
+                                newPart['EL_Value']["y"] = i.Y.Value
+                                newPart['EL_Value']["rot"] = i.Rot.Value
+                                newPart['EL_Value']["side"] = i.Side
                             
-                            result = self.addPart(newPart, koloroweElemnty, adjustParts, groupParts)
-                            if result[0] == 'OK':
-                                try:
-                                    FreeCAD.activeDocument().removeObject(i.Name)
-                                except:
-                                    pass
-                        else:
-                            self.addPartToGroup(groupParts, i)
+                                result = self.addPart(newPart, koloroweElemnty, adjustParts, groupParts)
+                                if result[0] == 'OK':
+                                    try:
+                                        FreeCAD.activeDocument().removeObject(i.Name)
+                                    except:
+                                        pass
+                            else:
+                                self.addPartToGroup(groupParts, i)
+                ####
+            finally:
+                self.clearPackagesIndex()
         # packages = []
         # for i in range(self.form.listaElementow.count()):
             # if self.form.listaElementow.item(i).checkState() == 2:
@@ -51,6 +51,9 @@ from command.PCBglue import createGlue
 from command.PCBconstraintAreas import createConstraintArea
 from PCBobjects import *
 
+from formats.baseModel import geometryCollector
+from formats.importReport import importReport
+from PCBboardCache import getBoardCache
 from formats.eagle import EaglePCB
 from formats.freepcb import FreePCB
 from formats.geda import gEDA_PCB
@@ -79,6 +82,8 @@ class mainPCB(partsManaging):
         self.wersjaFormatu = None
         self.tentedVias = [False, False]  # [TOP, BOTTOM]
         #self.padsHeight = [0, 0]  # [TOP, BOTTOM]
+        self.report = importReport(filename, wersjaFormatu)
+        self.lastEvents = 0
         
         if wersjaFormatu == "eagle":
             self.wersjaFormatu = EaglePCB(filename, self)
@@ -113,25 +118,38 @@ class mainPCB(partsManaging):
         
     def printInfo(self, data, dataFormat='msg'):
         if self.wersjaFormatu.dialogMAIN.debugImport.isChecked():
-            time.sleep(0.05)
-            
             if dataFormat == 'error':
                 FreeCAD.Console.PrintError(str(data))
             else:
                 FreeCAD.Console.PrintMessage(str(data))
-            
-            #QtGui.qApp.processEvents()
-            QtGui.QApplication.processEvents()
+            # refresh report view - not more often than 4 times per second
+            if time.time() - self.lastEvents > 0.25:
+                #QtGui.qApp.processEvents()
+                QtGui.QApplication.processEvents()
+                self.lastEvents = time.time()
+    
+    def saveImportReport(self, path):
+        ''' timing report of the last import - <board name>_import.json/csv '''
+        fileName = os.path.join(path, os.path.splitext(os.path.basename(self.projektBRDName))[0] + "_import")
+        try:
+            self.report.saveJSON(fileName + ".json")
+            self.report.saveCSV(fileName + ".csv")
+        except Exception as e:
+            FreeCAD.Console.PrintWarning(u"Import report: {0}\n".format(e))
     
     def generate(self, doc, newPartObjectFC):
+        self.report = importReport(self.projektBRDName, self.databaseType)
         self.printInfo('\nInitializing')
         # BOARD
-        self.generatePCB(doc, newPartObjectFC)
+        with self.report.stage('generatePCB'):
+            self.generatePCB(doc, newPartObjectFC)
         # HOLES
-        self.generateHoles(doc)
+        with self.report.stage('generateHoles'):
+            self.generateHoles(doc)
         # PARTS
         if self.wersjaFormatu.dialogMAIN.partsBox.isChecked():
-            self.importParts()
+            with self.report.stage('importParts'):
+                self.importParts()
         # LAYERS
         grp = createGroup_Layers()
         grp_2 = createGroup_Areas()
@@ -167,6 +185,7 @@ class mainPCB(partsManaging):
                     # layerNumber = int(layerNumber.split("_")[1])
                 # ################
                 self.printInfo("\nImporting layer '{0}': ".format(layerName))
+                self.report.startStage(u"{0} '{1}'".format(layerFunction, layerName))
                 try:
                     if layerFunction in ["silk", "pads", "paths"]:
                         if layerFunction == "paths":
@@ -228,11 +247,22 @@ class mainPCB(partsManaging):
                         self.addAnnotations(self.wersjaFormatu.getNormalAnnotations(), layerColor)
                 except Exception as e:
                     self.printInfo('{0}'.format(e), 'error')
+                    self.report.stopStage(True)
                 else:
                     self.printInfo('\n\tdone')
+                    self.report.stopStage()
         #
         if self.wersjaFormatu.dialogMAIN.copperImportPolygons.isChecked():
-            self.generatePolygonsOnCopperLayer(pathsLayers)
+            with self.report.stage('generatePolygonsOnCopperLayer'):
+                self.generatePolygonsOnCopperLayer(pathsLayers)
+        #
+        if self.wersjaFormatu.dialogMAIN.debugImport.isChecked():
+            FreeCAD.Console.PrintMessage(u"\n\nImport timing:\n{0}\n".format(self.report.getSummary()))
+        
+        reportPath = FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetString("importReportPath", "").strip()
+        if reportPath:
+            self.saveImportReport(reportPath)
+        getBoardCache().flush()  # hits of parsed boards
     
     def importParts(self):
         koloroweElemnty = self.wersjaFormatu.dialogMAIN.plytkaPCB_elementyKolory.isChecked()
@@ -244,22 +274,32 @@ class mainPCB(partsManaging):
         #
         self.printInfo('\nImporting parts: ')
         errors = []
+        parts = self.wersjaFormatu.getParts()
+        # packages/models for all parts - one database query
+        self.loadPackagesIndex()
+        try:
+            # converting models missing in the model cache in worker processes
+            self.convertPartModels([i["package"] for i in parts])
         
-        for i in self.wersjaFormatu.getParts():
-            self.printInfo('\n    {0} ({1}): '.format(i["name"], i["package"]))
-            result = self.addPart(i, koloroweElemnty, adjustParts, groupParts, partMinX, partMinY, partMinZ)
+            for i in parts:
+                self.printInfo('\n    {0} ({1}): '.format(i["name"], i["package"]))
+                result = self.addPart(i, koloroweElemnty, adjustParts, groupParts, partMinX, partMinY, partMinZ)
+                self.report.count('parts')
         
-            if self.wersjaFormatu.dialogMAIN.plytkaPCB_plikER.isChecked() and result[0] == 'Error':
-                partNameTXT = self.generateNewLabel(i["name"])
-                if isinstance(partNameTXT, str):
-                    partNameTXT = unicodedata.normalize('NFKD', partNameTXT).encode('ascii', 'ignore')
+                if self.wersjaFormatu.dialogMAIN.plytkaPCB_plikER.isChecked() and result[0] == 'Error':
+                    partNameTXT = self.generateNewLabel(i["name"])
+                    if isinstance(partNameTXT, str):
+                        partNameTXT = unicodedata.normalize('NFKD', partNameTXT).encode('ascii', 'ignore')
                 
-                #errors.append([partNameTXT, i['package'], i['value'], i['library']])
-                errors.append([partNameTXT, i["package"], i["value"], i["library"]])
-                self.printInfo('error', 'error')
-            else:
-                self.printInfo('done')
+                    #errors.append([partNameTXT, i['package'], i['value'], i['library']])
+                    errors.append([partNameTXT, i["package"], i["value"], i["library"]])
+                    self.report.count('partErrors')
+                    self.printInfo('error', 'error')
+                else:
+                    self.printInfo('done')
         
+        finally:
+            self.clearPackagesIndex()
         if self.wersjaFormatu.dialogMAIN.plytkaPCB_plikER.isChecked() and len(errors):
             self.generateErrorReport(errors, self.projektBRDName)
     
@@ -305,72 +345,31 @@ class mainPCB(partsManaging):
             layerNew.Cut = cutHoles
             #
             self.wersjaFormatu.getPolygonsFromCopperLayer(layerNew, [layerNumber, layerNameO], [False, False, False, True])
+            self.report.count('polygons', len(layerNew.signalsList))
             #
             pcb = getPCBheight()
-            data = []
-            # nS= None
+            copper = []
             
             for j in pcb[2].Group:
                 if hasattr(j, "Proxy") and hasattr(j.Proxy, "Type") and isinstance(j.Proxy.Type, list) and ("paths" in j.Proxy.Type or "pads" in j.Proxy.Type) and not "polygon" in j.Proxy.Type:
                     pozZ = j.Placement.Base.z
                     j.Placement.Base.z = 0
                     try:
-                        for k in range(0, len(j.Shape.Compounds[0].Solids)):
-                            solid = j.Shape.Compounds[0].Solids[k]
-                            #
-                            if k in j.Proxy.signalsList.keys() and j.Proxy.signalsList[k] == layerNew.signalsList[0][0]:
-                                continue
-                            else:
-                                if solid.isValid() and layerNew.spisObiektowTXT[0].distToShape(solid)[0] == 0.0:
-                                    try:
-                                        a = solid.makeOffsetShape(layerNew.signalsList[0][1], 0.01, join=0)
-                                        if not a.isNull():
-                                            #######################################################################
-                                            #too slow solution -> testing board 227[s]
-                                            # common = layerNew.spisObiektowTXT[0].common(a)
-                                            # layerNew.spisObiektowTXT[0] = layerNew.spisObiektowTXT[0].cut(common)
-                                            ######################################################################
-                                            #too slow solution -> testing board 183[s]
-                                            # layerNew.spisObiektowTXT[0] = layerNew.spisObiektowTXT[0].cut(a)
-                                            ######################################################################
-                                            # only cutting -> testing board 9[s]
-                                            new = layerNew.spisObiektowTXT[0]
-                                            data.append(new.cut(a))
-                                            ######################################################################
-                                            #too slow solution -> testing board 160[s]
-                                            # if not nS:
-                                                # nS = a
-                                            # else:
-                                                # nS = nS.fuse(a)
-                                            ######################################################################
-                                    except Exception as e:
-                                        print(e)
+                        solids = j.Shape.Compounds[0].Solids
+                        for k in range(0, len(solids)):
+                            copper.append([solids[k], j.Proxy.signalsList.get(k, None)])
                     except Exception as e:
                         print(e)
                     j.Placement.Base.z = pozZ
-            #
-            # layerNew.spisObiektowTXT[0] = layerNew.spisObiektowTXT[0].cut(nS)
-            if len(data):
-                pass
-                #######################################################################
-                #too slow solution -> testing board 237[s]
-                # out =[]
-                # for i in range(0, len(data)):
-                    # Part.show(data[i])
-                # for i in FreeCAD.ActiveDocument.Objects:
-                    # if i.Label.startswith("Shape"):
-                        # out.append(i)
-                # a = FreeCAD.ActiveDocument.addObject("Part::MultiCommon","Common")
-                # a.Shapes = out
-                # FreeCAD.ActiveDocument.recompute()
-                #######################################################################
-                #testing board 139[s]
-                for i in range(0, len(data)):
-                    a = layerNew.spisObiektowTXT[0]
-                    layerNew.spisObiektowTXT[0] = layerNew.spisObiektowTXT[0].common([data[i]])
-                    #Part.show(data[i])
-                    if not len(layerNew.spisObiektowTXT[0].Solids):
-                       layerNew.spisObiektowTXT[0] = a
+            # isolate polygons from copper of other signals
+            layerNew.setCopperIndex(copper)
+            for [k, [signalName, isolate]] in layerNew.signalsList.items():
+                try:
+                    layerNew.spisObiektowTXT[k] = layerNew.cutOffPaths(layerNew.spisObiektowTXT[k], signalName, isolate)
+                    self.report.count('booleans')
+                except Exception as e:
+                    print(e)
+            layerNew.setCopperIndex(None)  # release cached offset shapes
             #
             if skipEmptyLayers and not(layerS.Proxy.spisObiektowTXT):
                 self.printInfo("\n\tLayer is empty", 'error')
@@ -417,6 +416,9 @@ class mainPCB(partsManaging):
                 if layerVariant == "pads":
                     self.wersjaFormatu.getPads(layerNew, [layerNumber, layerNameO], layerSide, tentedViasLimit, tentedVias)
             #
+            self.report.count('solids', len(layerNew.spisObiektowTXT))
+            if cutHoles:
+                self.report.count('booleans')
             pcb = getPCBheight()
             #
             if skipEmptyLayers and not(layerS.Proxy.spisObiektowTXT):
@@ -475,7 +477,10 @@ class mainPCB(partsManaging):
             doc.addObject('Sketcher::SketchObject', 'PCB_Border')
             doc.PCB_Border.Placement = FreeCAD.Placement(FreeCAD.Vector(0.0, 0.0, 0.0), FreeCAD.Rotation(0.0, 0.0, 0.0, 1.0))
             #
-            self.wersjaFormatu.getPCB(doc.PCB_Border)
+            borderObject = geometryCollector(doc.PCB_Border)
+            self.wersjaFormatu.getPCB(borderObject)
+            self.report.count('geometry', len(borderObject))
+            borderObject.flush()
             #
             PCBboard = doc.addObject("Part::FeaturePython", "Board")
             PCBboardObject(PCBboard)
@@ -504,7 +509,10 @@ class mainPCB(partsManaging):
             Hmax = self.wersjaFormatu.dialogMAIN.holesMax.value()
             types = {'H':self.wersjaFormatu.dialogMAIN.plytkaPCB_otworyH.isChecked(), 'V':self.wersjaFormatu.dialogMAIN.plytkaPCB_otworyV.isChecked(), 'P':self.wersjaFormatu.dialogMAIN.plytkaPCB_otworyP.isChecked(), "IH":self.wersjaFormatu.dialogMAIN.plytkaPCB_otworyIH.isChecked()}
             
-            self.wersjaFormatu.getHoles(doc.PCB_Holes, types, Hmin, Hmax)
+            holesObject = geometryCollector(doc.PCB_Holes)
+            self.wersjaFormatu.getHoles(holesObject, types, Hmin, Hmax)
+            self.report.count('geometry', len(holesObject))
+            holesObject.flush()
             #
             doc.Board.Holes = doc.PCB_Holes
             doc.recompute()
@@ -31,9 +31,94 @@ try:
     import builtins
 except:
     import __builtin__ as builtins
-from math import sqrt
+from math import sqrt, floor
 #
 from PCBfunctions import mathFunctions
+from formats.sexpr import sexprParse
+
+
+class holesGrid(object):
+    ''' accepted holes in a uniform grid - each hole is stored in every cell touched by its bounding box '''
+    def __init__(self, cellSize=1.0):
+        self.cellSize = float(cellSize)
+        self.cells = {}  # (column, row): [hole number, ...]
+        self.holes = []  # [x, y, r]
+    
+    def __iter__(self):
+        return iter(self.holes)
+    
+    def __len__(self):
+        return len(self.holes)
+    
+    def __getitem__(self, key):
+        return self.holes[key]
+    
+    def getCells(self, x, y, r):
+        x1 = int(floor((x - r) / self.cellSize))
+        x2 = int(floor((x + r) / self.cellSize))
+        y1 = int(floor((y - r) / self.cellSize))
+        y2 = int(floor((y + r) / self.cellSize))
+        
+        return [(i, j) for i in range(x1, x2 + 1) for j in range(y1, y2 + 1)]
+    
+    def append(self, hole):
+        [x, y, r] = hole[:3]
+        #
+        self.holes.append([x, y, r])
+        for i in self.getCells(x, y, r):
+            if not i in self.cells.keys():
+                self.cells[i] = []
+            self.cells[i].append(len(self.holes) - 1)
+    
+    def intersects(self, x, y, r):
+        checked = set()
+        #
+        for i in self.getCells(x, y, r):
+            for j in self.cells.get(i, []):
+                if j in checked:
+                    continue
+                checked.add(j)
+                
+                k = self.holes[j]
+                if sqrt((x - k[0]) ** 2 + (y - k[1]) ** 2) < r + k[2]:
+                    return True
+        
+        return False
+
+
+class geometryCollector(object):
+    ''' collects geometry added by getHoles()/getPCB() and adds it to the sketch with one list-form addGeometry() call '''
+    def __init__(self, sketch):
+        self.sketch = sketch
+        self.geometry = [[], False]  # [geometry, construction mode]
+        self.groups = [self.geometry]
+    
+    def __len__(self):
+        return sum([len(i[0]) for i in self.groups])
+    
+    def addGeometry(self, geometry, construction=False):
+        if not isinstance(geometry, list):
+            geometry = [geometry]
+        #
+        if self.geometry[1] != construction:
+            if len(self.geometry[0]):
+                self.geometry = [[], construction]
+                self.groups.append(self.geometry)
+            else:
+                self.geometry[1] = construction
+        
+        self.geometry[0].extend(geometry)
+    
+    def flush(self):
+        for [geometry, construction] in self.groups:
+            if len(geometry):
+                self.sketch.addGeometry(geometry, construction)
+        #
+        self.geometry = [[], False]
+        self.groups = [self.geometry]
+        self.sketch.recompute()
+        
+        return self.sketch
 
 
 class baseModel(mathFunctions):
@@ -67,11 +152,14 @@ class baseModel(mathFunctions):
         add = True
         #
         try:
-            for k in holesList:
-                d = sqrt( (x - k[0]) ** 2 + (y - k[1]) ** 2)
-                if(d < r + k[2]):
-                    add = False
-                    break
+            if isinstance(holesList, holesGrid):
+                add = not holesList.intersects(x, y, r)
+            else:
+                for k in holesList:
+                    d = sqrt( (x - k[0]) ** 2 + (y - k[1]) ** 2)
+                    if(d < r + k[2]):
+                        add = False
+                        break
         except Exception as e:
             FreeCAD.Console.PrintWarning("1. {0}\n".format(e))
         #
@@ -81,6 +169,32 @@ class baseModel(mathFunctions):
             FreeCAD.Console.PrintWarning("Intersection between holes detected. Hole x={:.2f}, y={:.2f} will be omitted.\n".format(x, y))
             return False
     
+    def filterIntersectingHoles(self, X, Y, R, holesList=None):
+        ''' bulk version of detectIntersectingHoles() - X, Y, R: coordinates and radii of all candidate holes
+            returns numbers of the accepted holes (checked in the given order against holesList and each other) '''
+        if holesList is None:
+            holesList = holesGrid()
+        #
+        accepted = []
+        for i in range(len(X)):
+            if self.detectIntersectingHoles(holesList, X[i], Y[i], R[i]):
+                holesList.append([X[i], Y[i], R[i]])
+                accepted.append(i)
+        #
+        return accepted
+    
+    def addHolesToObject(self, holesObject, Hmin, Hmax, iH, holes, holesList):
+        ''' addHoleToObject() for a list of holes [[x, y, r], ...] '''
+        holes = [i for i in holes if self.filterHoles(i[2], Hmin, Hmax)]
+        #
+        if iH:  # detecting collisions between holes - intersections
+            holes = [holes[i] for i in self.filterIntersectingHoles([j[0] for j in holes], [j[1] for j in holes], [j[2] for j in holes], holesList)]
+        
+        if len(holes):
+            holesObject.addGeometry([Part.Circle(FreeCAD.Vector(x, y, 0.), FreeCAD.Vector(0, 0, 1), r) for [x, y, r] in holes])
+        
+        return holesList
+    
     def filterTentedVias(self, tentedViasLimit, tentedVias, drill, alwaysstop):
         if tentedVias:
             if tentedViasLimit > 0 and drill > tentedViasLimit:
@@ -127,3 +241,15 @@ class baseModel(mathFunctions):
                 start = 0
         #
         return wynik
+    
+    def setProjectTree(self, filename, loadFromFile=True):
+        ''' parse S-expression project in one pass and return the top-level form '''
+        if loadFromFile:
+            projektBRD = builtins.open(filename, "r").read()
+        else:
+            projektBRD = filename
+        #
+        data = sexprParse(projektBRD)
+        if len(data):
+            return data[0]
+        return []
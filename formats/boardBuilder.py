@@ -0,0 +1,123 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+import FreeCAD
+import Part
+#
+from formats.baseModel import baseModel
+
+#
+# Board IR (formats/boardIR.py) -> FreeCAD objects.
+#
+
+
+class boardBuilder(baseModel):
+    def __init__(self, board):
+        self.board = board
+    
+    def addPaths(self, layerNew, layer):
+        ''' tracks/arcs of the layer -> layerNew (connected segments of one net are merged by setTracks()) '''
+        for i in self.board.getTracks(layer):
+            if [i['x1'], i['y1']] != [i['x2'], i['y2']]:
+                layerNew.addTrack(['line', [i['x1'], i['y1']], [i['x2'], i['y2']]], i['width'], net=i['net'])
+        
+        for i in self.board.getArcs(layer):
+            layerNew.addTrack(['arc', [i['x1'], i['y1']], [i['x2'], i['y2']], i['curve']], i['width'], net=i['net'])
+        #
+        layerNew.setTracks()
+    
+    def addHoles(self, holesObject, types, Hmin, Hmax, holesList, nonPlated=True):
+        ''' drills -> holesObject
+            types: V - vias, P - pads, H - mounting holes, IH - skip intersecting holes
+            nonPlated: add also non-plated holes '''
+        data = []
+        if types['V']:
+            data.extend([[i['x'], i['y'], i['drill']] for i in self.board.vias])
+        #
+        for i in self.board.holes:
+            if not {'pad': types['P'], 'via': types['V']}.get(i['kind'], types['H']):
+                continue
+            if not i['plated'] and not nonPlated:
+                continue
+            
+            if i['type'] == 'oval' and i['dx'] != i['dy']:
+                self.addOvalHole(holesObject, i['x'], i['y'], i['dx'], i['dy'])
+            elif i['type'] == 'oval':
+                data.append([i['x'], i['y'], i['dx'] / 2. + 0.001])
+            else:
+                data.append([i['x'], i['y'], i['r'] + 0.001])
+        #
+        return self.addHolesToObject(holesObject, Hmin, Hmax, types['IH'], data, holesList)
+    
+    def addOvalHole(self, holesObject, x, y, dx, dy):
+        curve = 90.
+        
+        if dx > dy:
+            e = (dy * 50 / 100.) / 2.
+            x1 = x - dx / 2. + e
+            y1 = y + dy / 2.
+            x2 = x + dx / 2. - e
+            y2 = y - dy / 2.
+            
+            holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x2, y1, 0)))
+            holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y2, 0), FreeCAD.Vector(x2, y2, 0)))
+            
+            [x3, y3] = self.arcMidPoint([x1, y1], [x1, y2], curve)
+            holesObject.addGeometry(Part.Arc(FreeCAD.Vector(x1, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x1, y2, 0.0)))
+            
+            [x3, y3] = self.arcMidPoint([x2, y1], [x2, y2], -curve)
+            holesObject.addGeometry(Part.Arc(FreeCAD.Vector(x2, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y2, 0.0)))
+        else:
+            e = (dx * 50 / 100.) / 2.
+            x1 = x - dx / 2.
+            y1 = y + dy / 2. - e
+            x2 = x + dx / 2.
+            y2 = y - dy / 2. + e
+            
+            holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x1, y2, 0)))
+            holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x2, y1, 0), FreeCAD.Vector(x2, y2, 0)))
+            
+            [x3, y3] = self.arcMidPoint([x1, y1], [x2, y1], -curve)
+            holesObject.addGeometry(Part.Arc(FreeCAD.Vector(x1, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y1, 0.0)))
+            
+            [x3, y3] = self.arcMidPoint([x1, y2], [x2, y2], curve)
+            holesObject.addGeometry(Part.Arc(FreeCAD.Vector(x1, y2, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y2, 0.0)))
+    
+    def addOutline(self, borderObject):
+        geometry = []
+        #
+        for i in self.board.outline:
+            if i['type'] == 'line':
+                geometry.append(Part.LineSegment(FreeCAD.Vector(i['x1'], i['y1'], 0), FreeCAD.Vector(i['x2'], i['y2'], 0)))
+            elif i['type'] == 'circle':
+                geometry.append(Part.Circle(FreeCAD.Vector(i['x1'], i['y1']), FreeCAD.Vector(0, 0, 1), i['r']))
+            elif i['type'] == 'arc':
+                [x3, y3] = self.arcMidPoint([i['x2'], i['y2']], [i['x1'], i['y1']], -i['curve'])
+                geometry.append(Part.Arc(FreeCAD.Vector(i['x2'], i['y2'], 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(i['x1'], i['y1'], 0.0)))
+        #
+        if len(geometry):
+            borderObject.addGeometry(geometry)
@@ -0,0 +1,187 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+from array import array
+
+#
+# Board intermediate representation (IR) - everything a loader reads from the board file,
+# in workbench coordinates (mm, Y axis up). It does not depend on FreeCAD, so boards can be
+# read, measured, cached and compared on headless machines; formats/boardBuilder.py turns
+# IR into FreeCAD objects.
+#   tracks      - straight copper segments
+#   arcs        - copper arcs from (x1, y1) to (x2, y2), curve in degrees (> 0 counterclockwise)
+#   vias        - x, y, diameter, drill (radius), copper layers
+#   holes       - drills of pads (kind 'pad'), vias not listed in vias (kind 'via') and mounting holes (kind 'board'):
+#                 circle (x, y, r) or oval (x, y, dx, dy), plated or not
+#   outline     - board outline: line (x1, y1, x2, y2), arc (as copper arcs), circle (x1, y1, r)
+#   parts       - footprints placed on the board, side TOP/BOTTOM, rot as in the file
+#   pads        - copper pads of parts (part = record number in parts), x, y, rot relative to the part
+#   annotations - texts of the board (part = -1) and name/value texts of parts (kind 'reference'/'value')
+# Footprint silkscreen shapes and polygons are not part of the IR yet - loaders read them directly.
+#
+
+
+class recordTable(object):
+    ''' table with fixed columns - numbers are kept in array('d'), other values in lists '''
+    def __init__(self, columns):
+        self.columns = columns  # [[name, 'd' (number) or 'o' (object)], ...]
+        self.data = {}
+        self.indexes = {}  # column name: {value: [numbers of records]} - see getIndex()
+        self.clear()
+    
+    def clear(self):
+        self.indexes = {}
+        for [name, cType] in self.columns:
+            if cType == 'd':
+                self.data[name] = array('d')
+            else:
+                self.data[name] = []
+    
+    def __len__(self):
+        return len(self.data[self.columns[0][0]])
+    
+    def __getitem__(self, number):
+        return dict([[name, self.data[name][number]] for [name, cType] in self.columns])
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def append(self, **record):
+        self.indexes = {}
+        for [name, cType] in self.columns:
+            self.data[name].append(record.get(name, 0.0 if cType == 'd' else None))
+        
+        return len(self) - 1
+    
+    def column(self, name):
+        return self.data[name]
+    
+    def getIndex(self, name):
+        ''' {value: [numbers of records]} built once for the column (records with a list are added for each item) '''
+        if not name in self.indexes:
+            index = {}
+            for i, value in enumerate(self.data[name]):
+                for j in (value if isinstance(value, list) else [value]):
+                    if not j in index:
+                        index[j] = []
+                    index[j].append(i)
+            
+            self.indexes[name] = index
+        
+        return self.indexes[name]
+    
+    def select(self, name, value):
+        ''' numbers of records with column == value (or value in column) '''
+        return self.getIndex(name).get(value, [])
+    
+    def toData(self):
+        return dict([[name, list(self.data[name])] for [name, cType] in self.columns])
+    
+    def fromData(self, data):
+        self.clear()
+        for [name, cType] in self.columns:
+            self.data[name].extend(data[name])
+
+
+class boardIR(object):
+    def __init__(self, source='', fileFormat=''):
+        self.source = source
+        self.format = fileFormat
+        self.thickness = 0.0
+        self.layers = {}  # name: number
+        self.nets = {}  # number: name
+        #
+        self.tracks = recordTable([['x1', 'd'], ['y1', 'd'], ['x2', 'd'], ['y2', 'd'], ['width', 'd'], ['layer', 'o'], ['net', 'o']])
+        self.arcs = recordTable([['x1', 'd'], ['y1', 'd'], ['x2', 'd'], ['y2', 'd'], ['curve', 'd'], ['width', 'd'], ['layer', 'o'], ['net', 'o']])
+        self.vias = recordTable([['x', 'd'], ['y', 'd'], ['diameter', 'd'], ['drill', 'd'], ['layers', 'o'], ['net', 'o']])
+        self.holes = recordTable([['type', 'o'], ['x', 'd'], ['y', 'd'], ['r', 'd'], ['dx', 'd'], ['dy', 'd'], ['plated', 'o'], ['kind', 'o']])
+        self.outline = recordTable([['type', 'o'], ['x1', 'd'], ['y1', 'd'], ['x2', 'd'], ['y2', 'd'], ['curve', 'd'], ['r', 'd']])
+        self.parts = recordTable([['name', 'o'], ['package', 'o'], ['library', 'o'], ['value', 'o'], ['x', 'd'], ['y', 'd'], ['z', 'd'], ['rot', 'd'], ['side', 'o']])
+        self.pads = recordTable([['part', 'd'], ['x', 'd'], ['y', 'd'], ['rot', 'd'], ['type', 'o'], ['shape', 'o'], ['dx', 'd'], ['dy', 'd'], ['xOF', 'd'], ['yOF', 'd'], ['deltaX', 'd'], ['deltaY', 'd'], ['holeType', 'o'], ['drillX', 'd'], ['drillY', 'd'], ['layers', 'o'], ['net', 'o'], ['polygons', 'o']])
+        self.annotations = recordTable([['text', 'o'], ['x', 'd'], ['y', 'd'], ['size', 'd'], ['rot', 'd'], ['layer', 'o'], ['justify', 'o'], ['part', 'd'], ['kind', 'o']])
+    
+    def getTables(self):
+        return {
+            'tracks': self.tracks,
+            'arcs': self.arcs,
+            'vias': self.vias,
+            'holes': self.holes,
+            'outline': self.outline,
+            'parts': self.parts,
+            'pads': self.pads,
+            'annotations': self.annotations,
+        }
+    
+    def getStats(self):
+        ''' number of records in each table '''
+        stats = dict([[i, len(j)] for i, j in self.getTables().items()])
+        stats['layers'] = len(self.layers)
+        stats['nets'] = len(self.nets)
+        
+        return stats
+    
+    def getTracks(self, layer):
+        return [self.tracks[i] for i in self.tracks.select('layer', layer)]
+    
+    def getArcs(self, layer):
+        return [self.arcs[i] for i in self.arcs.select('layer', layer)]
+    
+    def getVias(self, layer=None):
+        if layer is None:
+            return list(self.vias)
+        return [self.vias[i] for i in self.vias.select('layers', layer)]
+    
+    def getPads(self, part):
+        return [self.pads[i] for i in self.pads.select('part', part)]
+    
+    def getAnnotations(self, part=-1, kind=None):
+        ''' texts of the board (part = -1) or of one part '''
+        return [self.annotations[i] for i in self.annotations.select('part', part) if kind is None or self.annotations.column('kind')[i] == kind]
+    
+    def toData(self):
+        ''' IR -> dictionary (only lists/numbers/strings - can be saved as JSON) '''
+        data = dict([[i, j.toData()] for i, j in self.getTables().items()])
+        data['source'] = self.source
+        data['format'] = self.format
+        data['thickness'] = self.thickness
+        data['layers'] = self.layers
+        data['nets'] = [[i, j] for i, j in self.nets.items()]
+        
+        return data
+    
+    def fromData(self, data):
+        for i, j in self.getTables().items():
+            j.fromData(data[i])
+        
+        self.source = data['source']
+        self.format = data['format']
+        self.thickness = data['thickness']
+        self.layers = dict(data['layers'])
+        self.nets = dict([[i, j] for [i, j] in data['nets']])
+        
+        return self
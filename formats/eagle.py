@@ -27,27 +27,126 @@
 
 import FreeCAD
 import re
-from xml.dom import minidom
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
 #
 from PCBconf import softLayers, eagleColorsDefinition
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
+
+
+# elements referenced by the indexes - everything else is cleared while parsing
+__eagleKeep__ = ['layer', 'element', 'attribute', 'wire', 'polygon', 'vertex', 'via', 'hole', 'pad', 'smd', 'text', 'circle', 'rectangle', 'dimension']
+
+
+class eagleSection(object):
+    ''' objects of one section (plain, signals, package) grouped by tag and layer '''
+    def __init__(self, name=''):
+        self.name = name
+        self.objects = {}  # tag: [[element, parent name], ...]
+        self.layers = {}  # tag: {layer: [[element, parent name], ...]}
+    
+    def addObject(self, element, parentName=''):
+        tag = element.tag
+        obj = [element, parentName]
+        #
+        if not tag in self.objects.keys():
+            self.objects[tag] = []
+            self.layers[tag] = {}
+        self.objects[tag].append(obj)
+        
+        layer = element.get('layer')
+        if layer:
+            layer = int(layer)
+            
+            if not layer in self.layers[tag].keys():
+                self.layers[tag][layer] = []
+            self.layers[tag][layer].append(obj)
+    
+    def getObjects(self, tag, layer=None):
+        try:
+            if layer is None:
+                return self.objects[tag]
+            return self.layers[tag][layer]
+        except KeyError:
+            return []
+
+
+def parseProject(filename):
+    ''' read the board in one pass and group the objects used by the loader '''
+    projektBRD = {
+        'version': '',
+        'layers': [],
+        'params': {},  # design rules
+        'attributes': {},  # global attributes
+        'libraries': {},  # library: {package: eagleSection}
+        'elements': [],
+        'plain': eagleSection('plain'),
+        'signals': eagleSection('signals'),  # parent name == signal name
+    }
+    #
+    path = []
+    library = None
+    package = None
+    signal = None
+    
+    for event, elem in ElementTree.iterparse(filename, events=('start', 'end')):
+        if event == 'end':
+            path.pop()
+            if not elem.tag in __eagleKeep__:
+                elem.clear()
+            continue
+        #
+        tag = elem.tag
+        parent = path[-1] if len(path) else None
+        path.append(tag)
+        
+        if tag == 'eagle':
+            projektBRD['version'] = elem.get('version', '')
+        elif parent == 'layers' and tag == 'layer':
+            projektBRD['layers'].append(elem)
+        elif parent == 'designrules' and tag == 'param':
+            projektBRD['params'][elem.get('name')] = elem.get('value', '')
+        elif parent == 'attributes' and tag == 'attribute':
+            projektBRD['attributes'][elem.get('name')] = elem.get('value', '')
+        elif parent == 'libraries' and tag == 'library':
+            library = elem.get('name', '')
+            if not library in projektBRD['libraries'].keys():
+                projektBRD['libraries'][library] = {}
+        elif parent == 'packages' and tag == 'package':
+            package = None
+            if not elem.get('name', '') in projektBRD['libraries'][library].keys():
+                package = eagleSection(elem.get('name', ''))
+                projektBRD['libraries'][library][package.name] = package
+        elif parent == 'package':
+            if package:
+                package.addObject(elem)
+        elif parent == 'elements' and tag == 'element':
+            projektBRD['elements'].append(elem)
+        elif parent == 'plain':
+            projektBRD['plain'].addObject(elem)
+        elif parent == 'signals' and tag == 'signal':
+            signal = elem.get('name', '')
+        elif parent == 'signal':
+            projektBRD['signals'].addObject(elem, signal)
+    #
+    return projektBRD
 
 
 def getSettings(projektBRD, paramName, tryb=True):
-    param = projektBRD.getElementsByTagName('designrules')[0].getElementsByTagName('param')
-    for i in param:
-        if i.getAttribute("name") == paramName:
-            if tryb:
-                dane = re.search(r'(.[^a-z]*)(.*)', i.getAttribute("value")).groups()
-                wartosc = float(dane[0])
-                    
-                if dane[1] == 'mil':
-                    wartosc *= 0.0254
-            else:
-                wartosc = i.getAttribute("value")
-            return wartosc
+    if paramName in projektBRD['params'].keys():
+        if tryb:
+            dane = re.search(r'(.[^a-z]*)(.*)', projektBRD['params'][paramName]).groups()
+            wartosc = float(dane[0])
+                
+            if dane[1] == 'mil':
+                wartosc *= 0.0254
+        else:
+            wartosc = projektBRD['params'][paramName]
+        return wartosc
     return False
 
 
@@ -56,7 +155,7 @@ class dialogMAIN(dialogMAIN_FORM):
         dialogMAIN_FORM.__init__(self, parent)
         self.databaseType = "eagle"
         
-        self.projektBRD = minidom.parse(filename)
+        self.projektBRD = parseProject(filename)
         self.layersNames = self.getLayersNames()
         if FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetBool("boardImportThickness", True):
             self.gruboscPlytki.setValue(self.getBoardThickness())
@@ -106,15 +205,15 @@ class dialogMAIN(dialogMAIN_FORM):
         return pcbThickness
 
     def getLayersNames(self):
-        programEagle = self.projektBRD.getElementsByTagName("layers")[0].getElementsByTagName("layer")
+        programEagle = self.projektBRD["layers"]
         dane = {}
         
         for i in programEagle:
-            layerNumber = int(i.getAttribute("number"))
-            layerName = i.getAttribute("name")
+            layerNumber = int(i.get("number", ''))
+            layerName = i.get("name", '')
             
-            if int(i.getAttribute("color")) in eagleColorsDefinition:
-                layerColor = eagleColorsDefinition[int(i.getAttribute("color"))]
+            if int(i.get("color", '')) in eagleColorsDefinition:
+                layerColor = eagleColorsDefinition[int(i.get("color", ''))]
             else:
                 layerColor = None
             
@@ -137,7 +236,8 @@ class EaglePCB(baseModel):
         self.elements = []
     
     def setProject(self):
-        self.projektBRD = minidom.parse(self.fileName)
+        # file was already parsed (once) by the dialog - reuse the indexes
+        self.projektBRD = self.dialogMAIN.projektBRD
     
     def getPCB(self, borderObject):
         dane = self.getSection('plain')
@@ -187,14 +287,7 @@ class EaglePCB(baseModel):
                 borderObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y), FreeCAD.Vector(0, 0, 1), j['r']))
 
     def getLibraries(self):
-        if len(self.libraries) == 0:
-            for i in self.projektBRD.getElementsByTagName("library"):
-                if not i.getAttribute('name') in self.libraries:
-                    self.libraries[i.getAttribute('name')] = {}
-                
-                for j in i.getElementsByTagName("package"):
-                    if not j.getAttribute('name') in self.libraries[i.getAttribute('name')]:
-                        self.libraries[i.getAttribute('name')][j.getAttribute('name')] = j
+        self.libraries = self.projektBRD['libraries']
 
     def translateBoolValue(self, value):
         value = value.strip()
@@ -208,27 +301,27 @@ class EaglePCB(baseModel):
 
     def getElements(self):
         if len(self.elements) == 0:
-            for i in self.projektBRD.getElementsByTagName("element"):
+            for i in self.projektBRD['elements']:
                 rot = 0
                 side = 1
-                name = i.getAttribute('name').strip()
-                package = i.getAttribute('package').strip()
+                name = i.get('name', '').strip()
+                package = i.get('package', '').strip()
                 #
-                if 'R' in i.getAttribute('rot'):
-                    rot = int(round(float(re.sub("[^0-9.]", "", i.getAttribute('rot')))))
-                if 'M' in i.getAttribute('rot'):
+                if 'R' in i.get('rot', ''):
+                    rot = int(round(float(re.sub("[^0-9.]", "", i.get('rot', '')))))
+                if 'M' in i.get('rot', ''):
                     side = 0
                 #
                 self.elements.append({
                     'name': name, 
-                    'library': i.getAttribute('library'), 
+                    'library': i.get('library', ''), 
                     'package': package, 
-                    'value': i.getAttribute('value'), 
-                    'x': float(i.getAttribute('x')), 
-                    'y': float(i.getAttribute('y')), 
-                    'locked': self.translateBoolValue(i.getAttribute('locked')),
-                    'populated': self.translateBoolValue(i.getAttribute('populate')), 
-                    'smashed': self.translateBoolValue(i.getAttribute('smashed')), 
+                    'value': i.get('value', ''), 
+                    'x': float(i.get('x', '')), 
+                    'y': float(i.get('y', '')), 
+                    'locked': self.translateBoolValue(i.get('locked', '')),
+                    'populated': self.translateBoolValue(i.get('populate', '')), 
+                    'smashed': self.translateBoolValue(i.get('smashed', '')), 
                     'rot': rot, 
                     'side': side,
                     'dataElement': i
@@ -240,7 +333,7 @@ class EaglePCB(baseModel):
             return ''
         
         try:
-            return self.projektBRD.getElementsByTagName(sectionName)[0]
+            return self.projektBRD[sectionName]
         except:
             return ''
     
@@ -250,16 +343,15 @@ class EaglePCB(baseModel):
             
         data = []
         for lay in layer:
-            pol = []
-            for i in section.getElementsByTagName("polygon"):
-                if int(i.getAttribute('layer')) == lay:
-                    for j in i.getElementsByTagName("vertex"):
-                        x = float(j.getAttribute('x'))
-                        y = float(j.getAttribute('y'))
-                        curve = j.getAttribute('curve')
-                        
-                        pol.append([x, y, curve, i])
-                    data.append(pol)
+            for [i, parentName] in section.getObjects('polygon', lay):
+                pol = []
+                for j in i.findall('vertex'):
+                    x = float(j.get('x'))
+                    y = float(j.get('y'))
+                    curve = j.get('curve', '')
+                    
+                    pol.append([x, y, curve, i, parentName])
+                data.append(pol)
         return data
     
     def getRectangle(self, section, layer, m=[0,0]):
@@ -268,42 +360,41 @@ class EaglePCB(baseModel):
             
         data = []
         for lay in layer:
-            for i in section.getElementsByTagName("rectangle"):
-                if int(i.getAttribute('layer')) == lay:
-                    x1 = float(i.getAttribute('x1'))
-                    y1 = float(i.getAttribute('y1'))
-                    x2 = float(i.getAttribute('x2'))
-                    y2 = float(i.getAttribute('y2'))
-                    
-                    if [x1, y1] == [x2, y2]:
-                        continue
-                    if m[0] != 0:
-                        x1 += m[0]
-                        x2 += m[0]
-                    if m[1] != 0:
-                        y1 += m[1]
-                        y2 += m[1]
-                    
-                    if i.getAttribute('rot') == "":
-                        rot = 0.
-                    else:
-                        rot = float(re.search('R([0-9,.-]*)', i.getAttribute('rot')).groups()[0])
-                        
-                    xs = x1 + (abs(x1 - x2) / 2.)
-                    ys = y1 + (abs(y1 - x2) / 2.)
+            for [i, parentName] in section.getObjects('rectangle', lay):
+                x1 = float(i.get('x1', ''))
+                y1 = float(i.get('y1', ''))
+                x2 = float(i.get('x2', ''))
+                y2 = float(i.get('y2', ''))
+                
+                if [x1, y1] == [x2, y2]:
+                    continue
+                if m[0] != 0:
+                    x1 += m[0]
+                    x2 += m[0]
+                if m[1] != 0:
+                    y1 += m[1]
+                    y2 += m[1]
+                
+                if i.get('rot', '') == "":
+                    rot = 0.
+                else:
+                    rot = float(re.search('R([0-9,.-]*)', i.get('rot', '')).groups()[0])
                     
-                    data.append({
-                        'x1': x1,
-                        'y1': y1,
-                        'x2': x2,
-                        'y2': y2,
-                        'xs': xs,
-                        'ys': ys,
-                        'rot': rot,
-                        'layer': lay,
-                        'data': i
-                    })
-        
+                xs = x1 + (abs(x1 - x2) / 2.)
+                ys = y1 + (abs(y1 - x2) / 2.)
+                
+                data.append({
+                    'x1': x1,
+                    'y1': y1,
+                    'x2': x2,
+                    'y2': y2,
+                    'xs': xs,
+                    'ys': ys,
+                    'rot': rot,
+                    'layer': lay,
+                    'data': i
+                })
+    
         return data
     
     def getCircles(self, section, layer, m=[0,0]):
@@ -312,29 +403,28 @@ class EaglePCB(baseModel):
         
         data = []
         for lay in layer:
-            for i in section.getElementsByTagName("circle"):
-                if int(i.getAttribute('layer')) == lay:
-                    x = float(i.getAttribute('x'))
-                    y = float(i.getAttribute('y'))
-                    r = float(i.getAttribute('radius'))
-                    w = float(i.getAttribute('width'))
-                    
-                    #if w == 0:
-                        #w = 0.01
-                    if m[0] != 0:
-                        x += m[0]
-                    if m[1] != 0:
-                        y += m[1]
-                    
-                    data.append({
-                        'x': x,
-                        'y': y,
-                        'r': r,
-                        'width': w,
-                        'layer': lay,
-                        'data': i
-                    })
-        
+            for [i, parentName] in section.getObjects('circle', lay):
+                x = float(i.get('x', ''))
+                y = float(i.get('y', ''))
+                r = float(i.get('radius', ''))
+                w = float(i.get('width', ''))
+                
+                #if w == 0:
+                    #w = 0.01
+                if m[0] != 0:
+                    x += m[0]
+                if m[1] != 0:
+                    y += m[1]
+                
+                data.append({
+                    'x': x,
+                    'y': y,
+                    'r': r,
+                    'width': w,
+                    'layer': lay,
+                    'data': i
+                })
+    
         return data
             
     def getWires(self, section, layer, m=[0,0]):
@@ -343,51 +433,51 @@ class EaglePCB(baseModel):
         
         data = []
         for lay in layer:
-            for i in section.getElementsByTagName("wire"):
-                if int(i.getAttribute('layer')) == lay:
-                    #for i in re.findall('<wire\s+x1="(.+?)"\s+y1="(.+?)"\s+x2="(.+?)"\s+y2="(.+?)"\s+width="(.+?)"\s+layer="%s"(\s+style="(.+?)"|)(\s+curve="(.+?)"|)(\s+cap="(.+?)"|)/>' % str(lay), section):
-                    x1 = float(i.getAttribute('x1'))
-                    y1 = float(i.getAttribute('y1'))
-                    x2 = float(i.getAttribute('x2'))
-                    y2 = float(i.getAttribute('y2'))
-                    width = float(i.getAttribute('width'))
-                    style = i.getAttribute('style')
-                    
-                    if [x1, y1] == [x2, y2]:
-                        continue
-                    if m[0] != 0:
-                        x1 += m[0]
-                        x2 += m[0]
-                    if m[1] != 0:
-                        y1 += m[1]
-                        y2 += m[1]
-                    
-                    if i.getAttribute('curve') == '':
-                        curve = 0
-                    else:
-                        curve = float(i.getAttribute('curve'))
-                    
-                    if i.getAttribute('cap') == '':
-                        cap = 'round'
-                    else:
-                        cap = i.getAttribute('cap')
-                        
-                    if width == 0:
-                        width = 0.01
+            for [i, parentName] in section.getObjects('wire', lay):
+                #for i in re.findall('<wire\s+x1="(.+?)"\s+y1="(.+?)"\s+x2="(.+?)"\s+y2="(.+?)"\s+width="(.+?)"\s+layer="%s"(\s+style="(.+?)"|)(\s+curve="(.+?)"|)(\s+cap="(.+?)"|)/>' % str(lay), section):
+                x1 = float(i.get('x1', ''))
+                y1 = float(i.get('y1', ''))
+                x2 = float(i.get('x2', ''))
+                y2 = float(i.get('y2', ''))
+                width = float(i.get('width', ''))
+                style = i.get('style', '')
+                
+                if [x1, y1] == [x2, y2]:
+                    continue
+                if m[0] != 0:
+                    x1 += m[0]
+                    x2 += m[0]
+                if m[1] != 0:
+                    y1 += m[1]
+                    y2 += m[1]
+                
+                if i.get('curve', '') == '':
+                    curve = 0
+                else:
+                    curve = float(i.get('curve', ''))
+                
+                if i.get('cap', '') == '':
+                    cap = 'round'
+                else:
+                    cap = i.get('cap', '')
                     
-                    data.append({
-                        'x1': x1,
-                        'y1': y1,
-                        'x2': x2,
-                        'y2': y2,
-                        'width': width,
-                        'style': style,
-                        'curve': curve,
-                        'cap': cap,
-                        'layer': lay,
-                        'data': i
-                    })
-            
+                if width == 0:
+                    width = 0.01
+                
+                data.append({
+                    'x1': x1,
+                    'y1': y1,
+                    'x2': x2,
+                    'y2': y2,
+                    'width': width,
+                    'style': style,
+                    'curve': curve,
+                    'cap': cap,
+                    'layer': lay,
+                    'signal': parentName,
+                    'data': i
+                })
+        
         return data
     
     ##############################
@@ -446,34 +536,26 @@ class EaglePCB(baseModel):
 
     def getHoles(self, holesObject, types, Hmin, Hmax):
         ''' holes/vias '''
-        holesList = []
+        holesList = holesGrid()
         
         # holes
         if types['H']:
-            for i in self.projektBRD.getElementsByTagName("plain")[0].getElementsByTagName("hole"):
-                x = float(i.getAttribute('x'))
-                y = float(i.getAttribute('y'))
-                r = float(i.getAttribute('drill')) / 2. + 0.001
-                
-                holesList = self.addHoleToObject(holesObject, Hmin, Hmax, types['IH'], x, y, r, holesList)
+            holes = [[float(i.get('x', '')), float(i.get('y', '')), float(i.get('drill', '')) / 2. + 0.001] for [i, parentName] in self.projektBRD['plain'].getObjects('hole')]
+            holesList = self.addHolesToObject(holesObject, Hmin, Hmax, types['IH'], holes, holesList)
         # vias
         if types['V']:
-            for i in self.projektBRD.getElementsByTagName("signals")[0].getElementsByTagName("via"):
-                x = float(i.getAttribute('x'))
-                y = float(i.getAttribute('y'))
-                r = float(i.getAttribute('drill')) / 2. + 0.001
-                
-                holesList = self.addHoleToObject(holesObject, Hmin, Hmax, types['IH'], x, y, r, holesList)
+            holes = [[float(i.get('x', '')), float(i.get('y', '')), float(i.get('drill', '')) / 2. + 0.001] for [i, parentName] in self.projektBRD['signals'].getObjects('via')]
+            holesList = self.addHolesToObject(holesObject, Hmin, Hmax, types['IH'], holes, holesList)
         ## pady
         self.getLibraries()
         self.getElements()
         
         for i in self.elements:
             if types['H']:  # holes
-                for j in self.libraries[i['library']][i['package']].getElementsByTagName("hole"):
-                    xs = float(j.getAttribute('x'))
-                    ys = float(j.getAttribute('y'))
-                    r = float(j.getAttribute('drill')) / 2. + 0.001
+                for [j, parentName] in self.libraries[i['library']][i['package']].getObjects('hole'):
+                    xs = float(j.get('x', ''))
+                    ys = float(j.get('y', ''))
+                    r = float(j.get('drill', '')) / 2. + 0.001
                     
                     [xR, yR] = self.obrocPunkt([xs, ys], [i['x'], i['y']], i['rot'])
                     if i['side'] == 0:  # odbicie wspolrzednych
@@ -481,10 +563,10 @@ class EaglePCB(baseModel):
                     
                     holesList = self.addHoleToObject(holesObject, Hmin, Hmax, types['IH'], xR, yR, r, holesList)
             if types['P']:  # pads
-                for j in self.libraries[i['library']][i['package']].getElementsByTagName("pad"):
-                    xs = float(j.getAttribute('x'))
-                    ys = float(j.getAttribute('y'))
-                    r = float(j.getAttribute('drill')) / 2. + 0.001
+                for [j, parentName] in self.libraries[i['library']][i['package']].getObjects('pad'):
+                    xs = float(j.get('x', ''))
+                    ys = float(j.get('y', ''))
+                    r = float(j.get('drill', '')) / 2. + 0.001
                     
                     [xR, yR] = self.obrocPunkt([xs, ys], [i['x'], i['y']], i['rot'])
                     if i['side'] == 0:  # odbicie wspolrzednych
@@ -506,7 +588,7 @@ class EaglePCB(baseModel):
                 i['side'] = "BOTTOM"
             #
             if not i['smashed']:
-                for j in self.getAnnotations(self.libraries[i['library']][i['package']].getElementsByTagName("text")):
+                for j in self.getAnnotations([k[0] for k in self.libraries[i['library']][i['package']].getObjects('text')]):
                     x1 = i['x'] + j["x"]
                     y1 = i['y'] + j["y"]
                     
@@ -532,15 +614,15 @@ class EaglePCB(baseModel):
                         j["text"] = 'VALUE'
                         i["EL_Value"] = j
             #
-            for attr in i['dataElement'].getElementsByTagName('attribute'):
+            for attr in i['dataElement'].findall('attribute'):
                 # <uros@isotel.eu> fix to get a FREECAD attribute out, it's overall all ugly since original
                 # code is using regex to parse xml instead of dom parser - all regex should be replaced with the DOM
-                if attr.getAttribute('name') == 'FREECAD': # use different 3D model for current package
-                    if attr.getAttribute('value').strip() == "":
+                if attr.get('name', '') == 'FREECAD': # use different 3D model for current package
+                    if attr.get('value', '').strip() == "":
                         FreeCAD.Console.PrintWarning(u"Empty attribute 'FREECAD' found for the element {0}. Default package will be used.\n".format(i["name"]))
                     else:
-                        FreeCAD.Console.PrintWarning(u"Package '{1}' will be used for the element {0} (instead of {2}).\n".format(i["name"], attr.getAttribute('value').strip(), i['package']))
-                        i['package'] = attr.getAttribute('value').strip()
+                        FreeCAD.Console.PrintWarning(u"Package '{1}' will be used for the element {0} (instead of {2}).\n".format(i["name"], attr.get('value', '').strip(), i['package']))
+                        i['package'] = attr.get('value', '').strip()
                         #if not self.parent.partExist(['', attr.getAttribute('value').strip()], '')[0]:
                         #    FreeCAD.Console.PrintWarning(u"\tIncorrect package '{1}' set for the element {0}.\n".format(i["name"], attr.getAttribute('value').strip()))
                         
@@ -549,13 +631,13 @@ class EaglePCB(baseModel):
                             # package = attr.getAttribute('value').strip()
                         # else:
                             # FreeCAD.Console.PrintWarning(u"Incorrect package '{1}' set for the element {0}. Default package will be used.\n".format(i["name"], attr.getAttribute('value').strip()))
-                elif attr.getAttribute('name') in ['NAME', 'VALUE'] and i['smashed']:
+                elif attr.get('name', '') in ['NAME', 'VALUE'] and i['smashed']:
                     data = self.getAnnotations([attr], mode='param')[0]
                     
                     if data["text"] == "NAME":
                         i['EL_Name'] = data
                         #i['EL_Name']['rot'] = i['EL_Name']['rot'] - i['rot']
-                    elif attr.getAttribute('name') == "VALUE":
+                    elif attr.get('name', '') == "VALUE":
                         i['EL_Value'] = data
                         #i['EL_Value']['rot'] = i['EL_Value']['rot'] - i['rot']
             #########################
@@ -719,32 +801,31 @@ class EaglePCB(baseModel):
         #return [signal, wiresDB]
         
     def getPolygonsFromCopperLayer(self, layerNew, layerNumber, display=[True, True, True, False]):
-        self.addStandardShapes(self.projektBRD.getElementsByTagName("signals")[0], layerNew, [layerNumber[0]], display, getSignals=True)
+        self.addStandardShapes(self.projektBRD['signals'], layerNew, [layerNumber[0]], display, getSignals=True)
         
     def getPaths(self, layerNew, layerNumber, display=[True, True, True, False]):
-        self.addStandardShapes(self.projektBRD.getElementsByTagName("signals")[0], layerNew, [layerNumber[0]], display, getSignals=True)
+        self.addStandardShapes(self.projektBRD['signals'], layerNew, [layerNumber[0]], display, getSignals=True)
 
     def getSettings(self, paramName):
-        for i in self.projektBRD.getElementsByTagName("param"):
-            if i.getAttribute('name') == paramName:
-                dane = re.search(r'(.[^a-z]*)(.*)', i.getAttribute('value')).groups()
-                wartosc = float(dane[0])
-                
-                if dane[1] == 'mil':
-                    wartosc *= 0.0254
+        if paramName in self.projektBRD['params'].keys():
+            dane = re.search(r'(.[^a-z]*)(.*)', self.projektBRD['params'][paramName]).groups()
+            wartosc = float(dane[0])
+            
+            if dane[1] == 'mil':
+                wartosc *= 0.0254
 
-                return wartosc
+            return wartosc
     
     def getConstraintAreas(self, layerNumber):
         areas = []
         # kola
-        for i in self.getCircles(self.projektBRD.getElementsByTagName("plain")[0], layerNumber):
+        for i in self.getCircles(self.projektBRD['plain'], layerNumber):
             areas.append(['circle', i['x'], i['y'], i['r'], i['width']])
         # kwadraty
-        for i in self.getRectangle(self.projektBRD.getElementsByTagName("plain")[0], layerNumber):
+        for i in self.getRectangle(self.projektBRD['plain'], layerNumber):
             areas.append(['rect', i['x1'], i['y1'], i['x2'], i['y2'], 0, i['rot']])
         # polygon
-        for i in self.getPolygons(self.projektBRD.getElementsByTagName("plain")[0], layerNumber):
+        for i in self.getPolygons(self.projektBRD['plain'], layerNumber):
             areas.append(['polygon', self.getPolygon(i)])
         #
         return areas
@@ -752,7 +833,7 @@ class EaglePCB(baseModel):
     def getGlue(self, layerNumber):
         glue = {}
         # line/arc
-        for i in self.getWires(self.projektBRD.getElementsByTagName("plain")[0], [layerNumber[0]]):
+        for i in self.getWires(self.projektBRD['plain'], [layerNumber[0]]):
             if not i['width'] in glue.keys():
                 glue[i['width']] = []
             
@@ -761,13 +842,13 @@ class EaglePCB(baseModel):
             else:
                 glue[i['width']].append(['arc', i['x2'], i['y2'], i['x1'], i['y1'], i['curve'], i['cap']])
         # circle
-        for i in self.getCircles(self.projektBRD.getElementsByTagName("plain")[0], layerNumber[0]):
+        for i in self.getCircles(self.projektBRD['plain'], layerNumber[0]):
             if not i['width'] in glue.keys():
                 glue[i['width']] = []
             
             glue[i['width']].append(['circle', i['x'], i['y'], i['r']])
         ## rectangle
-        #for i in self.getRectangle(self.projektBRD.getElementsByTagName("plain")[0], [layerNumber[0]]):
+        #for i in self.getRectangle(self.projektBRD['plain'], [layerNumber[0]]):
             #if not 1 in glue.keys():
                 #glue[1] = []
             
@@ -793,13 +874,18 @@ class EaglePCB(baseModel):
         # linie/luki
         if display[0]:
             for i in self.getWires(dane, layerNumber, [X, Y]):
-                if not i['curve']:  # LINE
+                if getSignals and not parent and (not i['curve'] or i['cap'] != 'flat'):  # merged by setTracks()
+                    if not i['curve']:
+                        layerNew.addTrack(['line', [i['x1'], i['y1']], [i['x2'], i['y2']]], i['width'], signalName=i['signal'])
+                    else:
+                        layerNew.addTrack(['arc', [i['x1'], i['y1']], [i['x2'], i['y2']], i['curve']], i['width'], signalName=i['signal'])
+                elif not i['curve']:  # LINE
                     layerNew.addLineWidth(i['x1'], i['y1'], i['x2'], i['y2'], i['width'])
                     if parent:
                         layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
                         layerNew.setChangeSide(parent['x'], parent['y'], parent['side'])
                     if getSignals:
-                        layerNew.setFace(signalName=i['data'].parentNode.getAttribute('name'))
+                        layerNew.setFace(signalName=i['signal'])
                     else:
                         layerNew.setFace()
                 else:  # ARC
@@ -808,9 +894,11 @@ class EaglePCB(baseModel):
                             layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
                             layerNew.setChangeSide(parent['x'], parent['y'], parent['side'])
                         if getSignals:
-                            layerNew.setFace(signalName=i['data'].parentNode.getAttribute('name'))
+                            layerNew.setFace(signalName=i['signal'])
                         else:
                             layerNew.setFace()
+            #
+            layerNew.setTracks()
         # okregi
         if display[1]:
             for i in self.getCircles(dane, layerNumber, [X, Y]):
@@ -861,24 +949,24 @@ class EaglePCB(baseModel):
                 if getSignals:
                     isolate = self.getSettings('mdWireWire')
                     
-                    if i[0][-1].getAttribute('isolate'):
-                        #if float(i[0][-1].getAttribute('isolate')) > isolate:
-                        isolate = float(i[0][-1].getAttribute('isolate'))
-                    layerNew.setFace(signalName=[i[0][-1].parentNode.getAttribute('name'), isolate])
+                    if i[0][3].get('isolate'):
+                        #if float(i[0][3].get('isolate')) > isolate:
+                        isolate = float(i[0][3].get('isolate'))
+                    layerNew.setFace(signalName=[i[0][4], isolate])
                 else:
                     layerNew.setFace()
     
     def getDimensions(self):
         wymiary = []
         #
-        for i in self.projektBRD.getElementsByTagName("plain")[0].getElementsByTagName("dimension"):
-            x1 = float(i.getAttribute('x1'))
-            y1 = float(i.getAttribute('y1'))
-            x2 = float(i.getAttribute('x2'))
-            y2 = float(i.getAttribute('y2'))
-            x3 = float(i.getAttribute('x3'))
-            y3 = float(i.getAttribute('y3'))
-            dtype = i.getAttribute('dtype')
+        for [i, parentName] in self.projektBRD['plain'].getObjects('dimension'):
+            x1 = float(i.get('x1', ''))
+            y1 = float(i.get('y1', ''))
+            x2 = float(i.get('x2', ''))
+            y2 = float(i.get('y2', ''))
+            x3 = float(i.get('x3', ''))
+            y3 = float(i.get('y3', ''))
+            dtype = i.get('dtype', '')
             
             wymiary.append([x1, y1, x2, y2, x3, y3, dtype])
         
@@ -893,21 +981,21 @@ class EaglePCB(baseModel):
         MIN_V = self.getSettings('rlMinViaOuter')
         PERC_V = self.getSettings('rvViaOuter')
         #####
-        for i in self.projektBRD.getElementsByTagName("via"):
-            x = float(i.getAttribute('x'))
-            y = float(i.getAttribute('y'))
-            drill = float(i.getAttribute('drill'))
+        for [i, parentName] in self.projektBRD['signals'].getObjects('via'):
+            x = float(i.get('x', ''))
+            y = float(i.get('y', ''))
+            drill = float(i.get('drill', ''))
             
             shape = "round"
-            if i.getAttribute('shape'):
-                shape = i.getAttribute('shape')
+            if i.get('shape', ''):
+                shape = i.get('shape', '')
             
             alwaysstop = False
-            if i.getAttribute('alwaysstop'):
+            if i.get('alwaysstop', ''):
                 alwaysstop = True
             #
-            if i.getAttribute('diameter') != "":
-                diameter = float(i.getAttribute('diameter'))
+            if i.get('diameter', '') != "":
+                diameter = float(i.get('diameter', ''))
                 
                 if diameter < (2 * MIN_V + drill):
                     diameter = 2 * MIN_V + drill
@@ -951,27 +1039,27 @@ class EaglePCB(baseModel):
             #layerSide = softLayers[self.databaseType][layerNumber]["side"]
             
             for i in self.elements:
-                for j in self.libraries[i['library']][i['package']].getElementsByTagName("smd") + self.libraries[i['library']][i['package']].getElementsByTagName("pad"):
-                    x = float(j.getAttribute('x')) + i['x']
-                    y = float(j.getAttribute('y')) + i['y']
+                for [j, parentName] in self.libraries[i['library']][i['package']].getObjects('smd') + self.libraries[i['library']][i['package']].getObjects('pad'):
+                    x = float(j.get('x', '')) + i['x']
+                    y = float(j.get('y', '')) + i['y']
                     ROT_2 = 0  # kat o jaki zostana obrocone elementy
                     
-                    if j.getAttribute('rot'):
-                        ROT_2 = int(re.sub("[^0-9]", "", j.getAttribute('rot')))  # kat o jaki zostana obrocone elementy
+                    if j.get('rot', ''):
+                        ROT_2 = int(re.sub("[^0-9]", "", j.get('rot', '')))  # kat o jaki zostana obrocone elementy
                     #####
-                    if j.tagName == "pad":
-                        drill = float(j.getAttribute('drill'))
+                    if j.tag == "pad":
+                        drill = float(j.get('drill', ''))
                         
-                        if j.getAttribute('shape'):
-                            shape = j.getAttribute('shape')
+                        if j.get('shape', ''):
+                            shape = j.get('shape', '')
                         else:
                             shape = "round"
                         
                         if shape == "":
                             shape = "round"
                         
-                        if j.getAttribute('diameter'):
-                            diameter = float(j.getAttribute('diameter'))
+                        if j.get('diameter', ''):
+                            diameter = float(j.get('diameter', ''))
                             
                             if diameter < (2 * MIN_P + drill):
                                 diameter = 2 * MIN_P + drill
@@ -1026,18 +1114,18 @@ class EaglePCB(baseModel):
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-                    elif j.tagName == "smd":
-                        padSide = softLayers[self.databaseType][int(j.getAttribute('layer'))]["side"]
+                    elif j.tag == "smd":
+                        padSide = softLayers[self.databaseType][int(j.get('layer', ''))]["side"]
                         
                         if i['side'] == 0:
-                            padSide = softLayers[self.databaseType][softLayers[self.databaseType][int(j.getAttribute('layer'))]["mirrorLayer"]]["side"]
+                            padSide = softLayers[self.databaseType][softLayers[self.databaseType][int(j.get('layer', ''))]["mirrorLayer"]]["side"]
                         
                         if layerSide == padSide:  # smd
-                            dx = float(j.getAttribute('dx'))
-                            dy = float(j.getAttribute('dy'))
+                            dx = float(j.get('dx', ''))
+                            dy = float(j.get('dy', ''))
                             
-                            if j.getAttribute('roundness'):
-                                roundness = float(j.getAttribute('roundness'))
+                            if j.get('roundness', ''):
+                                roundness = float(j.get('roundness', ''))
                             else:
                                 roundness = 0
                             ######
@@ -1065,7 +1153,7 @@ class EaglePCB(baseModel):
                                 layerNew.setFace()
 
     def getSilkLayer(self, layerNew, layerNumber, display=[True, True, True, True]):
-        self.addStandardShapes(self.projektBRD.getElementsByTagName("plain")[0], layerNew, [layerNumber[0]], display)
+        self.addStandardShapes(self.projektBRD['plain'], layerNew, [layerNumber[0]], display)
         
     def getSilkLayerModels(self, layerNew, layerNumber):
         self.getLibraries()
@@ -1084,8 +1172,8 @@ class EaglePCB(baseModel):
     
     def getNormalAnnotations(self):
         try:
-            data = self.projektBRD.getElementsByTagName("plain")[0]
-            return self.getAnnotations(data.getElementsByTagName("text"), mode='anno')
+            data = self.projektBRD['plain']
+            return self.getAnnotations([i[0] for i in data.getObjects('text')], mode='anno')
         except Exception as e:
             FreeCAD.Console.PrintWarning("4. {0}\n".format(e))
     
@@ -1101,42 +1189,42 @@ class EaglePCB(baseModel):
             align = "bottom-left"
             font = 'Proportional'
             #
-            x = float(i.getAttribute('x'))
+            x = float(i.get('x', ''))
             #
-            y = float(i.getAttribute('y'))
+            y = float(i.get('y', ''))
             #
-            size = float(i.getAttribute('size'))
+            size = float(i.get('size', ''))
             #
-            if i.getAttribute('rot'):
-                if 'S' in i.getAttribute('rot'):
+            if i.get('rot', ''):
+                if 'S' in i.get('rot', ''):
                     spin = True
-                if 'M' in i.getAttribute('rot'):
+                if 'M' in i.get('rot', ''):
                     side = 'BOTTOM'
-                if 'R' in i.getAttribute('rot'):
-                    rot = int(re.sub("[^0-9]", "", i.getAttribute('rot')))
+                if 'R' in i.get('rot', ''):
+                    rot = int(re.sub("[^0-9]", "", i.get('rot', '')))
             #
-            if i.getAttribute('align'):
-                align = i.getAttribute('align')
+            if i.get('align', ''):
+                align = i.get('align', '')
             #
             if mode == 'anno':
-                txt = i.firstChild.nodeValue
+                txt = i.text
                 #
                 if txt.startswith(">") or txt.startswith("&gt;"):
-                    for j in self.getSection("attributes").getElementsByTagName("attribute"):
-                        if txt.replace(">", "") == j.getAttribute('name') or txt.replace("&gt;", "") == j.getAttribute('name'):
-                            txt = j.getAttribute("value")
+                    for j, k in self.getSection("attributes").items():
+                        if txt.replace(">", "") == j or txt.replace("&gt;", "") == j:
+                            txt = k
                             break
             else:
-                txt = i.getAttribute('name')
+                txt = i.get('name', '')
             #
-            if i.getAttribute('distance'):
-                distance = int(i.getAttribute('distance'))
+            if i.get('distance', ''):
+                distance = int(i.get('distance', ''))
             #
-            if i.getAttribute('font'):
-                font = i.getAttribute('font').capitalize()
+            if i.get('font', ''):
+                font = i.get('font', '').capitalize()
             #
-            if i.getAttribute('display'):
-                if i.getAttribute('display') == "off":
+            if i.get('display', ''):
+                if i.get('display', '') == "off":
                     display = False
                 else:
                     display = True
@@ -35,7 +35,7 @@ import re
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -548,7 +548,7 @@ class FreePCB(baseModel):
     
     def getHoles(self, holesObject, types, Hmin, Hmax):
         ''' holes/vias '''
-        holesList = []
+        holesList = holesGrid()
         
         # vias
         if types['V']:
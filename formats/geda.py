@@ -36,7 +36,7 @@ from math import radians
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
 
 __currentPath__ = os.path.abspath(os.path.join(os.path.dirname(__file__), ''))
 
@@ -301,7 +301,7 @@ class gEDA_PCB(baseModel):
     
     def getHoles(self, holesObject, types, Hmin, Hmax):
         ''' holes/vias '''
-        holesList = []
+        holesList = holesGrid()
 
         # holes
         if types['H']:
@@ -37,7 +37,7 @@ from math import radians
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -117,8 +117,7 @@ class HYP_PCB(baseModel):
                 width = self.setUnit(i[4])
                 
                 if [x1, y1] != [x2, y2]:
-                    layerNew.addLineWidth(x1, y1, x2, y2, width)
-                    layerNew.setFace(signalName=signal)
+                    layerNew.addTrack(['line', [x1, y1], [x2, y2]], width, signalName=signal)
             # arcs
             for i in re.findall(r'\(ARC X1=(.+?) Y1=(.+?) X2=(.+?) Y2=(.+?) XC=(.+?) YC=(.+?) R=.+? W=(.+?) L=%s\)[^ Circle]' % layer, j[1]):
                 x1 = self.setUnit(i[0])
@@ -133,8 +132,9 @@ class HYP_PCB(baseModel):
                 width = self.setUnit(i[6])
                 angle = self.getArcParameters(x1, y1, x2, y2, xs, ys)
                 #
-                if layerNew.addArcWidth([x1, y1], [x2, y2],  angle, width):
-                    layerNew.setFace(signalName=signal)
+                layerNew.addTrack(['arc', [x1, y1], [x2, y2], angle], width, signalName=signal)
+        #
+        layerNew.setTracks()
     
     def getArcParameters(self, x1, y1, x2, y2, xs, ys):
         angle = degrees(atan2(y2 - ys, x2 - xs) - atan2(y1 - ys, x1 - xs))
@@ -303,7 +303,7 @@ class HYP_PCB(baseModel):
     
     def getHoles(self, holesObject, types, Hmin, Hmax):
         ''' holes/vias '''
-        holesList = []
+        holesList = holesGrid()
         
         # holes
         if types['H']:
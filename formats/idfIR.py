@@ -0,0 +1,213 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+import re
+from math import sqrt
+#
+from formats.boardIR import boardIR
+
+
+__version__ = 1  # parsed boards cache - change if IR created from the file changes
+#
+# IDF v2/v3 *.emn -> board IR (formats/boardIR.py). Does not depend on FreeCAD.
+#
+
+
+def getUnitsDefinition(projektBRD):
+    if re.search(r'THOU', projektBRD):
+        return 0.0254
+    elif re.search(r'MM', projektBRD):
+        return 1
+    else:
+        return 0.000001
+
+
+def getSection(projektBRD, name):
+    ''' contents of all sections .NAME ... .END_NAME, None if there is no section '''
+    data = re.findall(r'\.'+name+'[\s+UNOWNED|\s+MCAD|\s+ECAD|]*\n(.*?)\.END_'+name+'\n', projektBRD, re.DOTALL)
+    if len(data):
+        return data
+    else:
+        return None
+
+
+def getLoops(section, scale):
+    ''' outline section -> loops [[header], ['Line', x1, y1, x2, y2], ['Arc3P', x1, y1, x2, y2, angle], ['Circle', x, y, r]]
+        (header - list of strings, only if the loop starts with one) '''
+    area = re.findall(r'(.*?)\n', section, re.MULTILINE|re.DOTALL)
+    #
+    data = []
+    data.append([])
+    number = None # Indicates board outline / Indicates additional board cutouts labeled
+
+    for i in range(0, len(area)):
+        value = re.sub(r'\s+', ' ', area[i])
+        
+        if len(value.split(" ")) <= 3: # extra header
+            value_1 = re.sub(r'\s+', ' ', area[i + 1])
+            
+            data.append([])
+            data[-1].append(value)
+            number = int(value_1.split(" ")[0])
+            continue
+
+        if number == None:
+            number = int(value.split(" ")[0])
+        
+        if int(value.split(" ")[0]) == number:
+            data[-1].append(value)
+        else:
+            data.append([])
+            data[-1].append(value)
+            number = int(area[i].split(" ")[0])
+    ###########################
+    dataOut = []
+    for i in data:
+        if len(i):
+            direction = float(i[-1].split(" ")[0])
+            
+            if len(i[0].split(" ")) <= 3:
+                stop = 1
+                dataOut.append([i[0].split(" ")])
+            else:
+                stop = 0
+                dataOut.append([])
+            
+            if len(i) <= 3: # circle
+                (num1, xs, ys, dummy) = i[-2].split(" ")
+                (num2, x, y, curve) = i[-1].split(" ")
+                
+                xs = float(xs) * scale
+                ys = float(ys) * scale
+                x = float(x) * scale
+                y = float(y) * scale
+                r = sqrt((x - xs) ** 2 + (y - ys) ** 2)
+                
+                dataOut[-1].append(['Circle', xs, ys, r])
+                continue
+            
+            if direction == 0:  # counter-clockwise direction / board outline
+                points = [[j, j - 1] for j in range(len(i)-1, stop, -1)]
+            else:  # clockwise direction /  board cutouts
+                points = [[j, j + 1] for j in range(stop, len(i)-1)]
+            
+            for [j, k] in points:
+                data_1 = i[j].split(" ")
+                data_2 = i[k].split(" ")
+                
+                x1 = float(data_1[1]) * scale
+                y1 = float(data_1[2]) * scale
+                eType = float(data_1[3])
+                
+                x2 = float(data_2[1]) * scale
+                y2 = float(data_2[2]) * scale
+                
+                if eType == 0.0:
+                    dataOut[-1].append(['Line', x1, y1, x2, y2])
+                else:
+                    dataOut[-1].append(['Arc3P', x1, y1, x2, y2, eType])
+    #
+    return dataOut
+
+
+def getRecords(section, lines):
+    ''' section -> records of (lines) lines split into fields ("quoted text" is one field) '''
+    data = section.split("\n")
+    #
+    for i in [" ".join(data[i:i+lines]) for i in range(0, len(data), lines)]:
+        param = re.findall(r'(".*?"|.*?)[\s|\n]+', i + "\n", re.DOTALL)
+        if len(param) > 1:
+            yield param
+
+
+def readIdfBoard(source, version=2):
+    ''' source: content of the board file (LF line endings) '''
+    board = boardIR(fileFormat='idf')
+    scale = getUnitsDefinition(source)
+    # outline
+    outline = getSection(source, "BOARD_OUTLINE")
+    if outline:
+        try:
+            board.thickness = float(outline[0].split('\n')[0]) * scale
+        except ValueError:
+            pass
+        
+        try:
+            loops = getLoops(outline[0], scale)
+        except (ValueError, IndexError):  # damaged outline - parts/holes are still read
+            loops = []
+        
+        for i in loops:
+            for j in i:
+                if j[0] == 'Line':
+                    board.outline.append(type='line', x1=j[1], y1=j[2], x2=j[3], y2=j[4])
+                elif j[0] == 'Arc3P':
+                    board.outline.append(type='arc', x1=j[1], y1=j[2], x2=j[3], y2=j[4], curve=-j[5])
+                elif j[0] == 'Circle':
+                    board.outline.append(type='circle', x1=j[1], y1=j[2], r=j[3])
+    # holes: v2 - diameter x y plating owner, v3 - diameter x y plating refdes type owner
+    holes = getSection(source, "DRILLED_HOLES")
+    if holes:
+        for i in holes[0].strip().split('\n'):
+            dane = re.sub(r'\s+', ' ', i.strip()).split(" ")
+            try:
+                if version == 2:
+                    kind = 'board' if dane[4] in ['BOARD', 'NOREFDES'] else 'pad'
+                else:
+                    kind = {'PIN': 'pad', 'VIA': 'via'}.get(dane[5], 'board')
+                
+                board.holes.append(type='circle', x=float(dane[1]) * scale, y=float(dane[2]) * scale, r=float(dane[0]) * scale / 2.,
+                    plated=dane[3] != "NPTH", kind=kind)
+            except (ValueError, IndexError):
+                continue
+    # parts: v2 - package number refdes / x y rot side, v3 - package number refdes / x y z rot side status
+    placement = getSection(source, "PLACEMENT")
+    if placement:
+        for param in getRecords(placement[0], 2):
+            try:
+                if version == 2:
+                    [z, rot, side] = [0.0, float(param[5]), param[6]]
+                else:
+                    [z, rot, side] = [float(param[5]) * scale, float(param[6]), param[7]]
+                
+                board.parts.append(name=param[2].replace('"', ''), package=param[0].replace('"', ''), library=param[1].replace('"', ''), value='',
+                    x=float(param[3]) * scale, y=float(param[4]) * scale, z=z, rot=rot, side=side)
+            except (ValueError, IndexError):
+                continue
+    # texts (v3): x y height length "text"
+    notes = getSection(source, "NOTES")
+    if notes:
+        for i in notes[0].split('\n'):
+            dane = re.findall(r'(".*?"|.*?)[\s|\n]+', i + "\n", re.DOTALL)
+            if len(dane) <= 1:
+                continue
+            try:
+                board.annotations.append(text=str(dane[4])[1:-1], x=float(dane[0]) * scale, y=float(dane[1]) * scale, size=float(dane[2]) * scale, part=-1, kind='text')
+            except (ValueError, IndexError):
+                continue
+    #
+    return board
@@ -31,21 +31,15 @@ try:
 except:
     import __builtin__ as builtins
 import re
-from math import sqrt
 #
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
-
-
-def getUnitsDefinition(projektBRD):
-    if re.search(r'THOU', projektBRD):
-        return 0.0254
-    elif re.search(r'MM', projektBRD):
-        return 1
-    else:
-        return 0.000001
+from formats.baseModel import baseModel, holesGrid
+from formats.idfIR import readIdfBoard, getUnitsDefinition, getSection, getLoops, __version__ as idfIRVersion
+from formats.boardIR import boardIR
+from PCBboardCache import getParsedBoard
+from formats.boardBuilder import boardBuilder
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -98,6 +92,7 @@ class IDFv2_PCB(baseModel):
         self.databaseType = "idf"
         self.parent = parent
         self.mnoznik = 1
+        self.idfVersion = 2
 
     def defineFunction(self, layerNumber):
         return "constraint"
@@ -105,13 +100,12 @@ class IDFv2_PCB(baseModel):
     def setProject(self):
         self.projektBRD = builtins.open(self.fileName, "r").read().replace("\r\n", "\n").replace("\r", "\n")
         self.mnoznik = getUnitsDefinition(self.projektBRD)
+        # outline/holes/parts/texts - FreeCAD independent board IR
+        self.board = boardIR().fromData(getParsedBoard(self.fileName, 'idf_ir', idfIRVersion, self.idfVersion, lambda: readIdfBoard(self.projektBRD, self.idfVersion).toData()))
+        self.builder = boardBuilder(self.board)
     
     def getArea(self, areaName):
-        data = re.findall(r'\.'+areaName+'[\s+UNOWNED|\s+MCAD|\s+ECAD|]*\n(.*?)\.END_'+areaName+'\n', self.projektBRD, re.DOTALL)
-        if len(data):
-            return data
-        else:
-            return None
+        return getSection(self.projektBRD, areaName)
 
     def getConstraintAreas(self, layerNumber):
         area = None
@@ -176,222 +170,69 @@ class IDFv2_PCB(baseModel):
 
     def getParts(self):
         parts = []
-        try:
-            data = self.getArea("PLACEMENT")[0].split("\n")
+        #
+        for i in self.board.parts:
+            dataO = {
+                'name': i['name'], 
+                'library': i['library'], 
+                'package': i['package'], 
+                'value': i['value'], 
+                'x': i['x'], 
+                'y': i['y'],
+                'locked': False,
+                'populated': False, 
+                'smashed': False, 
+                'rot': i['rot'], 
+                'side': i['side'],
+                'dataElement': None
+            }
+            if self.idfVersion == 3:
+                dataO['z'] = i['z']
             
-            for i in [" ".join(data[i:i+2]) for i in range(0, len(data), 2)]:
-                param = re.findall(r'(".*?"|.*?)[\s|\n]+', i + "\n", re.DOTALL)
-                if len(param) > 1:
-                    dataO = {
-                        'name': param[2].replace('"', ''), 
-                        'library': param[1].replace('"', ''), 
-                        'package': param[0].replace('"', ''), 
-                        'value': '', 
-                        'x': float(param[3]) * self.mnoznik, 
-                        'y': float(param[4]) * self.mnoznik,
-                        'locked': False,
-                        'populated': False, 
-                        'smashed': False, 
-                        'rot': float(param[5]), 
-                        'side': param[6],
-                        'dataElement': i + "__"
-                    }
-                    
-                    dataO['EL_Name'] = {
-                        "text": "NAME",
-                        "x": dataO['x'] - 2,
-                        "y": dataO['y'] + 2,
-                        "z": 0,
-                        "size": 1.27,
-                        "rot": dataO['rot'],
-                        "side": dataO['side'],
-                        "align": "bottom-left",
-                        "spin": True,
-                        "font": "Fixed",
-                        "display": True,
-                        "distance": 1,
-                        "tracking": 0,
-                        "mode": 'param'
-                    }
-                    
-                    dataO['EL_Value'] = {
-                        "text": "VALUE",
-                        "x": dataO['x'] - 2,
-                        "y": dataO['y'] - 2,
-                        "z": 0,
-                        "size": 1.27,
-                        "rot": dataO['rot'],
-                        "side": dataO['side'],
-                        "align": "bottom-left",
-                        "spin": True,
-                        "font": "Fixed",
-                        "display": False,
-                        "distance": 1,
-                        "tracking": 0,
-                        "mode": 'param'
-                    }
-                    #
-                    parts.append(dataO)
-        except:
-            pass
+            dataO['EL_Name'] = {
+                "text": "NAME",
+                "x": dataO['x'] - 2,
+                "y": dataO['y'] + 2,
+                "z": 0,
+                "size": 1.27,
+                "rot": dataO['rot'],
+                "side": dataO['side'],
+                "align": "bottom-left",
+                "spin": True,
+                "font": "Fixed",
+                "display": True,
+                "distance": 1,
+                "tracking": 0,
+                "mode": 'param'
+            }
+            
+            dataO['EL_Value'] = {
+                "text": "VALUE",
+                "x": dataO['x'] - 2,
+                "y": dataO['y'] - 2,
+                "z": 0,
+                "size": 1.27,
+                "rot": dataO['rot'],
+                "side": dataO['side'],
+                "align": "bottom-left",
+                "spin": True,
+                "font": "Fixed",
+                "display": False,
+                "distance": 1,
+                "tracking": 0,
+                "mode": 'param'
+            }
+            #
+            parts.append(dataO)
         #
         return parts
     
     def getHoles(self, holesObject, types, Hmin, Hmax):
-        ''' holes/vias '''
-        if types['IH']:  # detecting collisions between holes - intersections
-            holesList = []
-        
-        try:
-            for i in self.getArea("DRILLED_HOLES")[0].strip().split('\n'):
-                dane = re.sub(r'\s+', ' ', i).split(" ")
-                if dane[3] == "NPTH":  # Non-plated (non-conducting) through hole
-                    continue
-                #
-                r = float(dane[0]) * self.mnoznik / 2. + 0.001
-                x = float(dane[1]) * self.mnoznik
-                y = float(dane[2]) * self.mnoznik
-                #
-                if self.filterHoles(r, Hmin, Hmax):
-                    if types['IH']:  # detecting collisions between holes - intersections
-                        if self.detectIntersectingHoles(holesList, x, y, r):
-                            if dane[4] in ['BOARD', 'NOREFDES'] and types['H'] or not dane[4] in ['BOARD', 'NOREFDES'] and types['P']:
-                                holesList.append([x, y, r])
-                                holesObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y, 0.), FreeCAD.Vector(0, 0, 1), r))
-                    else:
-                        if dane[4] in ['BOARD', 'NOREFDES'] and types['H'] or not dane[4] in ['BOARD', 'NOREFDES'] and types['P']:
-                            holesObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y, 0.), FreeCAD.Vector(0, 0, 1), r))
-        except Exception as e:
-            FreeCAD.Console.PrintWarning("{0}\n".format(e))
+        ''' holes/vias - non-plated holes are skipped '''
+        return self.builder.addHoles(holesObject, types, Hmin, Hmax, holesGrid(), nonPlated=False)
         
     def pobierzLinie(self, pcb):
-        area = re.findall(r'(.*?)\n', pcb, re.MULTILINE|re.DOTALL)
-        #
-        data = []
-        data.append([])
-        # if len(area[0].split(" ")) <= 3:
-            # data[-1].append(area[0])
-        # area.pop(0)
-        number = None # Indicates board outline / Indicates additional board cutouts labeled
-
-        for i in range(0, len(area)):
-            value = re.sub(r'\s+', ' ', area[i])
-            
-            if len(value.split(" ")) <= 3: # extra header
-                value_1 = re.sub(r'\s+', ' ', area[i + 1])
-                
-                data.append([])
-                data[-1].append(value)
-                number = int(value_1.split(" ")[0])
-                continue
-
-            if number == None:
-                number = int(value.split(" ")[0])
-            
-            if int(value.split(" ")[0]) == number:
-                data[-1].append(value)
-            else:
-                data.append([])
-                data[-1].append(value)
-                number = int(area[i].split(" ")[0])
-        ###########################
-        dataOut = []
-        for i in data:
-            if len(i):
-                direction = float(i[-1].split(" ")[0])
-                
-                if len(i[0].split(" ")) <= 3:
-                    stop = 1
-                    dataOut.append([i[0].split(" ")])
-                else:
-                    stop = 0
-                    dataOut.append([])
-                
-                
-                if direction == 0:  # counter-clockwise direction / board outline
-                    if len(i) <= 3: # circle
-                        (num1, xs, ys, dummy) = i[-2].split(" ")
-                        (num2, x, y, curve) = i[-1].split(" ")
-                        
-                        xs = float(xs) * self.mnoznik
-                        ys = float(ys) * self.mnoznik
-                        x = float(x) * self.mnoznik
-                        y = float(y) * self.mnoznik
-                        r = sqrt((x - xs) ** 2 + (y - ys) ** 2)
-                        
-                        dataOut[-1].append(['Circle', xs, ys, r])
-                    else:
-                        for j in range(len(i)-1, stop, -1):
-                            data_1 = i[j].split(" ")
-                            data_2 = i[j - 1].split(" ")
-                            
-                            x1 = float(data_1[1]) * self.mnoznik
-                            y1 = float(data_1[2]) * self.mnoznik
-                            eType = float(data_1[3])
-                            
-                            x2 = float(data_2[1]) * self.mnoznik
-                            y2 = float(data_2[2]) * self.mnoznik
-                            
-                            if eType == 0.0:
-                                dataOut[-1].append(['Line', x1, y1, x2, y2])
-                            else:
-                                dataOut[-1].append(['Arc3P', x1, y1, x2, y2, eType])
-                else:  # clockwise direction /  board cutouts
-                    if len(i) <= 3: # circle
-                        (num1, xs, ys, dummy) = i[-2].split(" ")
-                        (num2, x, y, curve) = i[-1].split(" ")
-                        
-                        xs = float(xs) * self.mnoznik
-                        ys = float(ys) * self.mnoznik
-                        x = float(x) * self.mnoznik
-                        y = float(y) * self.mnoznik
-                        r = sqrt((x - xs) ** 2 + (y - ys) ** 2)
-                        
-                        dataOut[-1].append(['Circle', xs, ys, r])
-                    else:
-                        for j in range(stop, len(i)-1):
-                            data_1 = i[j].split(" ")
-                            data_2 = i[j + 1].split(" ")
-                            
-                            x1 = float(data_1[1]) * self.mnoznik
-                            y1 = float(data_1[2]) * self.mnoznik
-                            eType = float(data_1[3])
-                            
-                            x2 = float(data_2[1]) * self.mnoznik
-                            y2 = float(data_2[2]) * self.mnoznik
-                            
-                            if eType == 0.0:
-                                dataOut[-1].append(['Line', x1, y1, x2, y2])
-                            else:
-                                dataOut[-1].append(['Arc3P', x1, y1, x2, y2, eType])
-        #
-        return dataOut
+        return getLoops(pcb, self.mnoznik)
         
     def getPCB(self, borderObject):
-        try:
-            for i in self.pobierzLinie(self.getArea("BOARD_OUTLINE")[0]):
-                for j in range(0, len(i)):  # dodanie linii/luku
-                    if i[j][0] == 'Arc3P':
-                        x1 = i[j][1]
-                        y1 = i[j][2]
-                        x2 = i[j][3]
-                        y2 = i[j][4]
-                        
-                        [x3, y3] = self.arcMidPoint([x1, y1], [x2, y2], i[j][5] * -1)
-                        arc = Part.ArcOfCircle(FreeCAD.Vector(x1, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y2, 0.0))
-                        borderObject.addGeometry(arc)
-                    elif i[j][0] == 'Line':
-                        x1 = i[j][1]
-                        y1 = i[j][2]
-                        x2 = i[j][3]
-                        y2 = i[j][4]
-                        
-                        borderObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x2, y2, 0)))
-                    elif i[j][0] == 'Circle': # IDF v3
-                        x = i[j][1]
-                        y = i[j][2]
-                        r = i[j][3]
-                        
-                        borderObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y), FreeCAD.Vector(0, 0, 1), r))
-        except Exception as e:
-            FreeCAD.Console.PrintWarning("{0}\n".format(e))
+        self.builder.addOutline(borderObject)
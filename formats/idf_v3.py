@@ -95,6 +95,7 @@ class IDFv3_PCB(IDFv2_PCB):
         self.databaseType = "idf"
         self.parent = parent
         self.mnoznik = 1
+        self.idfVersion = 3
     
     def defineFunction(self, layerNumber):
         if layerNumber == "ANNOTATIONS":
@@ -102,84 +103,16 @@ class IDFv3_PCB(IDFv2_PCB):
         else:
             return "constraint"
 
-    def getParts(self):
-        parts = []
-        try:
-            data = self.getArea("PLACEMENT")[0].split("\n")
-            
-            for i in [" ".join(data[i:i+2]) for i in range(0, len(data), 2)]:
-                param = re.findall(r'(".*?"|.*?)[\s|\n]+', i + "\n", re.DOTALL)
-                if len(param) > 1:
-                    dataO = {
-                        'name': param[2].replace('"', ''), 
-                        'library': param[1].replace('"', ''), 
-                        'package': param[0].replace('"', ''), 
-                        'value': '', 
-                        'x': float(param[3]) * self.mnoznik, 
-                        'y': float(param[4]) * self.mnoznik,
-                        'locked': False,
-                        'populated': False, 
-                        'smashed': False, 
-                        'rot': float(param[6]), 
-                        'side': param[7],
-                        'z': float(param[5]) * self.mnoznik,
-                        'dataElement': i + "__"
-                    }
-                    
-                    dataO['EL_Name'] = {
-                        "text": "NAME",
-                        "x": dataO['x'] - 2,
-                        "y": dataO['y'] + 2,
-                        "z": 0,
-                        "size": 1.27,
-                        "rot": dataO['rot'],
-                        "side": dataO['side'],
-                        "align": "bottom-left",
-                        "spin": True,
-                        "font": "Fixed",
-                        "display": True,
-                        "distance": 1,
-                        "tracking": 0,
-                        "mode": 'param'
-                    }
-                    
-                    dataO['EL_Value'] = {
-                        "text": "VALUE",
-                        "x": dataO['x'] - 2,
-                        "y": dataO['y'] - 2,
-                        "z": 0,
-                        "size": 1.27,
-                        "rot": dataO['rot'],
-                        "side": dataO['side'],
-                        "align": "bottom-left",
-                        "spin": True,
-                        "font": "Fixed",
-                        "display": False,
-                        "distance": 1,
-                        "tracking": 0,
-                        "mode": 'param'
-                    }
-                    #
-                    parts.append(dataO)
-        except:
-            pass
-        #
-        return parts
-
     def getNormalAnnotations(self):
         adnotacje = []
         #
-        for i in self.getArea("NOTES")[0].split('\n'):
-            dane = re.findall(r'(".*?"|.*?)[\s|\n]+', i + "\n", re.DOTALL)
-            if len(dane) <= 1:
-                continue
-            
+        for i in self.board.getAnnotations():
             adnotacje.append({
-                "text": str(dane[4])[1:-1],
-                "x": float(dane[0]) * self.mnoznik,
-                "y": float(dane[1]) * self.mnoznik,
+                "text": i['text'],
+                "x": i['x'],
+                "y": i['y'],
                 "z": 0,
-                "size": float(dane[2]) * self.mnoznik,
+                "size": i['size'],
                 "rot": 0,
                 "side": 'TOP',
                 "align": "bottom-left",
@@ -192,30 +125,3 @@ class IDFv3_PCB(IDFv2_PCB):
             })
         #
         return adnotacje
-
-    def getHoles(self, holesObject, types, Hmin, Hmax):
-        ''' holes/vias '''
-        if types['IH']:  # detecting collisions between holes - intersections
-            holesList = []
-        
-        try:
-            for i in self.getArea("DRILLED_HOLES")[0].strip().split('\n'):
-                dane = re.sub(r'\s+', ' ', i).split(" ")
-                if dane[3] == "NPTH":  # Non-plated (non-conducting) through hole
-                    continue
-                #
-                r = float(dane[0]) * self.mnoznik / 2. + 0.001
-                x = float(dane[1]) * self.mnoznik
-                y = float(dane[2]) * self.mnoznik
-                #
-                if self.filterHoles(r, Hmin, Hmax):
-                    if types['IH']:  # detecting collisions between holes - intersections
-                        if self.detectIntersectingHoles(holesList, x, y, r):
-                            if dane[5] == 'PIN' and types['P'] or dane[5] == 'VIA' and types['V'] or types['H'] and dane[5] not in ["PIN", "VIA"]:
-                                holesList.append([x, y, r])
-                                holesObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y, 0.), FreeCAD.Vector(0, 0, 1), r))
-                    else:
-                        if dane[5] == 'PIN' and types['P'] or dane[5] == 'VIA' and types['V'] or types['H'] and dane[5] not in ["PIN", "VIA"]:
-                            holesObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y, 0.), FreeCAD.Vector(0, 0, 1), r))
-        except Exception as e:
-            FreeCAD.Console.PrintWarning("{0}\n".format(e))
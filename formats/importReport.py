@@ -0,0 +1,125 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+import time
+import json
+import csv
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+
+#
+# Timing of board import - stages (nested), counters of created objects, JSON/CSV report.
+# Does not depend on FreeCAD.
+#
+
+
+class importStage(object):
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+    
+    def __enter__(self):
+        self.report.startStage(self.name)
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        self.report.stopStage(excType is not None)
+        return False
+
+
+class importReport(object):
+    def __init__(self, fileName='', fileFormat=''):
+        self.fileName = fileName
+        self.fileFormat = fileFormat
+        self.stages = []  # [name, start, time, counters, error]
+        self.path = []  # numbers of running stages
+        self.counters = {}
+        self.start = time.time()
+    
+    def stage(self, name):
+        ''' with report.stage("Layer F.Cu"): ... '''
+        return importStage(self, name)
+    
+    def startStage(self, name):
+        if len(self.path):
+            name = self.stages[self.path[-1]][0] + '/' + name
+        
+        self.stages.append([name, time.time() - self.start, 0.0, {}, False])
+        self.path.append(len(self.stages) - 1)
+    
+    def stopStage(self, error=False):
+        stage = self.stages[self.path.pop()]
+        stage[2] = time.time() - self.start - stage[1]
+        stage[4] = error
+    
+    def count(self, name, value=1):
+        ''' counter of the whole import and of all running stages '''
+        self.counters[name] = self.counters.get(name, 0) + value
+        
+        for i in self.path:
+            self.stages[i][3][name] = self.stages[i][3].get(name, 0) + value
+    
+    def getTotalTime(self):
+        return time.time() - self.start
+    
+    def getReport(self):
+        return {
+            'file': self.fileName,
+            'format': self.fileFormat,
+            'total': self.getTotalTime(),
+            'counters': self.counters,
+            'stages': [{'name': i[0], 'start': i[1], 'time': i[2], 'counters': i[3], 'error': i[4]} for i in self.stages],
+        }
+    
+    def getSummary(self):
+        ''' text table: stage, time, counters '''
+        summary = []
+        for i in self.getReport()['stages']:
+            counters = ', '.join(['{0}: {1}'.format(j, k) for j, k in sorted(i['counters'].items())])
+            summary.append('{0:<50} {1:>9.3f}[s]  {2}'.format(i['name'], i['time'], counters))
+        summary.append('{0:<50} {1:>9.3f}[s]'.format('Total', self.getTotalTime()))
+        
+        return '\n'.join(summary)
+    
+    def saveJSON(self, fileName):
+        with builtins.open(fileName, "w") as plik:
+            json.dump(self.getReport(), plik, indent=1)
+    
+    def saveCSV(self, fileName):
+        ''' one row for each stage - counters in separate columns '''
+        report = self.getReport()
+        counters = sorted(report['counters'].keys())
+        
+        with builtins.open(fileName, "w") as plik:
+            writer = csv.writer(plik, lineterminator='\n')
+            writer.writerow(['stage', 'start', 'time', 'error'] + counters)
+            
+            for i in report['stages']:
+                writer.writerow([i['name'], '{0:.6f}'.format(i['start']), '{0:.6f}'.format(i['time']), int(i['error'])] + [i['counters'].get(j, 0) for j in counters])
+            writer.writerow(['Total', '0', '{0:.6f}'.format(report['total']), 0] + [report['counters'][j] for j in counters])
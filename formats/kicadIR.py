@@ -0,0 +1,329 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+try:
+    import builtins
+except:
+    import __builtin__ as builtins
+from math import sqrt, sin, cos, atan2, degrees, radians
+#
+from formats.sexpr import sexprParse, sexprIndex, sexprFind, sexprFindAll, sexprValue, sexprSearch, sexprSearchAll
+from formats.boardIR import boardIR
+
+
+__version__ = 3  # parsed boards cache - change if IR created from the tree changes
+#
+# KiCad *.kicad_pcb -> board IR (formats/boardIR.py). Does not depend on FreeCAD.
+# Y axis is flipped (KiCad Y axis points down), so arcs change their direction (curve * -1).
+#
+
+
+def getPoint(node, name):
+    point = sexprFind(node, name)
+    return [float(point[1]), float(point[2])]
+
+
+def getPosition(node):
+    at = sexprFind(node, 'at')
+    #
+    if len(at) > 3:
+        return [float(at[1]), float(at[2]), float(at[3])]
+    return [float(at[1]), float(at[2]), 0.0]
+
+
+def getWidth(node, default=0):
+    width = sexprFind(node, 'width')
+    if width is None:  # newer files - (stroke (width 0.1) (type solid))
+        width = sexprFind(sexprFind(node, 'stroke'), 'width')
+    
+    if width is None:
+        return default
+    return float(width[1])
+
+
+def arcCenter(x1, y1, x2, y2, x3, y3):
+    ''' center of the circle through three points (ZeroDivisionError for collinear points) '''
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    xs = ((x1 ** 2 + y1 ** 2) * (y2 - y3) + (x2 ** 2 + y2 ** 2) * (y3 - y1) + (x3 ** 2 + y3 ** 2) * (y1 - y2)) / d
+    ys = ((x1 ** 2 + y1 ** 2) * (x3 - x2) + (x2 ** 2 + y2 ** 2) * (x1 - x3) + (x3 ** 2 + y3 ** 2) * (x2 - x1)) / d
+    return [xs, ys]
+
+
+def arcAngle(start, mid, end):
+    ''' (start) (mid) (end) arc -> [center, angle] (angle < 0: clockwise) '''
+    [xc, yc] = arcCenter(start[0], start[1], mid[0], mid[1], end[0], end[1])
+    #
+    startAngle = degrees(atan2(start[1] - yc, start[0] - xc))
+    midAngle = (degrees(atan2(mid[1] - yc, mid[0] - xc)) - startAngle) % 360
+    curve = (degrees(atan2(end[1] - yc, end[0] - xc)) - startAngle) % 360
+    if midAngle > curve:  # clockwise
+        curve -= 360
+    
+    return [[xc, yc], curve]
+
+
+def rotatePoint(point, center, angle):
+    ''' same as mathFunctions.obrocPunkt2() '''
+    sinKAT = float("%4.10f" % sin(radians(angle)))
+    cosKAT = float("%4.10f" % cos(radians(angle)))
+    #
+    return [((point[0] - center[0]) * cosKAT) - sinKAT * (point[1] - center[1]) + center[0],
+        ((point[0] - center[0]) * sinKAT) + cosKAT * (point[1] - center[1]) + center[1]]
+
+
+def getFootprintKey(module):
+    ''' modules with the same key differ only in placement, texts and nets '''
+    key = [module[1]]
+    #
+    for i in module[2:]:
+        if isinstance(i, list):
+            if i[0] in ['at', 'tedit', 'tstamp', 'path', 'fp_text']:
+                continue
+            elif i[0] == 'pad':
+                i = [j for j in i if not (isinstance(j, list) and j[0] in ['net', 'tstamp', 'pinfunction', 'pintype'])]
+        
+        key.append(i)
+    #
+    return repr(key)
+
+
+def getModuleText(module, textType):
+    for i in sexprFindAll(module, 'fp_text'):
+        if i[1] == textType:
+            return i
+    return None
+
+
+def getText(node):
+    ''' (fp_text reference "R1" (at ...)) or (gr_text "R1" (at ...)) -> annotation, None if incomplete '''
+    try:
+        if node[0] == 'fp_text':
+            txt = node[2]
+        else:
+            txt = node[1]
+        [x, y, rot] = getPosition(node)
+        layer = sexprValue(node, 'layer')
+        size = float(sexprSearch(node, 'size')[1])
+    except:
+        return None
+    
+    if layer is None:
+        return None
+    return {
+        'text': txt.replace('\r\n', '\n').replace('\r', '\n').replace('\\n', '\n'),
+        'x': x,
+        'y': y * (-1),
+        'size': size,
+        'rot': rot,
+        'layer': layer,
+        'justify': sexprSearch(node, 'justify'),
+    }
+
+
+def getPolygonPoints(polygon):
+    pol = []
+    #
+    for j in sexprFindAll(sexprFind(polygon, 'pts'), 'xy'):
+        pol.append([float(j[1]), float(j[2]) * -1])
+    #
+    return pol
+
+
+def getPadsList(module, allLayers):
+    ''' pads of the module in module coordinates (without nets) '''
+    pads = []
+    #
+    for j in sexprFindAll(module, 'pad'):
+        pType = j[2]  # pad type - SMD/thru_hole/connect/np_thru_hole
+        pShape = j[3]  # pad shape - circle/rect/oval/trapezoid/custom
+        [x, y, rot] = getPosition(j)
+        size = sexprFind(j, 'size')
+        layers = sexprFind(j, 'layers')[1:]
+        if not len(layers):
+            layers = allLayers
+        #
+        [xOF, yOF] = [0.0, 0.0]
+        [drillX, drillY] = [0.0, 0.0]
+        hType = None
+        
+        data = sexprFind(j, 'drill')
+        if data is not None:
+            params = [k for k in data[1:] if not isinstance(k, list)]
+            
+            if pType == 'smd' or not len(params):
+                pass
+            elif params[0] == 'oval':
+                hType = 'oval'
+                drillX = float(params[1])
+                drillY = float(params[-1])
+            else:
+                hType = 'circle'
+                drillX = drillY = float(params[0])
+            
+            offset = sexprFind(data, 'offset')
+            if offset:
+                xOF = float(offset[1])
+                yOF = float(offset[2])
+        
+        rectDelta = sexprFind(j, 'rect_delta')
+        if rectDelta is None:
+            [deltaX, deltaY] = [0.0, 0.0]
+        else:
+            [deltaX, deltaY] = [float(rectDelta[2]) / 2., float(rectDelta[1]) / 2.]
+        
+        if pShape == 'custom':  # custom pad primitives
+            polygons = [getPolygonPoints(k) for k in sexprSearchAll(j, 'gr_poly')]
+        else:
+            polygons = []
+        ##
+        pads.append({'x': x, 'y': y * (-1), 'rot': rot, 'type': pType, 'shape': pShape, 'dx': float(size[1]), 'dy': float(size[2]),
+            'xOF': xOF, 'yOF': yOF, 'deltaX': deltaX, 'deltaY': deltaY, 'holeType': hType, 'drillX': drillX, 'drillY': drillY, 'layers': layers, 'polygons': polygons})
+    #
+    return pads
+
+
+def readKicadBoard(source, borderLayer='Edge.Cuts', frontLayer='F.Cu'):
+    ''' source: file name or tree returned by sexprParse()
+        frontLayer: layer of parts placed on the top side '''
+    if not isinstance(source, list):
+        with builtins.open(source, "r") as plik:
+            source = sexprParse(plik.read())[0]
+    #
+    board = boardIR(fileFormat='kicad')
+    index = sexprIndex(source)
+    
+    for i in sexprFind(source, 'layers')[1:]:
+        board.layers[i[1]] = int(i[0])
+    
+    for i in index.get('net', []):
+        board.nets[i[1]] = i[2]
+    
+    try:
+        board.thickness = float(sexprSearch(source, 'thickness')[1])
+    except:
+        pass
+    # tracks
+    for i in index.get('segment', []):
+        [x1, y1] = getPoint(i, 'start')
+        [x2, y2] = getPoint(i, 'end')
+        
+        board.tracks.append(x1=x1, y1=y1 * (-1), x2=x2, y2=y2 * (-1), width=getWidth(i), layer=sexprValue(i, 'layer'), net=sexprValue(i, 'net'))
+    # (arc (start x y) (mid x y) (end x y) ...)
+    for i in index.get('arc', []):
+        [xs, ys] = getPoint(i, 'start')
+        [xe, ye] = getPoint(i, 'end')
+        try:
+            curve = arcAngle([xs, ys], getPoint(i, 'mid'), [xe, ye])[1]
+        except ZeroDivisionError:  # collinear points
+            continue
+        
+        board.arcs.append(x1=xs, y1=ys * (-1), x2=xe, y2=ye * (-1), curve=-curve, width=getWidth(i), layer=sexprValue(i, 'layer'), net=sexprValue(i, 'net'))
+    # vias
+    try:
+        viaDrill = float(sexprSearch(source, 'via_drill')[1])
+    except:
+        viaDrill = 0.0
+    
+    for i in index.get('via', []):
+        [x, y, rot] = getPosition(i)
+        
+        drill = sexprValue(i, 'drill')
+        if drill is None:
+            drill = viaDrill / 2.
+        else:
+            drill = float(drill) / 2.
+        
+        board.vias.append(x=x, y=y * (-1), diameter=float(sexprValue(i, 'size')), drill=drill, layers=sexprFind(i, 'layers')[1:], net=sexprValue(i, 'net'))
+    # outline
+    for i in index.get('gr_line', []):
+        if sexprValue(i, 'layer') == borderLayer:
+            [x1, y1] = getPoint(i, 'start')
+            [x2, y2] = getPoint(i, 'end')
+            
+            if [x1, y1] != [x2, y2]:
+                board.outline.append(type='line', x1=x1, y1=y1 * (-1), x2=x2, y2=y2 * (-1))
+    
+    for i in index.get('gr_circle', []):
+        if sexprValue(i, 'layer') == borderLayer:
+            [xs, ys] = getPoint(i, 'center')
+            [x1, y1] = getPoint(i, 'end')
+            
+            board.outline.append(type='circle', x1=xs, y1=ys * (-1), r=sqrt((xs - x1) ** 2 + (ys - y1) ** 2))
+    
+    for i in index.get('gr_arc', []):
+        if sexprValue(i, 'layer') == borderLayer:
+            if sexprFind(i, 'angle'):  # (gr_arc (start center) (end point) (angle a))
+                [xs, ys] = getPoint(i, 'start')
+                [x1, y1] = getPoint(i, 'end')
+                curve = float(sexprValue(i, 'angle'))
+            else:  # (gr_arc (start) (mid) (end))
+                [x1, y1] = getPoint(i, 'start')
+                try:
+                    [[xs, ys], curve] = arcAngle([x1, y1], getPoint(i, 'mid'), getPoint(i, 'end'))
+                except ZeroDivisionError:
+                    continue
+            [x2, y2] = rotatePoint([x1, y1], [xs, ys], curve)
+            
+            board.outline.append(type='arc', x1=x1, y1=y1 * (-1), x2=x2, y2=y2 * (-1), curve=-curve)
+    # texts
+    for i in index.get('gr_text', []):
+        text = getText(i)
+        if text:
+            board.annotations.append(part=-1, kind='text', **text)
+    # parts/pads/pad holes - pads are read once for all identical footprints
+    footprints = {}
+    
+    for i in index.get('module', []):
+        [x, y, rot] = getPosition(i)
+        y = y * (-1)
+        reference = getModuleText(i, 'reference')
+        value = getModuleText(i, 'value')
+        package = i[1].split(':')[-1]
+        
+        part = board.parts.append(name=reference[2] if reference else '', package=package, library=package, value=value[2] if value else '',
+            x=x, y=y, rot=rot, side='TOP' if sexprValue(i, 'layer') == frontLayer else 'BOTTOM')
+        
+        for [kind, node] in [['reference', reference], ['value', value]]:
+            text = getText(node) if node else None
+            if text:
+                board.annotations.append(part=part, kind=kind, **text)
+        #
+        key = getFootprintKey(i)
+        if not key in footprints:
+            footprints[key] = getPadsList(i, list(board.layers.keys()))
+        
+        for [j, net] in zip(footprints[key], [sexprValue(k, 'net') for k in sexprFindAll(i, 'pad')]):
+            board.pads.append(part=part, net=net, **j)
+            
+            if j['holeType'] == 'circle' and j['drillX'] != 0.0:
+                [xR, yR] = rotatePoint([j['x'] + x, j['y'] + y], [x, y], rot)
+                board.holes.append(type='circle', x=xR, y=yR, r=j['drillX'] / 2., plated=j['type'] != 'np_thru_hole', kind='pad')
+            elif j['holeType'] == 'oval':
+                [xR, yR] = rotatePoint([j['x'] + x, j['y'] + y], [x, y], rot)
+                board.holes.append(type='oval', x=xR, y=yR, dx=j['drillX'], dy=j['drillY'], plated=j['type'] != 'np_thru_hole', kind='pad')
+    #
+    return board
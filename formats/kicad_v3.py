@@ -27,14 +27,18 @@
 
 import FreeCAD
 import Part
-import re
 from math import sqrt
 #import os
 #
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
+from formats.sexpr import sexprIndex, sexprFind, sexprFindAll, sexprValue, sexprSearch, __version__ as sexprVersion
+from formats.kicadIR import readKicadBoard, getFootprintKey, __version__ as kicadIRVersion
+from formats.boardIR import boardIR
+from PCBboardCache import getParsedBoard
+from formats.boardBuilder import boardBuilder
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -45,7 +49,7 @@ class dialogMAIN(dialogMAIN_FORM):
         self.plytkaPCB_otworyH.setChecked(False)
         self.plytkaPCB_otworyH.setDisabled(True)
         #
-        self.projektBRD = self.setProjectFile(filename)
+        self.projektBRD = getParsedBoard(filename, 'kicad_sexpr', sexprVersion, None, lambda: self.setProjectTree(filename))
         self.layersNames = self.getLayersNames()
         if FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetBool("boardImportThickness", True):
             self.gruboscPlytki.setValue(self.getBoardThickness())
@@ -54,13 +58,12 @@ class dialogMAIN(dialogMAIN_FORM):
         self.spisWarstw.sortItems(1)
         
     def getBoardThickness(self):
-        return float(re.findall(r'\(thickness (.+?)\)', self.projektBRD)[0])
+        return float(sexprSearch(self.projektBRD, 'thickness')[1])
         
     def getLayersNames(self):
         dane = {}
         
-        layers = re.search(r'\[start\]\(layers(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL).group(0)
-        for i in re.findall(r'\((.*?) (.*?) .*?\)', layers):
+        for i in sexprFind(self.projektBRD, 'layers')[1:]:
             side = "TOP"
             if i[1].startswith("B."):
                 side = "BOTTOM"
@@ -90,28 +93,66 @@ class KiCadv3_PCB(baseModel):
         #
         self.spisWarstw = {}
         self.elements = []
+        self.footprints = {}  # parsed modules shared by all identical footprints
         self.borderLayerNumber = 28
+        self.frontLayerNumber = 15  # parts on the top side
     
     def Draft2Sketch(self, elem, sketch):
         return (DraftGeomUtils.geom(elem.toShape().Edges[0], sketch.Placement))
 
     def setProject(self):
-        self.projektBRD = self.setProjectFile(self.fileName)
+        # file was already parsed (once) by the dialog - reuse the tree
+        self.projektBRD = self.dialogMAIN.projektBRD
+        self.projektIndex = sexprIndex(self.projektBRD)  # top-level forms grouped by head
         # layers
-        layers = re.search(r'\[start\]\(layers(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL).group(0)
-        for i in re.findall(r'\((.*?) (.*?) .*?\)', layers):
+        for i in sexprFind(self.projektBRD, 'layers')[1:]:
             self.spisWarstw[i[1]] = int(i[0])
+        # tracks/vias/holes/outline/parts/pads/texts - FreeCAD independent board IR
+        borderLayer = self.getLayerName(self.borderLayerNumber)
+        frontLayer = self.getLayerName(self.frontLayerNumber)
+        self.board = boardIR().fromData(getParsedBoard(self.fileName, 'kicad_ir', kicadIRVersion, [borderLayer, frontLayer], lambda: readKicadBoard(self.projektBRD, borderLayer, frontLayer).toData()))
+        self.builder = boardBuilder(self.board)
 
     def getSettings(self, paramName):
-        return re.search(r'\({0} (.*?)\)'.format(paramName), self.projektBRD).groups()[0]
+        return sexprSearch(self.projektBRD, paramName)[1]
+    
+    def getObjects(self, source, oType):
+        if source is self.projektBRD:
+            return self.projektIndex.get(oType, [])
+        return sexprFindAll(source, oType)
+    
+    def getPosition(self, node):
+        at = sexprFind(node, 'at')
+        #
+        x = float(at[1])
+        y = float(at[2])
+        if len(at) > 3:
+            rot = float(at[3])
+        else:
+            rot = 0.0
+        
+        return [x, y, rot]
+    
+    def getPoint(self, node, name):
+        point = sexprFind(node, name)
+        return [float(point[1]), float(point[2])]
+    
+    def getWidth(self, node, default=0):
+        width = sexprFind(node, 'width')
+        if width is None:  # newer files - (stroke (width 0.1) (type solid))
+            width = sexprFind(sexprFind(node, 'stroke'), 'width')
+        
+        if width is None:
+            return default
+        return float(width[1])
     
     def getDimensions(self):
         wymiary = []
         #
-        for i in re.findall(r'\[start\]\(dimension\s+(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL):
-            [x1, y1] = re.search(r'\(feature1\s+\(pts\s+\(xy\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(xy\s+[0-9\.-]*?\s+[0-9\.-]*?\)\)\)', i, re.MULTILINE|re.DOTALL).groups()
-            [x2, y2] = re.search(r'\(feature2\s+\(pts\s+\(xy\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(xy\s+[0-9\.-]*?\s+[0-9\.-]*?\)\)\)', i, re.MULTILINE|re.DOTALL).groups()
-            [x3, y3] = re.search(r'\(crossbar\s+\(pts\s+\(xy\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(xy\s+[0-9\.-]*?\s+[0-9\.-]*?\)\)\)', i, re.MULTILINE|re.DOTALL).groups()
+        for i in self.projektIndex.get('dimension', []):
+            [x1, y1] = self.getPoint(sexprFind(sexprFind(i, 'feature1'), 'pts'), 'xy')
+            [x2, y2] = self.getPoint(sexprFind(sexprFind(i, 'feature2'), 'pts'), 'xy')
+            [x3, y3] = self.getPoint(sexprFind(sexprFind(i, 'crossbar'), 'pts'), 'xy')
             #
             x1 = float(x1)
             y1 = float(y1) * (-1)
@@ -150,26 +191,24 @@ class KiCadv3_PCB(baseModel):
         ##
         return glue
 
+    def getVias(self, layer=None):
+        return self.board.getVias(layer)
+    
+    def getPadsCopperLayer(self, layerNumber):
+        # pads layers: 107 - top side, 108 - bottom side
+        if layerNumber == 107:
+            return self.getLayerName(15)
+        return self.getLayerName(0)
+
     def getPads(self, layerNew, layerNumber, layerSide, tentedViasLimit, tentedVias):
         # via
-        via_drill = float(self.getSettings('via_drill'))
-
-        for i in re.findall(r'\(via\s+\(at\s+(.*?)\s+(.*?)\)\s+\(size\s+(.*?)\)\s+(\(drill\s+(.*?)\)|)', self.projektBRD):
-            x = float(i[0])
-            y = float(i[1]) * (-1)
-            diameter = float(i[2])
-
-            if i[4] == '':
-                drill = via_drill / 2.
-            else:
-                drill = float(i[4]) / 2.
-            
+        for i in self.getVias(self.getPadsCopperLayer(layerNumber[0])):
             ##### ##### ##### 
             ##### tented dVias
-            if self.filterTentedVias(tentedViasLimit, tentedVias, drill * 2, False):
+            if self.filterTentedVias(tentedViasLimit, tentedVias, i['drill'] * 2, False):
                 continue
             ##### ##### ##### 
-            layerNew.addCircle(x, y, diameter / 2.)
+            layerNew.addCircle(i['x'], i['y'], i['diameter'] / 2.)
             layerNew.setFace()
         
         if not tentedVias:
@@ -177,13 +216,13 @@ class KiCadv3_PCB(baseModel):
             self.getElements()
             #
             for i in self.elements:
-                for j in self.getPadsList(i['dataElement']):
-                    if("np_" in j['padType'].lower()):  # mounting holes
+                for j in self.board.getPads(i['number']):
+                    if("np_" in j['type'].lower()):  # mounting holes
                         continue
                     #
                     xs = j['x'] + i['x']
                     ys = j['y'] + i['y']
-                    numerWarstwy = j['layers'].split(' ')
+                    numerWarstwy = j['layers']
                     
                     rot_2 = j['rot']
                     if i['rot'] != 0:
@@ -201,7 +240,7 @@ class KiCadv3_PCB(baseModel):
                         dodaj = True
                     #####
                     if dodaj:
-                        if j['padShape'] == 'rect':
+                        if j['shape'] == 'rect':
                             x1 = xs - j['dx'] / 2. + j['xOF']
                             y1 = ys - j['dy'] / 2. + j['yOF']
                             x2 = xs + j['dx'] / 2. + j['xOF']
@@ -212,13 +251,13 @@ class KiCadv3_PCB(baseModel):
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-                        elif j['padShape'] == 'circle':
+                        elif j['shape'] == 'circle':
                             layerNew.addCircle(xs + j['xOF'], ys + j['yOF'], j['dx'] / 2.)
                             layerNew.addRotation(xs, ys, rot_2)
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-                        elif j['padShape'] == 'oval':
+                        elif j['shape'] == 'oval':
                             if j['dx'] == j['dy']:
                                 layerNew.addCircle(xs + j['xOF'], ys + j['yOF'], j['dx'] / 2.)
                                 layerNew.addRotation(xs, ys, rot_2)
@@ -231,14 +270,8 @@ class KiCadv3_PCB(baseModel):
                                 layerNew.addRotation(i['x'], i['y'], i['rot'])
                                 layerNew.setChangeSide(i['x'], i['y'], i['side'])
                                 layerNew.setFace()
-                        elif j['padShape'] == 'trapezoid':
-                            if j[8].strip() == '':
-                                xRD = 0
-                                yRD = 0
-                            else:
-                                rect_delta = re.findall(r'\(rect_delta ([-0-9\.]*?) ([-0-9\.]*?) \)', j[8].strip())[0]
-                                yRD = float(rect_delta[0]) / 2.
-                                xRD = float(rect_delta[1]) / 2.
+                        elif j['shape'] == 'trapezoid':
+                            [xRD, yRD] = [j['deltaX'], j['deltaY']]
                             
                             x1 = xs - j['dx'] / 2. + j['xOF']
                             y1 = ys - j['dy'] / 2. + j['yOF']
@@ -250,161 +283,23 @@ class KiCadv3_PCB(baseModel):
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-
-    def getPadsList(self, model):
-        pads = []
-        #
-        dane2 = re.findall(r'\(pad .* ', model, re.MULTILINE|re.DOTALL)
-        if len(dane2):
-            dane2 = dane2[0].strip().split('(pad')
-        
-            for j in dane2:
-                if j != '':
-                    [x, y, rot] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', j).groups()
-                    pType= re.search(r'^.*?\s+([a-zA-Z_]+?)\s+', j).groups(0)[0]  # pad type - SMD/thru_hole/connect
-                    pShape = re.search(r'^.+?\s+.+?\s+([a-zA-Z_]+?)\s+', j).groups(0)[0]  # pad shape - circle/rec/oval/trapezoid
-                    [dx, dy] = re.search(r'\(size\s+([0-9\.-]+?)\s+([0-9\.-]+?)\)', j).groups(0)  #
-                    #layers = re.search(r'\(layers\s+(.+?)\)', j).groups(0)[0]  #
-                    layers = re.search(r'\(layers\s?(.*?|)\)', j).groups(0)[0].strip()  #
-                    data = re.search(r'\(drill(\s+[a-zA-Z]*?|)(\s+[-0-9\.]*?|)(\s+[-0-9\.]*?|)(\s+\(offset\s+(.*?)\s+(.*?)\)|)\)', j)
-                    #
-                    x = float(x)
-                    y = float(y) * (-1)
-                    dx = float(dx)
-                    dy = float(dy)
-                    if rot == '':
-                        rot = 0.0
-                    else:
-                        rot = float(rot)
-                        
-                    if layers == "":
-                        layers = ' '.join(self.spisWarstw.keys())
-                        
-                        
-                    if data == None:
-                        drill = 0.0
-                        hType = None
-                        [xOF, yOF] = [0.0, 0.0]
-                    else:
-                        data = data.groups()
-                        
-                        if pType == 'smd':
-                            drill = 0.0
-                            hType = None
-                        else:
-                            hType = data[0].strip()
-                            if hType == '':
-                                hType = 'circle'
-                                drill = float(data[1]) / 2.0
-                            else:
-                                drill = "{0} {1}".format(data[1], data[2])
-                        
-                        if not data[4] or data[4].strip() == '':
-                            xOF = 0.0
-                        else:
-                            xOF = float(data[4])
-                        
-                        if not data[5] or data[5].strip() == '':
-                            yOF = 0.0
-                        else:
-                            yOF = float(data[5])
-                    ##
-                    pads.append({'x': x, 'y': y, 'rot': rot, 'padType': pType, 'padShape': pShape, 'r': drill, 'dx': dx, 'dy': dy, 'holeType': hType, 'xOF': xOF, 'yOF': yOF, 'layers': layers, 'data': j})
-        #
-        return pads
-
+    
     def getHoles(self, holesObject, types, Hmin, Hmax):
-        holesList = []
-        
-        # vias
-        if types['V']:
-            via_drill = float(self.getSettings('via_drill'))
-            for i in re.findall(r'\(via\s+\(at\s+(.*?)\s+(.*?)\)\s+\(size\s+.*?\)\s+(\(drill\s+(.*?)\)|)', self.projektBRD):
-                x = float(i[0])
-                y = float(i[1]) * (-1)
+        # vias/pads
+        return self.builder.addHoles(holesObject, types, Hmin, Hmax, holesGrid())
 
-                if i[3] == '':
-                    r = via_drill / 2.
-                else:
-                    r = float(i[3]) / 2.
-                
-                holesList = self.addHoleToObject(holesObject, Hmin, Hmax, types['IH'], x, y, r, holesList)
-        # pads
-        if types['P']:
-            for i in re.findall(r'\[start\]\(module(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL):
-                [X1, Y1, ROT] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', i).groups()
-                #
-                X1 = float(X1)
-                Y1 = float(Y1) * (-1)
-                if ROT == '':
-                    ROT = 0.0
-                else:
-                    ROT = float(ROT)
-                ##
-                for j in self.getPadsList(i):
-                    if j['padType'] != 'smd' and j['r'] != 0.0:
-                        if j['holeType'] == "circle":
-                            [xR, yR] = self.obrocPunkt([j['x'], j['y']], [X1, Y1], ROT)
-                            r = j['r'] + 0.001
-                            
-                            holesList = self.addHoleToObject(holesObject, Hmin, Hmax, types['IH'], xR, yR, r, holesList)
-                        else:
-                            dx = float(j['r'].strip().split(' ')[0])
-                            dy = float(j['r'].strip().split(' ')[-1])
-                            
-                            if dx == dy:  # circle
-                                if self.filterHoles(r1, Hmin, Hmax):
-                                    holesObject.addGeometry(Part.Circle(FreeCAD.Vector(xR, yR, 0.), FreeCAD.Vector(0, 0, 1), w / 2.))
-                            else:  # oval
-                                x = float(j['x']) + X1
-                                y = float(j['y']) * (-1) + Y1
-                                curve = 90.
-                                
-                                if dx > dy:
-                                    e = (dy * 50 / 100.) / 2.
-                                    x1 = x - dx / 2. + e
-                                    y1 = y + dy / 2.
-                                    x2 = x + dx / 2. - e
-                                    y2 = y - dy / 2.
-                                    
-                                    holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x2, y1, 0)))
-                                    holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y2, 0), FreeCAD.Vector(x2, y2, 0)))
-                                    
-                                    [x3, y3] = self.arcMidPoint([x1, y1], [x1, y2], 90)
-                                    arc = Part.Arc(FreeCAD.Vector(x1, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x1, y2, 0.0))
-                                    holesObject.addGeometry(arc)
-                                    
-                                    [x3, y3] = self.arcMidPoint([x2, y1], [x2, y2], -90)
-                                    arc = Part.Arc(FreeCAD.Vector(x2, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y2, 0.0))
-                                    holesObject.addGeometry(arc)
-                                else:
-                                    e = (dx * 50 / 100.) / 2.
-                                    x1 = x - dx / 2.
-                                    y1 = y + dy / 2. - e
-                                    x2 = x + dx / 2.
-                                    y2 = y - dy / 2. + e
-                                    
-                                    holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x1, y2, 0)))
-                                    holesObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x2, y1, 0), FreeCAD.Vector(x2, y2, 0)))
-                                    
-                                    [x3, y3] = self.arcMidPoint([x1, y1], [x2, y1], -90)
-                                    arc = Part.Arc(FreeCAD.Vector(x1, y1, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y1, 0.0))
-                                    holesObject.addGeometry(arc)
-                                    
-                                    [x3, y3] = self.arcMidPoint([x1, y2], [x2, y2], 90)
-                                    arc = Part.Arc(FreeCAD.Vector(x1, y2, 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(x2, y2, 0.0))
-                                    holesObject.addGeometry(arc)
-    
     def getLine(self, layer, source, oType, m=[0,0]):
         data = []
         #
-        dane1 = re.findall(r'\({1}\s+\(start\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(end\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)(\s+\(angle\s+[0-9\.-]*?\)\s+|\s+)\(layer\s+{0}\)\s+\(width\s+([0-9\.]*?)\)(\s+\(tstamp\s+.+?\)|)\)'.format(layer, oType), source, re.MULTILINE|re.DOTALL)
-        for i in dane1:
-            x1 = float(i[0])
-            y1 = float(i[1]) * (-1)
-            x2 = float(i[2])
-            y2 = float(i[3]) * (-1)
-            width = float(i[5])
+        for i in self.getObjects(source, oType):
+            if layer is not None and sexprValue(i, 'layer') != layer:
+                continue
+            
+            [x1, y1] = self.getPoint(i, 'start')
+            [x2, y2] = self.getPoint(i, 'end')
+            y1 *= -1
+            y2 *= -1
+            width = self.getWidth(i)
             
             if [x1, y1] == [x2, y2]:
                 continue
@@ -424,7 +319,7 @@ class KiCadv3_PCB(baseModel):
                     'x2': x2,
                     'y2': y2,
                     'width': width,
-                    'layer': layer,
+                    'layer': sexprValue(i, 'layer'),
                     'type': oType,
                 })
         #
@@ -433,18 +328,17 @@ class KiCadv3_PCB(baseModel):
     def getCircle(self, layer, source, oType, m=[0,0]):
         data = []
         #
-        dane1 = re.findall(r'\({1}\s+\(center\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(end\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(layer\s+{0}\)(\s+\(width\s+([0-9\.]*?)\)|)(\s+\(tstamp\s+.+?\)|)\)'.format(layer, oType), source, re.MULTILINE|re.DOTALL)
-        for i in dane1:
-            xs = float(i[0])
-            ys = float(i[1]) * (-1)
-            x1 = float(i[2])
-            y1 = float(i[3]) * (-1)
+        for i in self.getObjects(source, oType):
+            if layer is not None and sexprValue(i, 'layer') != layer:
+                continue
+            
+            [xs, ys] = self.getPoint(i, 'center')
+            [x1, y1] = self.getPoint(i, 'end')
+            ys *= -1
+            y1 *= -1
             r = sqrt((xs - x1) ** 2 + (ys - y1) ** 2)
             
-            if i[5] == '':
-                width = 0.01
-            else:
-                width = float(i[5])
+            width = self.getWidth(i, 0.01)
             
             if m[0] != 0:
                 xs += m[0]
@@ -456,7 +350,7 @@ class KiCadv3_PCB(baseModel):
                     'y': ys,
                     'r': r,
                     'width': width,
-                    'layer': layer,
+                    'layer': sexprValue(i, 'layer'),
                     'type': oType,
                 })
         #
@@ -465,19 +359,16 @@ class KiCadv3_PCB(baseModel):
     def getArc(self, layer, source, oType, m=[0,0]):
         data = []
         #
-        dane1 = re.findall(r'\({1}\s+\(start\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(end\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(angle\s+([0-9\.-]*?)\)\s+\(layer\s+{0}\)(\s+\(width\s+([0-9\.]*?)\)|)(\s+\(tstamp\s+.+?\)|)\)'.format(layer, oType), source, re.MULTILINE|re.DOTALL)
-        for i in dane1:
-            xs = float(i[0])
-            ys = float(i[1])
-            x1 = float(i[2])
-            y1 = float(i[3])
-            curve = float(i[4])
+        for i in self.getObjects(source, oType):
+            if layer is not None and sexprValue(i, 'layer') != layer:
+                continue
+            
+            [xs, ys] = self.getPoint(i, 'start')
+            [x1, y1] = self.getPoint(i, 'end')
+            curve = float(sexprValue(i, 'angle'))
             [x2, y2] = self.obrocPunkt2([x1, y1], [xs, ys], curve)
             
-            if i[6].strip() != '':
-                width = float(i[6]) 
-            else:
-                width = 0
+            width = self.getWidth(i)
                 
             y1 *= -1
             y2 *= -1
@@ -496,62 +387,34 @@ class KiCadv3_PCB(baseModel):
                     'y2': y2,
                     'curve': curve,
                     'width': width,
-                    'layer': layer,
+                    'layer': sexprValue(i, 'layer'),
                     'type': oType,
                 })
         #
         return data
 
     def getPCB(self, borderObject):
-        # lines
-        for i in self.getLine(self.getLayerName(self.borderLayerNumber), self.projektBRD, 'gr_line'):
-            borderObject.addGeometry(Part.LineSegment(FreeCAD.Vector(i['x1'], i['y1'], 0), FreeCAD.Vector(i['x2'], i['y2'], 0)))
-        # circles
-        for i in self.getCircle(self.getLayerName(self.borderLayerNumber), self.projektBRD, 'gr_circle'):
-            borderObject.addGeometry(Part.Circle(FreeCAD.Vector(i['x'], i['y']), FreeCAD.Vector(0, 0, 1), i['r']))
-        # arc
-        for i in self.getArc(self.getLayerName(self.borderLayerNumber), self.projektBRD, 'gr_arc'):
-            [x3, y3] = self.arcMidPoint([i['x2'], i['y2']], [i['x1'], i['y1']], i['curve'])
-            arc = Part.Arc(FreeCAD.Vector(i['x2'], i['y2'], 0.0), FreeCAD.Vector(x3, y3, 0.0), FreeCAD.Vector(i['x1'], i['y1'], 0.0))
-            borderObject.addGeometry(arc)
+        lType = self.getLayerName(self.borderLayerNumber)
+        # lines/circles/arcs
+        self.builder.addOutline(borderObject)
         ############
         ###### obj
-        lType = re.escape(self.getLayerName(self.borderLayerNumber))
-        
-        for j in re.findall(r'\[start\]\(module(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL):
-            [X1, Y1, ROT] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', j).groups()
-            layer = re.search(r'\(layer\s+(.+?)\)', j).groups()[0]
-            
-            X1 = float(X1)
-            Y1 = float(Y1) * (-1)
-            
-            if ROT == '':
-                ROT = 0.0
-            else:
-                ROT = float(ROT)
-            
-            if self.databaseType == "kicad":  # kicad v3
-                if self.spisWarstw[layer] == 15:  # top
-                    side = 1
-                else:
-                    side = 0
-            else:  # kicad v4
-                if self.spisWarstw[layer] == 0:  # top
-                    side = 1
-                else:
-                    side = 0
+        self.getElements()
+        #
+        for j in self.elements:
+            [X1, Y1, ROT] = j['placement']
             # line
-            for i in self.getLine(lType, j, 'fp_line', [X1, Y1]):
+            for i in self.getFootprintShapes(j, 'fp_line', lType):
                 [x1, y1] = self.obrocPunkt2([i['x1'], i['y1']], [X1, Y1], ROT)
                 [x2, y2] = self.obrocPunkt2([i['x2'], i['y2']], [X1, Y1], ROT)
                 borderObject.addGeometry(Part.LineSegment(FreeCAD.Vector(x1, y1, 0), FreeCAD.Vector(x2, y2, 0)))
             # circle
-            for i in self.getCircle(lType, j, 'fp_circle', [X1, Y1]):
+            for i in self.getFootprintShapes(j, 'fp_circle', lType):
                 [x, y] = self.obrocPunkt2([i['x'], i['y']], [X1, Y1], ROT)
 
                 borderObject.addGeometry(Part.Circle(FreeCAD.Vector(x, y), FreeCAD.Vector(0, 0, 1), i['r']))
             # arc
-            for i in self.getArc(lType, j, 'fp_arc', [X1, Y1]):
+            for i in self.getFootprintShapes(j, 'fp_arc', lType):
                 [x1, y1] = self.obrocPunkt2([i['x1'], i['y1']], [X1, Y1], ROT)
                 [x2, y2] = self.obrocPunkt2([i['x2'], i['y2']], [X1, Y1], ROT)
                 
@@ -566,38 +429,27 @@ class KiCadv3_PCB(baseModel):
         return 'eeeeeefsdfstdgdfgdfghdfgdfgdfgfd'
     
     def getAnnotations(self, data, mode='anno'):
+        ''' texts from the board IR -> annotations '''
         adnotacje = []
         #
         for i in data:
-            try:
-                txt = re.search(r'\s(.*?)\s\(at', i).groups(0)[0].replace('"', '').replace('\r\n', '\n').replace('\r', '\n').replace('\\n', '\n')
-                [x, y, rot] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', i).groups()
-                layer = re.search(r'\(layer\s+(.+?)\)', i).groups()[0]
-                size = re.search(r'\(size\s+([0-9\.]*?)\s+[0-9\.]*?\)', i).groups()[0]
-                justify = re.findall(r'( \(justify .*?\)|)\)', i)[-1].strip()
-            except:
-                continue
-            #
-            if rot == '':
-                rot = 0.0
-            else:
-                rot = float(rot)
+            layer = i['layer']
+            justify = i['justify']
             
             if layer.startswith('F.') or (self.spisWarstw[layer] in [15, 21] and self.databaseType == "kicad") or (self.spisWarstw[layer] in [0, 33, 35, 37, 39, 40, 41, 42, 43, 44, 45, 47, 49] and self.databaseType == "kicad_v4"):
                 side = 'TOP'
             else:
                 side = 'BOTTOM'
             
-            extra = re.findall(r'\(justify( [left|right]+|)( mirror|)\)', justify, re.DOTALL)
-            if len(extra):
-                if extra[0][0].strip() == 'right':
+            if justify:
+                if 'right' in justify:
                     align = 'center-right'
-                elif extra[0][0].strip() == 'left':
+                elif 'left' in justify:
                     align = 'center-left'
                 else:
                     align = 'center'
                 
-                if extra[0][1].strip() == 'mirror':
+                if 'mirror' in justify:
                     mirror = 2
                 else:
                     mirror = 0
@@ -606,12 +458,12 @@ class KiCadv3_PCB(baseModel):
                 mirror = False
 
             adnotacje.append({
-                "text": txt,
-                "x": float(x),
-                "y": float(y) * (-1),
+                "text": i['text'],
+                "x": i['x'],
+                "y": i['y'],
                 "z": 0,
-                "size": float(size),
-                "rot": rot,
+                "size": i['size'],
+                "rot": i['rot'],
                 "side": side,
                 "align": align,
                 "spin": False,
@@ -626,28 +478,31 @@ class KiCadv3_PCB(baseModel):
         return adnotacje
     
     def getNormalAnnotations(self):
-        return self.getAnnotations(re.findall(r'\[start\]\(gr_text(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL), mode='anno')
+        return self.getAnnotations(self.board.getAnnotations(), mode='anno')
         
     def getConstraintAreas(self, layerNumber):
         areas = []
         #
         if 'topSide' in PCBconstraintAreas[softLayers[self.databaseType][layerNumber][1]][1]:  # gorna warstwa
             if self.databaseType == 'kicad':
-                lType = re.escape(self.getLayerName(15))
+                lType = self.getLayerName(15)
             else:
-                lType = re.escape(self.getLayerName(0))
+                lType = self.getLayerName(0)
         elif 'bottomSide' in PCBconstraintAreas[softLayers[self.databaseType][layerNumber][1]][1]:  # dolna warstwa
             if self.databaseType == 'kicad':
-                lType = re.escape(self.getLayerName(0))
+                lType = self.getLayerName(0)
             else:
-                lType = re.escape(self.getLayerName(31))
+                lType = self.getLayerName(31)
         else:
-            lType = '.*?'
+            lType = None
         ###  polygon
-        for i in re.findall(r'\[start\]\(zone\s+.+?\s+\(layer {0}\)(.*?)\s+\)\[stop\]'.format(lType), self.projektBRD, re.MULTILINE|re.DOTALL):
-            data = re.search(r'\(keepout\s+\(tracks\s+(.*?)\)\s+\(vias\s+(.*?)\)\s+\(copperpour\s+(.*?)\)\)', i, re.MULTILINE|re.DOTALL)
+        for i in self.projektIndex.get('zone', []):
+            if lType is not None and sexprValue(i, 'layer') != lType:
+                continue
+            
+            data = sexprFind(i, 'keepout')
             if data:
-                info = [j for j in data.groups()]
+                info = [sexprValue(data, 'tracks'), sexprValue(data, 'vias'), sexprValue(data, 'copperpour')]
             else:
                 continue
         
@@ -664,19 +519,19 @@ class KiCadv3_PCB(baseModel):
             elif layerNumber == 904 and not info[1] == 'not_allowed':
                 continue
             #
-            points = re.findall(r'\(xy\s+(.*?)\s+(.*?)\)', i)
+            points = sexprFindAll(sexprFind(sexprFind(i, 'polygon'), 'pts'), 'xy')
             areas.append(['polygon', []])
 
             for j in range(len(points)):
-                x1 = float(points[j][0])
-                y1 = float(points[j][1]) * (-1)
+                x1 = float(points[j][1])
+                y1 = float(points[j][2]) * (-1)
                 
                 if j + 2 > len(points):
-                    x2 = float(points[0][0])
-                    y2 = float(points[0][1]) * (-1)
+                    x2 = float(points[0][1])
+                    y2 = float(points[0][2]) * (-1)
                 else:
-                    x2 = float(points[j + 1][0])
-                    y2 = float(points[j + 1][1]) * (-1)
+                    x2 = float(points[j + 1][1])
+                    y2 = float(points[j + 1][2]) * (-1)
                 
                 areas[-1][-1].append(['Line', x1, y1, x2, y2])
         #
@@ -699,25 +554,16 @@ class KiCadv3_PCB(baseModel):
             return "silk"
 
     def addStandardShapes(self, dane, layerNew, layerNumber, display=[True, True, True, True], parent=None):
-        if parent:
-            X = parent['x']
-            Y = parent['y']
-            oType = 'fp_'
-        else:
-            X = 0
-            Y = 0
-            oType = 'gr_'
-
         # linie/luki
         if display[0]:
-            for i in self.getLine(layerNumber, dane, oType + 'line', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'line', parent):
                 layerNew.addLineWidth(i['x1'], i['y1'], i['x2'], i['y2'], i['width'])
                 if parent:
                     layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
                     layerNew.setChangeSide(parent['x'], parent['y'], parent['side'])
                 layerNew.setFace()
                 
-            for i in self.getArc(layerNumber, dane, oType + 'arc', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'arc', parent):
                 if layerNew.addArcWidth([i['x1'], i['y1']], [i['x2'], i['y2']], -i['curve'], i['width']):
                     if parent:
                         layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
@@ -725,7 +571,7 @@ class KiCadv3_PCB(baseModel):
                     layerNew.setFace()
         # okregi
         if display[1]:
-            for i in self.getCircle(layerNumber, dane, oType + 'circle', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'circle', parent):
                 layerNew.addCircle(i['x'], i['y'], i['r'], i['width'])
                 if parent:
                     layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
@@ -736,16 +582,7 @@ class KiCadv3_PCB(baseModel):
                     layerNew.circleCutHole(i['x'], i['y'], i['r'] - i['width'] / 2.)
 
     def getPaths(self, layerNew, layerNumber, display):
-        for i in re.findall(r'\[start\]\(segment\s+\(start\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(end\s+([0-9\.-]*?)\s+([0-9\.-]*?)\)\s+\(width\s+([0-9\.-]*?)\)\s+\(layer\s+{0}\)(.*?)\[stop\]'.format(layerNumber[1]), self.projektBRD, re.MULTILINE|re.DOTALL):
-            x1 = float(i[0])
-            y1 = float(i[1]) * (-1)
-            x2 = float(i[2])
-            y2 = float(i[3]) * (-1)
-            width = float(i[4])
-            
-            if [x1, y1] != [x2, y2]:
-                layerNew.addLineWidth(x1, y1, x2, y2, width)
-                layerNew.setFace()
+        self.builder.addPaths(layerNew, layerNumber[1])
     
     def getSilkLayer(self, layerNew, layerNumber, display=[True, True, True, True]):
         self.addStandardShapes(self.projektBRD, layerNew, layerNumber[1], display)
@@ -769,39 +606,54 @@ class KiCadv3_PCB(baseModel):
             ####
             self.addStandardShapes(i['dataElement'], layerNew, szukanaWarstwa, parent=i)
         
+    def getShapes(self, source, layer, shape, parent=None):
+        ''' gr_* shapes from the board or fp_* shapes of the element footprint '''
+        if parent:
+            return self.getFootprintShapes(parent, 'fp_' + shape, layer)
+        
+        return getattr(self, 'get' + shape.capitalize())(layer, source, 'gr_' + shape)
+    
+    def getFootprintShapes(self, element, oType, layer):
+        ''' footprint template shapes (module coordinates) moved to the element position '''
+        data = []
+        #
+        for i in element['footprint'][oType]:
+            if i['layer'] != layer:
+                continue
+            
+            i = dict(i)
+            for j in ['x', 'x1', 'x2']:
+                if j in i:
+                    i[j] += element['x']
+            for j in ['y', 'y1', 'y2']:
+                if j in i:
+                    i[j] += element['y']
+            
+            data.append(i)
+        #
+        return data
+    
+    def getFootprint(self, module):
+        key = getFootprintKey(module)
+        #
+        if not key in self.footprints.keys():
+            self.footprints[key] = {
+                'fp_line': self.getLine(None, module, 'fp_line'),
+                'fp_arc': self.getArc(None, module, 'fp_arc'),
+                'fp_circle': self.getCircle(None, module, 'fp_circle'),
+            }
+        
+        return self.footprints[key]
+    
     def getElements(self):
         if len(self.elements) == 0:
-            for i in re.findall(r'\[start\]\(module(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL):
-                [x, y, rot] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', i).groups()
-                layer = re.search(r'\(layer\s+(.+?)\)', i).groups()[0]
-                
-                name = re.search(r'\(fp_text reference\s+(.*)', i, re.MULTILINE|re.DOTALL).groups()[0]
-                name = re.search(r'^(".+?"|.+?)\s', name).groups()[0].replace('"', '')
-                value = re.search(r'\(fp_text value\s+(.*)', i, re.MULTILINE|re.DOTALL).groups()[0]
-                value  = re.search(r'^(".+?"|.+?)\s', value).groups()[0].replace('"', '')
-                
-                x = float(x)
-                y = float(y) * (-1)
-                ########
-                package = re.search(r'\s+(.+?)\(layer', i).groups()[0]
-                package = re.sub('locked|placed|pla', '', package).split(':')[-1]
-                package = package.replace('"', '').strip()
-                ##3D package from KiCad
-                #try:
-                    #package3D = re.search(r'\(model\s+(.+?).wrl', i).groups()[0]
-                    #if package3D and self.partExist(os.path.basename(package3D), "", False):
-                        #package = os.path.basename(package3D)
-                #except:
-                    #pass
-                ########
-                library = package
+            modules = self.projektIndex.get('module', [])  # one part of the board IR for each module
+            
+            for [number, i] in enumerate(self.board.parts):
+                [x, y, rot] = [i['x'], i['y'], i['rot']]
+                rotRaw = rot
                 #
-                if rot == '':
-                    rot = 0.0
-                else:
-                    rot = float(rot)
-                
-                if (self.databaseType == "kicad" and self.spisWarstw[layer] == 15) or (self.databaseType == "kicad_v4" and self.spisWarstw[layer] == 0):  # top
+                if i['side'] == 'TOP':
                     side = 1  # TOP
                     mirror = 'None'
                 else:
@@ -814,16 +666,19 @@ class KiCadv3_PCB(baseModel):
                     mirror = 'Local Y axis'
                 
                 self.elements.append({
-                    'name': name, 
-                    'library': library, 
-                    'package': package, 
-                    'value': value, 
+                    'name': i['name'], 
+                    'library': i['library'], 
+                    'package': i['package'], 
+                    'value': i['value'], 
                     'x': x, 
                     'y': y, 
                     'rot': rot,
                     'side': side, 
-                    'dataElement': i, 
-                    'mirror': mirror
+                    'dataElement': modules[number], 
+                    'footprint': self.getFootprint(modules[number]), 
+                    'placement': [x, y, rotRaw], 
+                    'mirror': mirror,
+                    'number': number,
                 })
     
     def getParts(self):
@@ -836,14 +691,14 @@ class KiCadv3_PCB(baseModel):
             else:
                 i['side'] = "BOTTOM"
             ####################################
-            dataName = self.getAnnotations(re.findall(r'\(fp_text reference(.+?)\)\n\s+\)\n\s+\(', i['dataElement'], re.MULTILINE|re.DOTALL), mode='param')
+            dataName = self.getAnnotations(self.board.getAnnotations(i['number'], 'reference'), mode='param')
             i['EL_Name'] = dataName[0]
             i['EL_Name']["text"] = "NAME"
             i['EL_Name']["x"] = i['EL_Name']["x"] + i["x"]
             i['EL_Name']["y"] = i['EL_Name']["y"] + i["y"]
             i['EL_Name']["rot"] = i['EL_Name']["rot"] - i["rot"]
             ####################################
-            dataValue = self.getAnnotations(re.findall(r'\(fp_text value(.+?)\)\n\s+\)\n\s+\(', i['dataElement'], re.MULTILINE|re.DOTALL), mode='param')
+            dataValue = self.getAnnotations(self.board.getAnnotations(i['number'], 'value'), mode='param')
             i['EL_Value'] = dataValue[0]
             i['EL_Value']["text"] = "VALUE"
             i['EL_Value']["x"] = i['EL_Value']["x"] + i["x"]
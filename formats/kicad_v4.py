@@ -26,12 +26,14 @@
 #****************************************************************************
 
 import FreeCAD
-import re
 #
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.kicad_v3 import KiCadv3_PCB
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
+from formats.sexpr import sexprFind, sexprFindAll, sexprValue, sexprSearch, __version__ as sexprVersion
+from formats.kicadIR import getFootprintKey, getPolygonPoints
+from PCBboardCache import getParsedBoard
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -42,7 +44,7 @@ class dialogMAIN(dialogMAIN_FORM):
         self.plytkaPCB_otworyH.setChecked(False)
         self.plytkaPCB_otworyH.setDisabled(True)
         #
-        self.projektBRD = self.setProjectFile(filename)
+        self.projektBRD = getParsedBoard(filename, 'kicad_sexpr', sexprVersion, None, lambda: self.setProjectTree(filename))
         self.layersNames = self.getLayersNames()
         if FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/PCB").GetBool("boardImportThickness", True):
             self.gruboscPlytki.setValue(self.getBoardThickness())
@@ -57,13 +59,12 @@ class dialogMAIN(dialogMAIN_FORM):
         #self.lay.addLayout(lay, 12, 0, 1, 6)
     
     def getBoardThickness(self):
-        return float(re.findall(r'\(thickness (.+?)\)', self.projektBRD)[0])
+        return float(sexprSearch(self.projektBRD, 'thickness')[1])
         
     def getLayersNames(self):
         dane = {}
         
-        layers = re.search(r'\[start\]\(layers(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL).group(0)
-        for i in re.findall(r'\((.*?) (.*?) .*?\)', layers):
+        for i in sexprFind(self.projektBRD, 'layers')[1:]:
             side = "TOP"
             if i[1].startswith("B."):
                 side = "BOTTOM"
@@ -86,12 +87,17 @@ class dialogMAIN(dialogMAIN_FORM):
 
 class KiCadv4_PCB(KiCadv3_PCB):
     def __init__(self, filename, parent):
-        KiCadv3_PCB.__init__(self, filename, parent)
-        
-        self.dialogMAIN = dialogMAIN(filename)
+        # KiCadv3_PCB.__init__() is not called - it would parse the file again for the v3 dialog
+        self.fileName = filename
+        self.dialogMAIN = dialogMAIN(self.fileName)
         self.databaseType = "kicad_v4"
+        self.parent = parent
         #
+        self.spisWarstw = {}
+        self.elements = []
+        self.footprints = {}  # parsed modules shared by all identical footprints
         self.borderLayerNumber = 44
+        self.frontLayerNumber = 0  # parts on the top side
     
     def defineFunction(self, layerNumber):
         if layerNumber in [107, 108]:  # pady
@@ -109,26 +115,21 @@ class KiCadv4_PCB(KiCadv3_PCB):
         else:
             return "silk"
     
+    def getPadsCopperLayer(self, layerNumber):
+        # pads layers: 107 - top side, 108 - bottom side
+        if layerNumber == 107:
+            return self.getLayerName(0)
+        return self.getLayerName(31)
+    
     def getPads(self, layerNew, layerNumber, layerSide, tentedViasLimit, tentedVias):
         # via
-        via_drill = float(self.getSettings('via_drill'))
-
-        for i in re.findall(r'\(via\s+\(at\s+(.*?)\s+(.*?)\)\s+\(size\s+(.*?)\)\s+(\(drill\s+(.*?)\)|)', self.projektBRD):
-            x = float(i[0])
-            y = float(i[1]) * (-1)
-            diameter = float(i[2])
-
-            if i[4] == '':
-                drill = via_drill / 2.
-            else:
-                drill = float(i[4]) / 2.
-            
+        for i in self.getVias(self.getPadsCopperLayer(layerNumber[0])):
             ##### ##### ##### 
             ##### tented dVias
-            if self.filterTentedVias(tentedViasLimit, tentedVias, drill * 2, False):
+            if self.filterTentedVias(tentedViasLimit, tentedVias, i['drill'] * 2, False):
                 continue
             ##### ##### ##### 
-            layerNew.addCircle(x, y, diameter / 2.)
+            layerNew.addCircle(i['x'], i['y'], i['diameter'] / 2.)
             layerNew.setFace()
         
         if not tentedVias:
@@ -136,13 +137,13 @@ class KiCadv4_PCB(KiCadv3_PCB):
             self.getElements()
             #
             for i in self.elements:
-                for j in self.getPadsList(i['dataElement']):
-                    if("np_" in j['padType'].lower()):  # mounting holes
+                for j in self.board.getPads(i['number']):
+                    if("np_" in j['type'].lower()):  # mounting holes
                         continue
                     #
                     xs = j['x'] + i['x']
                     ys = j['y'] + i['y']
-                    numerWarstwy = j['layers'].split(' ')
+                    numerWarstwy = j['layers']
                     
                     rot_2 = i['rot'] - j['rot']
                     
@@ -159,7 +160,7 @@ class KiCadv4_PCB(KiCadv3_PCB):
                         dodaj = True
                     #####
                     if dodaj:
-                        if j['padShape'] == 'rect':
+                        if j['shape'] == 'rect':
                             x1 = xs - j['dx'] / 2. + j['xOF']
                             y1 = ys - j['dy'] / 2. + j['yOF']
                             x2 = xs + j['dx'] / 2. + j['xOF']
@@ -170,21 +171,19 @@ class KiCadv4_PCB(KiCadv3_PCB):
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             #layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-                        elif j['padShape'] == "custom":
-                            parentL = {
-                                'x': xs, 
-                                'y': ys, 
-                                'rot': rot_2
-                            }
-                            layerNew = self.addStandardShapes(j["data"], layerNew, None, display=[False, False, False, True], parent=parentL)
-                            layerNew.addRotation(i['x'], i['y'], i['rot'])
-                        elif j['padShape'] == 'circle':
+                        elif j['shape'] == "custom":
+                            for k in j['polygons']:
+                                layerNew.addPolygon(self.getPolygon(k, xs, ys))
+                                layerNew.addRotation(xs, ys, rot_2)
+                                layerNew.setFace()
+                                layerNew.addRotation(i['x'], i['y'], i['rot'])
+                        elif j['shape'] == 'circle':
                             layerNew.addCircle(xs + j['xOF'], ys + j['yOF'], j['dx'] / 2.)
                             layerNew.addRotation(xs, ys, rot_2)
                             layerNew.addRotation(i['x'], i['y'], i['rot'])
                             #layerNew.setChangeSide(i['x'], i['y'], i['side'])
                             layerNew.setFace()
-                        elif j['padShape'] == 'oval':
+                        elif j['shape'] == 'oval':
                             if j['dx'] == j['dy']:
                                 layerNew.addCircle(xs + j['xOF'], ys + j['yOF'], j['dx'] / 2.)
                                 layerNew.addRotation(xs, ys, rot_2)
@@ -197,14 +196,8 @@ class KiCadv4_PCB(KiCadv3_PCB):
                                 layerNew.addRotation(i['x'], i['y'], i['rot'])
                                 #layerNew.setChangeSide(i['x'], i['y'], i['side'])
                                 layerNew.setFace()
-                        elif j['padShape'] == 'trapezoid':
-                            if j[8].strip() == '':
-                                xRD = 0
-                                yRD = 0
-                            else:
-                                rect_delta = re.findall(r'\(rect_delta ([-0-9\.]*?) ([-0-9\.]*?) \)', j[8].strip())[0]
-                                yRD = float(rect_delta[0]) / 2.
-                                xRD = float(rect_delta[1]) / 2.
+                        elif j['shape'] == 'trapezoid':
+                            [xRD, yRD] = [j['deltaX'], j['deltaY']]
                             
                             x1 = xs - j['dx'] / 2. + j['xOF']
                             y1 = ys - j['dy'] / 2. + j['yOF']
@@ -230,14 +223,14 @@ class KiCadv4_PCB(KiCadv3_PCB):
                 copyL['side'] = "BOTTOM"
                 copyL['rot'] = (180 - copyL['rot'])
             ####################################
-            dataName = self.getAnnotations(re.findall(r'\(fp_text reference(.+?)\)\n\s+\)\n\s+\(', copyL['dataElement'], re.MULTILINE|re.DOTALL), mode='param')
+            dataName = self.getAnnotations(self.board.getAnnotations(i['number'], 'reference'), mode='param')
             copyL['EL_Name'] = dataName[0]
             copyL['EL_Name']["text"] = "NAME"
             copyL['EL_Name']["x"] = copyL['EL_Name']["x"] + i["x"]
             copyL['EL_Name']["y"] = copyL['EL_Name']["y"] + i["y"]
             copyL['EL_Name']["rot"] = copyL['EL_Name']["rot"] - i["rot"]
             ####################################
-            dataValue = self.getAnnotations(re.findall(r'\(fp_text value(.+?)\)\n\s+\)\n\s+\(', copyL['dataElement'], re.MULTILINE|re.DOTALL), mode='param')
+            dataValue = self.getAnnotations(self.board.getAnnotations(i['number'], 'value'), mode='param')
             copyL['EL_Value'] = dataValue[0]
             copyL['EL_Value']["text"] = "VALUE"
             copyL['EL_Value']["x"] = copyL['EL_Value']["x"] + i["x"]
@@ -258,22 +251,20 @@ class KiCadv4_PCB(KiCadv3_PCB):
         if parent:
             X = parent['x']
             Y = parent['y']
-            oType = 'fp_'
         else:
             X = 0
             Y = 0
-            oType = 'gr_'
 
         # linie/luki
         if display[0]:
-            for i in self.getLine(layerNumber, dane, oType + 'line', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'line', parent):
                 layerNew.addLineWidth(i['x1'], i['y1'], i['x2'], i['y2'], i['width'])
                 if parent:
                     layerNew.addRotation(parent['x'], parent['y'], parent['rot'])
                     #layerNew.setChangeSide(parent['x'], parent['y'], parent['side'])
                 layerNew.setFace()
                 
-            for i in self.getArc(layerNumber, dane, oType + 'arc', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'arc', parent):
                 if layerNew.addArcWidth([i['x1'], i['y1']], [i['x2'], i['y2']], -i['curve'], i['width']):
                     if parent:
                         layerNew.addRotation(X, Y, parent['rot'])
@@ -281,7 +272,7 @@ class KiCadv4_PCB(KiCadv3_PCB):
                     layerNew.setFace()
         # okregi
         if display[1]:
-            for i in self.getCircle(layerNumber, dane, oType + 'circle', [X, Y]):
+            for i in self.getShapes(dane, layerNumber, 'circle', parent):
                 layerNew.addCircle(i['x'], i['y'], i['r'], i['width'])
                 if parent:
                     layerNew.addRotation(X, Y, parent['rot'])
@@ -292,7 +283,12 @@ class KiCadv4_PCB(KiCadv3_PCB):
                     layerNew.circleCutHole(i['x'], i['y'], i['r'] - i['width'] / 2.)
         ## polygon
         if display[3]:
-            for i in self.getPolygons(dane, oType + 'poly', layerNumber):
+            if parent:
+                polygons = [i['points'] for i in self.getFootprintShapes(parent, 'fp_poly', layerNumber)]
+            else:
+                polygons = self.getPolygons(dane, 'gr_poly', layerNumber)
+            
+            for i in polygons:
                 if parent:
                     layerNew.addPolygon(self.getPolygon(i, X, Y))
                     layerNew.addRotation(X, Y, parent['rot'])
@@ -324,60 +320,26 @@ class KiCadv4_PCB(KiCadv3_PCB):
                 poin.append(['Line', x1, y1, x2, y2])
         return poin
     
-    def getPolygons(self, section, oType, layer=False):
-        if layer:
-            data = re.findall(r'\({1}\s+\(pts\s+[xy0-9.\(\)\s+-]*\s+\(layer\s+{0}\)'.format(layer, oType), section, re.MULTILINE|re.DOTALL)
-        else:
-            data = re.findall(r'\(gr_poly\s+\(pts\s+[xy0-9.\(\)\s+-]*', section, re.MULTILINE|re.DOTALL)
-        
-        dataOut = []
-        #
-        for i in data:
-            pol = []
-            pts = re.findall('\(xy\s+[-.0-9]*\s+[-.0-9]*\)', i, re.MULTILINE|re.DOTALL)
-            for j in range(len(pts)):
-                [cord, x, y] = pts[j].replace(")", "").split(" ")
-                x = float(x)
-                y = float(y) * -1
-                
-                pol.append([x, y])
-            dataOut.append(pol)
+    def getPolygons(self, section, oType, layer):
+        return [getPolygonPoints(i) for i in self.getObjects(section, oType) if sexprValue(i, 'layer') == layer]
+    
+    def getFootprint(self, module):
+        key = getFootprintKey(module)
         #
-        return dataOut
+        if not key in self.footprints.keys():
+            footprint = KiCadv3_PCB.getFootprint(self, module)
+            footprint['fp_poly'] = [{'layer': sexprValue(i, 'layer'), 'points': getPolygonPoints(i)} for i in sexprFindAll(module, 'fp_poly')]
+        
+        return self.footprints[key]
 
     def getElements(self):
         if len(self.elements) == 0:
-            for i in re.findall(r'\[start\]\(module(.+?)\)\[stop\]', self.projektBRD, re.MULTILINE|re.DOTALL):
-                [x, y, rot] = re.search(r'\(at\s+([0-9\.-]*?)\s+([0-9\.-]*?)(\s+[0-9\.-]*?|)\)', i).groups()
-                layer = re.search(r'\(layer\s+(.+?)\)', i).groups()[0]
-                
-                name = re.search(r'\(fp_text reference\s+(.*)', i, re.MULTILINE|re.DOTALL).groups()[0]
-                name = re.search(r'^(".+?"|.+?)\s', name).groups()[0].replace('"', '')
-                value = re.search(r'\(fp_text value\s+(.*)', i, re.MULTILINE|re.DOTALL).groups()[0]
-                value  = re.search(r'^(".+?"|.+?)\s', value).groups()[0].replace('"', '')
-                
-                x = float(x)
-                y = float(y) * (-1)
-                ########
-                package = re.search(r'\s+(.+?)\(layer', i).groups()[0]
-                package = re.sub('locked|placed|pla', '', package).split(':')[-1]
-                package = package.replace('"', '').strip()
-                ##3D package from KiCad
-                #try:
-                    #package3D = re.search(r'\(model\s+(.+?).wrl', i).groups()[0]
-                    #if package3D and self.partExist(os.path.basename(package3D), "", False):
-                        #package = os.path.basename(package3D)
-                #except:
-                    #pass
-                ########
-                library = package
+            modules = self.projektIndex.get('module', [])  # one part of the board IR for each module
+            
+            for [number, i] in enumerate(self.board.parts):
+                [x, y, rot] = [i['x'], i['y'], i['rot']]
                 #
-                if rot == '':
-                    rot = 0.0
-                else:
-                    rot = float(rot)
-                
-                if (self.databaseType == "kicad" and self.spisWarstw[layer] == 15) or (self.databaseType == "kicad_v4" and self.spisWarstw[layer] == 0):  # top
+                if i['side'] == 'TOP':
                     side = 1  # TOP
                     mirror = 'None'
                 else:
@@ -385,14 +347,17 @@ class KiCadv4_PCB(KiCadv3_PCB):
                     mirror = 'Local Y axis'
                 
                 self.elements.append({
-                    'name': name, 
-                    'library': library, 
-                    'package': package, 
-                    'value': value, 
+                    'name': i['name'], 
+                    'library': i['library'], 
+                    'package': i['package'], 
+                    'value': i['value'], 
                     'x': x, 
                     'y': y, 
                     'rot': rot,
                     'side': side, 
-                    'dataElement': i, 
-                    'mirror': mirror
+                    'dataElement': modules[number], 
+                    'footprint': self.getFootprint(modules[number]), 
+                    'placement': [x, y, rot], 
+                    'mirror': mirror,
+                    'number': number,
                 })
@@ -37,7 +37,7 @@ from PySide import QtCore, QtGui
 from PCBconf import softLayers
 from PCBobjects import *
 from formats.dialogMAIN_FORM import dialogMAIN_FORM
-from formats.baseModel import baseModel
+from formats.baseModel import baseModel, holesGrid
 
 
 class dialogMAIN(dialogMAIN_FORM):
@@ -224,7 +224,7 @@ class LibrePCB(baseModel):
         return parts
         
     def getHoles(self, holesObject, types, Hmin, Hmax):
-        holesList = []
+        holesList = holesGrid()
         # holes
         if types['H']:
             for i in re.findall(r'\(hole\s+.+?\s+\(diameter\s+(.+?)\)\s+\(position\s+(.+?)\s+(.+?)\)\)', self.projektBRD):
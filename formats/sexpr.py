@@ -0,0 +1,127 @@
+# -*- coding: utf8 -*-
+#****************************************************************************
+#*                                                                          *
+#*   Printed Circuit Board Workbench for FreeCAD             PCB            *
+#*                                                                          *
+#*   Copyright (c) 2013-2019                                                *
+#*   marmni <marmni@onet.eu>                                                *
+#*                                                                          *
+#*                                                                          *
+#*   This program is free software; you can redistribute it and/or modify   *
+#*   it under the terms of the GNU Lesser General Public License (LGPL)     *
+#*   as published by the Free Software Foundation; either version 2 of      *
+#*   the License, or (at your option) any later version.                    *
+#*   for detail see the LICENCE text file.                                  *
+#*                                                                          *
+#*   This program is distributed in the hope that it will be useful,        *
+#*   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+#*   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+#*   GNU Library General Public License for more details.                   *
+#*                                                                          *
+#*   You should have received a copy of the GNU Library General Public      *
+#*   License along with this program; if not, write to the Free Software    *
+#*   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+#*   USA                                                                    *
+#*                                                                          *
+#****************************************************************************
+
+
+import re
+
+#
+# Lightweight S-expression reader used by the KiCad importer.
+#
+# The whole file is split into tokens by a single regular expression and
+# converted into nested lists in one pass:
+#   (segment (start 1 2) (end 3 4) (layer F.Cu))
+#       -> ['segment', ['start', '1', '2'], ['end', '3', '4'], ['layer', 'F.Cu']]
+# Atoms are kept as strings (quotes removed), conversion to numbers is done
+# by the importer. This module does not depend on FreeCAD.
+#
+__version__ = 1  # parsed boards cache - change if tree created from the text changes
+__sexprTokens__ = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+
+
+def sexprParse(text):
+    ''' return list of all top-level forms found in the text '''
+    stack = [[]]
+    #
+    for tok in __sexprTokens__.findall(text):
+        if tok == '(':
+            node = []
+            stack[-1].append(node)
+            stack.append(node)
+        elif tok == ')':
+            if len(stack) > 1:
+                stack.pop()
+        elif tok[0] == '"':
+            stack[-1].append(tok[1:-1].replace('\\"', '"'))
+        else:
+            stack[-1].append(tok)
+    #
+    return stack[0]
+
+
+def sexprIndex(node):
+    ''' group children of the node by head: {'segment': [...], 'via': [...], ...} '''
+    index = {}
+    #
+    for i in node[1:]:
+        if isinstance(i, list) and len(i):
+            try:
+                index[i[0]].append(i)
+            except KeyError:
+                index[i[0]] = [i]
+    #
+    return index
+
+
+def sexprFind(node, name):
+    ''' first child with given head (or None) '''
+    if node:
+        for i in node[1:]:
+            if isinstance(i, list) and len(i) and i[0] == name:
+                return i
+    return None
+
+
+def sexprFindAll(node, name):
+    ''' all children with given head '''
+    if not node:
+        return []
+    return [i for i in node[1:] if isinstance(i, list) and len(i) and i[0] == name]
+
+
+def sexprValue(node, name, default=None):
+    ''' first value of the child with given head: (layer F.Cu) -> 'F.Cu' '''
+    child = sexprFind(node, name)
+    if child is None or len(child) < 2:
+        return default
+    return child[1]
+
+
+def sexprSearch(node, name):
+    ''' first node with given head in the whole subtree (document order) '''
+    stack = [node]
+    #
+    while len(stack):
+        i = stack.pop()
+        if i[0] == name and i is not node:
+            return i
+        stack.extend([j for j in reversed(i[1:]) if isinstance(j, list) and len(j)])
+    #
+    return None
+
+
+def sexprSearchAll(node, name):
+    ''' all nodes with given head in the whole subtree (document order) '''
+    data = []
+    stack = [node]
+    #
+    while len(stack):
+        i = stack.pop()
+        if i[0] == name and i is not node:
+            data.append(i)
+        stack.extend([j for j in reversed(i[1:]) if isinstance(j, list) and len(j)])
+    #
+    return data